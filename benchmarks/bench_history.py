@@ -0,0 +1,115 @@
+"""
+Write and query cost of the price history (price_history.py).
+
+Records N rows into a temporary history directory: the fixtures' EV rows, repeated for many
+events and refreshes 3 seconds apart, with EV and NVP drifting so that +EV windows open and
+close. It reports the time record() takes on the caller's thread, the writer's append rate and
+bytes per row, then the time to scan everything with market_series() and ev_windows().
+Last, it cuts a column off mid-value like a crash during an append would, and exits non-zero
+unless queries still return the same windows and a writer reopening the part trims the torn value.
+
+    python benchmarks/bench_history.py --rows 1000000
+"""
+import argparse
+import copy
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("PODBOT_LOG_LEVEL", "WARNING")
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from bench_hotpaths import load_fixtures  # noqa: E402
+import betbck_scraper  # noqa: E402
+import main_logic  # noqa: E402
+import price_history  # noqa: E402
+import utils  # noqa: E402
+
+REFRESHES_PER_EVENT = 100
+REFRESH_SECONDS = 3.0
+
+def fixture_rows():
+    rows = []
+    for fx in load_fixtures():
+        if not fx["swordfish"]:
+            continue
+        bet_data = betbck_scraper.parse_specific_game_from_search_html(fx["html"], fx["home"], fx["away"])
+        if bet_data:
+            rows.append(main_logic.find_ev_bets(bet_data, utils.process_event_odds_for_display(copy.deepcopy(fx["swordfish"]))["data"]))
+    return [r for r in rows if r]
+
+def refreshes(row_count, templates, start_ts):
+    """Yields (event_id, rows, ts) like the server's record() calls, REFRESHES_PER_EVENT per event."""
+    rng = random.Random(7)
+    written = event = 0
+    while written < row_count:
+        template = templates[event % len(templates)]
+        drift = [0.0] * len(template)
+        for refresh in range(REFRESHES_PER_EVENT):
+            rows = []
+            for i, row in enumerate(template):
+                drift[i] += rng.gauss(0, 0.004)
+                rows.append(dict(row, ev=row["ev"] + drift[i], pin_nvp=row["pin_nvp"] * (1 - drift[i])))
+            yield str(1000000 + event), rows, start_ts + event * 20 + refresh * REFRESH_SECONDS
+            written += len(rows)
+            if written >= row_count:
+                return
+        event += 1
+
+def run(row_count):
+    templates = fixture_rows()
+    root = tempfile.mkdtemp(prefix="podbot-history-")
+    try:
+        recorder = price_history.PriceRecorder(root, flush_seconds=3600, max_pending=10 ** 7)
+        calls = list(refreshes(row_count, templates, time.time() - 86400))
+        start = time.perf_counter()
+        for event_id, rows, ts in calls:
+            recorder.record(event_id, rows, ts)
+        record_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        recorder.flush()
+        write_seconds = time.perf_counter() - start
+        recorder.stop()
+        disk = sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(root) for f in files)
+        print(f"{row_count} rows in {len(calls)} record() calls")
+        print(f"record()  {record_seconds / len(calls) * 1e6:8.1f} us/call on the caller's thread")
+        print(f"append    {row_count / write_seconds:10.0f} rows/s  {disk / row_count:.1f} bytes/row on disk")
+
+        history = price_history.PriceHistory(root)
+        start = time.perf_counter()
+        series = history.market_series()
+        series_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        windows = history.ev_windows(min_ev=0.02)
+        windows_seconds = time.perf_counter() - start
+        print(f"market_series  {series_seconds:6.2f}s  ({row_count / series_seconds:10.0f} rows/s, {len(series)} markets)")
+        print(f"ev_windows     {windows_seconds:6.2f}s  ({row_count / windows_seconds:10.0f} rows/s, {len(windows)} windows)")
+        if not torn_write_survives(root, len(windows)):
+            sys.exit("A column cut off mid-value broke the price history.")
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+def torn_write_survives(root, window_count):
+    part = next(d for d, _, files in os.walk(root) if "ts.bin" in files)
+    ts_path = os.path.join(part, "ts.bin")
+    with open(ts_path, "ab") as f:
+        f.write(b"\0\0\0")
+    torn = len(price_history.PriceHistory(root).ev_windows(min_ev=0.02))
+    price_history._PartWriter(part).close()
+    trimmed = os.path.getsize(ts_path) % 8 == 0
+    print(f"torn write     {torn} windows after cutting ts.bin mid-value, {'trimmed' if trimmed else 'NOT trimmed'} on reopen")
+    return torn == window_count and trimmed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000000, help="Rows to record.")
+    args = parser.parse_args()
+    run(args.rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Offline micro-benchmarks for the alert pipeline's CPU hot paths.
+
+Replays BetBCK search result pages and Swordfish event JSON from benchmarks/fixtures
+(listed in fixtures/manifest.json) through the parser, team-name normalization, the
+power-method devig and the EV comparison, plus one background refresh per event and one
+dashboard poll over POLL_EVENTS stored events. No network access or credentials are needed.
+
+    python benchmarks/bench_hotpaths.py                       # run every case
+    python benchmarks/bench_hotpaths.py --case parse          # only cases whose name contains "parse"
+    python benchmarks/bench_hotpaths.py --save-baseline benchmarks/baseline_hotpaths.json
+    python benchmarks/bench_hotpaths.py --compare benchmarks/baseline_hotpaths.json
+
+Pages saved by the scraper to betbck_html_logs/ can be added with --betbck-dir; the
+POD team names are read back from the saved file name.
+
+For each case it reports ops/sec, per-call p50/p95/p99 and allocations per call
+(peak traced memory above the starting point, measured in a separate tracemalloc pass
+so it does not distort the timings). --compare exits with status 1 if any case is
+slower than the baseline by more than --threshold percent.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("PODBOT_LOG_LEVEL", "WARNING")
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+from bench_http import percentile  # noqa: E402
+import betbck_scraper  # noqa: E402
+import main_logic  # noqa: E402
+import utils  # noqa: E402
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+POLL_EVENTS = 25
+SAVED_PAGE_NAME = re.compile(r"^search_[^_]+_(?P<home>.+)_vs_(?P<away>.+)_\d{8}_\d{6}\.html$")
+
+def load_fixtures(fixture_dir=FIXTURE_DIR, extra_betbck_dir=None):
+    """Returns a list of {"name", "html", "home", "away", "swordfish"} (swordfish may be None)."""
+    with open(os.path.join(fixture_dir, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    fixtures = []
+    for entry in manifest:
+        with open(os.path.join(fixture_dir, "betbck", entry["file"]), encoding="utf-8") as f:
+            html = f.read()
+        swordfish = None
+        if entry.get("swordfish"):
+            with open(os.path.join(fixture_dir, "swordfish", entry["swordfish"]), encoding="utf-8") as f:
+                swordfish = json.load(f)
+        fixtures.append({"name": entry.get("name") or os.path.splitext(entry["file"])[0], "html": html,
+                         "home": entry["home"], "away": entry["away"], "swordfish": swordfish})
+    if extra_betbck_dir:
+        for file_name in sorted(os.listdir(extra_betbck_dir)):
+            m = SAVED_PAGE_NAME.match(file_name)
+            if not m:
+                continue
+            with open(os.path.join(extra_betbck_dir, file_name), encoding="utf-8") as f:
+                html = f.read()
+            fixtures.append({"name": os.path.splitext(file_name)[0], "html": html,
+                             "home": m.group("home").replace("_", " "), "away": m.group("away").replace("_", " "),
+                             "swordfish": None})
+    return fixtures
+
+def build_cases(fixtures):
+    """Returns [(case_name, fn)] where fn() runs one operation."""
+    cases = []
+    for fx in fixtures:
+        html, home, away = fx["html"], fx["home"], fx["away"]
+        cases.append((f"parse[{fx['name']}]",
+                      lambda html=html, home=home, away=away: betbck_scraper.parse_specific_game_from_search_html(html, home, away)))
+
+    names = []
+    for fx in fixtures:
+        names.extend([fx["home"], fx["away"]])
+        names.extend(re.findall(r'<span data-language="[^"]*">([^<]+)</span>', fx["html"]))
+    cases.append((f"normalize_utils[{len(names)} names]",
+                  lambda: [utils.normalize_team_name_for_matching(n) for n in names]))
+    cases.append((f"normalize_scraper[{len(names)} names]",
+                  lambda: [betbck_scraper.normalize_team_name_for_matching(n) for n in names]))
+
+    for fx in fixtures:
+        if not fx["swordfish"]:
+            continue
+        event = fx["swordfish"]
+        markets = []
+        for period in event["data"]["periods"].values():
+            ml = period.get("money_line") or {}
+            markets.append([ml.get("home"), ml.get("away")] + ([ml["draw"]] if "draw" in ml else []))
+            markets.extend([s.get("home"), s.get("away")] for s in (period.get("spreads") or {}).values())
+            markets.extend([t.get("over"), t.get("under")] for t in (period.get("totals") or {}).values())
+        cases.append((f"devig_markets[{fx['name']}]",
+                      lambda markets=markets: [utils.calculate_nvp_for_market(m) for m in markets]))
+        # process_event_odds_for_display overwrites the same nvp_* keys on every call, so reusing one dict is safe.
+        cases.append((f"devig_event[{fx['name']}]", lambda event=event: utils.process_event_odds_for_display(event)))
+
+        bet_data = betbck_scraper.parse_specific_game_from_search_html(fx["html"], fx["home"], fx["away"])
+        if bet_data:
+            pin_root = utils.process_event_odds_for_display(event)["data"]
+            cases.append((f"ev[{fx['name']}]", lambda bet_data=bet_data, pin_root=pin_root: main_logic.find_ev_bets(bet_data, pin_root)))
+            # One background refresh of an event: devig the new Swordfish odds and re-price the stored BetBCK odds.
+            cases.append((f"refresh[{fx['name']}]", lambda event=event, bet_data=bet_data:
+                          main_logic.find_ev_bets(bet_data, utils.process_event_odds_for_display(event)["data"])))
+
+    # One dashboard poll: rebuild every event's markets from the stored state and render the verbose payload.
+    # Imported here because bench_payload imports this module.
+    import bench_payload
+    import dashboard_payload
+    import server
+    bench_payload.fill_state(POLL_EVENTS)
+    cases.append((f"poll[{POLL_EVENTS} events]", lambda: dashboard_payload.verbose_payload(server._build_dashboard_events())))
+    return cases
+
+def time_case(fn, min_time, min_calls=20, warmup=3):
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    start = time.perf_counter()
+    while len(latencies) < min_calls or time.perf_counter() - start < min_time:
+        t0 = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "calls": len(latencies),
+        "ops_per_sec": len(latencies) / elapsed,
+        "p50_us": percentile(latencies, 50) * 1e6,
+        "p95_us": percentile(latencies, 95) * 1e6,
+        "p99_us": percentile(latencies, 99) * 1e6,
+    }
+
+def measure_allocations(fn, calls=5):
+    tracemalloc.start()
+    try:
+        fn()
+        peaks, retained = [], []
+        for _ in range(calls):
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            fn()
+            after, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+            retained.append(after - before)
+    finally:
+        tracemalloc.stop()
+    return {"alloc_peak_kib": sum(peaks) / len(peaks) / 1024, "retained_b": sum(retained) / len(retained)}
+
+def run(case_filter=None, min_time=1.0, extra_betbck_dir=None):
+    results = {}
+    for name, fn in build_cases(load_fixtures(extra_betbck_dir=extra_betbck_dir)):
+        if case_filter and case_filter not in name:
+            continue
+        result = time_case(fn, min_time)
+        result.update(measure_allocations(fn))
+        results[name] = result
+        print(f"{name:<40} {result['ops_per_sec']:>10.1f} ops/s  p50={result['p50_us']:>9.1f}us  "
+              f"p95={result['p95_us']:>9.1f}us  p99={result['p99_us']:>9.1f}us  alloc={result['alloc_peak_kib']:>8.1f}KiB",
+              flush=True)
+    return results
+
+def compare(results, baseline, threshold_pct):
+    """Prints the change against the baseline; returns the names of cases that regressed."""
+    regressions = []
+    print(f"\nAgainst baseline (regression threshold {threshold_pct:.0f}%):")
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            print(f"  {name:<40} (not in baseline)")
+            continue
+        ops_change = (result["ops_per_sec"] / base["ops_per_sec"] - 1) * 100
+        p95_change = (result["p95_us"] / base["p95_us"] - 1) * 100 if base["p95_us"] else 0.0
+        regressed = ops_change < -threshold_pct
+        if regressed:
+            regressions.append(name)
+        print(f"  {name:<40} ops/s {ops_change:+6.1f}%  p95 {p95_change:+6.1f}%{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--case", help="Only run cases whose name contains this text.")
+    parser.add_argument("--min-time", type=float, default=1.0, help="Seconds to time each case (default 1).")
+    parser.add_argument("--betbck-dir", help="Also replay pages saved by the scraper in this directory.")
+    parser.add_argument("--save-baseline", metavar="PATH", help="Write the results to PATH as the new baseline.")
+    parser.add_argument("--compare", metavar="PATH", help="Compare against a baseline written by --save-baseline.")
+    parser.add_argument("--threshold", type=float, default=25.0, help="Percent ops/sec drop that counts as a regression.")
+    args = parser.parse_args()
+
+    results = run(args.case, args.min_time, args.betbck_dir)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump({"python": sys.version.split()[0], "results": results}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\nBaseline written to {args.save_baseline}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+HTTP load benchmark for comparing server run modes.
+
+Fires GET requests at one endpoint from a number of concurrent keep-alive clients
+for a fixed duration and reports requests per second and latency percentiles.
+
+    python server.py &                                   # dev server
+    python benchmarks/bench_http.py --url http://127.0.0.1:5001/get_active_events_data
+
+    python wsgi.py --threads 16 &                        # production mode
+    python benchmarks/bench_http.py --url http://127.0.0.1:5001/get_active_events_data
+"""
+import argparse
+import http.client
+import threading
+import time
+from urllib.parse import urlsplit
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * (len(sorted_values) - 1)))))
+    return sorted_values[k]
+
+def _client_loop(url, deadline, latencies, errors, lock):
+    parts = urlsplit(url)
+    path = parts.path or "/"
+    if parts.query:
+        path += "?" + parts.query
+    conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+    local_latencies, local_errors = [], 0
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            conn.request("GET", path)
+            response = conn.getresponse()
+            response.read()
+            if response.status >= 500:
+                local_errors += 1
+            local_latencies.append(time.perf_counter() - start)
+        except (OSError, http.client.HTTPException):
+            local_errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+    conn.close()
+    with lock:
+        latencies.extend(local_latencies)
+        errors[0] += local_errors
+
+def run_benchmark(url, concurrency, duration):
+    latencies, errors, lock = [], [0], threading.Lock()
+    deadline = time.perf_counter() + duration
+    threads = [threading.Thread(target=_client_loop, args=(url, deadline, latencies, errors, lock)) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors[0],
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://127.0.0.1:5001/get_active_events_data")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run.")
+    args = parser.parse_args()
+    result = run_benchmark(args.url, args.concurrency, args.duration)
+    print(f"{args.url}  concurrency={args.concurrency}  duration={args.duration}s")
+    print(f"  requests={result['requests']}  errors={result['errors']}  rps={result['rps']:.1f}")
+    print(f"  p50={result['p50_ms']:.2f}ms  p95={result['p95_ms']:.2f}ms  p99={result['p99_ms']:.2f}ms")
+
+if __name__ == "__main__":
+    main()
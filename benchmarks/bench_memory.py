@@ -0,0 +1,96 @@
+"""
+Memory per active event: the event dicts the server builds vs. event_model.compact_event().
+
+Builds N events the way /pod_alert stores them (devigged Swordfish JSON, parsed BetBCK odds with
+EV rows, the POD payload), each decoded separately as it would be from its own fetch, and
+reports the traced bytes retained per event in each form.
+
+    python benchmarks/bench_memory.py --events 100,500
+
+Before measuring it checks that EV rows computed from the compact form match the dicts.
+"""
+import argparse
+import copy
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("PODBOT_LOG_LEVEL", "WARNING")
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from bench_hotpaths import load_fixtures  # noqa: E402
+import betbck_scraper  # noqa: E402
+import event_model  # noqa: E402
+import main_logic  # noqa: E402
+import utils  # noqa: E402
+
+def templates():
+    """(swordfish JSON text, betbck_data JSON text, payload) per usable fixture."""
+    result = []
+    for fx in load_fixtures():
+        if not fx["swordfish"]:
+            continue
+        bet_data = betbck_scraper.parse_specific_game_from_search_html(fx["html"], fx["home"], fx["away"])
+        if not bet_data:
+            continue
+        pinnacle = utils.process_event_odds_for_display(copy.deepcopy(fx["swordfish"]))
+        bet_data["potential_bets_analyzed"] = main_logic.find_ev_bets(bet_data, pinnacle["data"])
+        payload = {"eventId": pinnacle["data"]["event_id"], "homeTeam": fx["home"], "awayTeam": fx["away"],
+                   "leagueName": pinnacle["data"]["league_name"], "startTime": pinnacle["data"]["starts"],
+                   "betDescription": f"{fx['home']} ML", "oldOdds": "+110", "newOdds": "-105", "noVigPriceFromAlert": "+102",
+                   "source": "pod", "sport": "unknown", "marketType": "moneyline", "alertedAt": "2025-06-01T18:15:02Z"}
+        result.append((json.dumps(fx["swordfish"]), json.dumps({"status": "success", "data": bet_data}), json.dumps(payload)))
+    return result
+
+def build_event(template, now):
+    swordfish_json, betbck_json, payload_json = template
+    pinnacle = utils.process_event_odds_for_display(json.loads(swordfish_json))
+    payload = json.loads(payload_json)
+    return {"alert_arrival_timestamp": now, "last_pinnacle_data_update_timestamp": now, "pinnacle_data_processed": pinnacle,
+            "original_alert_details": payload, "betbck_data": json.loads(betbck_json), "league_name": pinnacle["data"]["league_name"],
+            "start_time": pinnacle["data"]["starts"], "old_odds": payload["oldOdds"], "new_odds": payload["newOdds"],
+            "no_vig": payload["noVigPriceFromAlert"], "cleaned_home_team": payload["homeTeam"], "cleaned_away_team": payload["awayTeam"],
+            "betbck_last_update": now}
+
+def check_equivalent(template):
+    event = build_event(template, time.time())
+    compact = event_model.compact_event(build_event(template, time.time()))
+    bet_data = event["betbck_data"]["data"]
+    expected = main_logic.find_ev_bets(bet_data, event["pinnacle_data_processed"]["data"])
+    actual = main_logic.find_ev_bets(compact["betbck_data"]["data"], compact["pinnacle_data_processed"]["data"])
+    if expected != actual:
+        raise SystemExit(f"EV rows differ for {bet_data['pod_home_team']}:\n{expected}\n{actual}")
+
+def retained_bytes(count, make):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    events = [make(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del events
+    return after - before
+
+def run(event_counts):
+    tpls = templates()
+    for tpl in tpls:
+        check_equivalent(tpl)
+    print(f"{len(tpls)} fixture events; EV rows from compact events match the dicts")
+    print(f"{'events':>8}{'dict B/event':>15}{'compact B/event':>17}{'ratio':>8}")
+    now = time.time()
+    for count in event_counts:
+        dict_bytes = retained_bytes(count, lambda i: build_event(tpls[i % len(tpls)], now))
+        compact_bytes = retained_bytes(count, lambda i: event_model.compact_event(build_event(tpls[i % len(tpls)], now)))
+        print(f"{count:>8}{dict_bytes / count:>15.0f}{compact_bytes / count:>17.0f}{compact_bytes / dict_bytes:>8.0%}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", default="100,500", help="Event counts to measure (comma separated).")
+    args = parser.parse_args()
+    run([int(n) for n in args.events.split(",")])
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Size and serialization cost of /get_active_events_data in each format and encoding.
+
+Fills the server's state with N events built from the benchmark fixtures (parsed BetBCK
+odds plus devigged Swordfish JSON), then requests the endpoint through Flask's test client.
+
+    python benchmarks/bench_payload.py --events 5,25,100
+
+For each combination it prints response bytes and the server-side render, serialize
+and compress times. The compress time comes from the Server-Timing header.
+"""
+import argparse
+import copy
+import os
+import sys
+import time
+
+os.environ.setdefault("PODBOT_LOG_LEVEL", "WARNING")
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from bench_hotpaths import load_fixtures  # noqa: E402
+from bench_http import percentile  # noqa: E402
+import betbck_scraper  # noqa: E402
+import dashboard_payload  # noqa: E402
+import main_logic  # noqa: E402
+import server  # noqa: E402
+import utils  # noqa: E402
+
+VARIANTS = [
+    ("verbose", "", "identity"),
+    ("verbose", "", "gzip"),
+    ("compact", "format=compact", "identity"),
+    ("compact", "format=compact", "gzip"),
+    ("compact", "format=compact", "br"),
+    ("compact markets", "format=compact&fields=markets", "gzip"),
+]
+
+def fill_state(count):
+    """Replaces the server's active events with `count` events cycled from the fixtures."""
+    templates = []
+    for fx in load_fixtures():
+        if not fx["swordfish"]:
+            continue
+        bet_data = betbck_scraper.parse_specific_game_from_search_html(fx["html"], fx["home"], fx["away"])
+        if not bet_data:
+            continue
+        pinnacle = utils.process_event_odds_for_display(copy.deepcopy(fx["swordfish"]))
+        bet_data["potential_bets_analyzed"] = main_logic.find_ev_bets(bet_data, pinnacle["data"])
+        templates.append((fx, bet_data, pinnacle))
+    for eid in list(server.state_manager.get_active_events()):
+        server.state_manager.remove_active_event(eid)
+    now = time.time()
+    for i in range(count):
+        fx, bet_data, pinnacle = templates[i % len(templates)]
+        server.state_manager.add_active_event(str(1_800_000_000 + i), {
+            "alert_arrival_timestamp": now - i, "last_pinnacle_data_update_timestamp": now,
+            "pinnacle_data_processed": pinnacle, "original_alert_details": {"homeTeam": fx["home"], "awayTeam": fx["away"],
+                                                                            "betDescription": f"{fx['home']} ML"},
+            "betbck_data": {"status": "success", "data": bet_data}, "league_name": pinnacle["data"]["league_name"],
+            "start_time": pinnacle["data"]["starts"], "old_odds": "+110", "new_odds": "-105", "no_vig": "+102",
+            "betbck_last_update": now,
+        })
+
+def _timing(header, name):
+    for part in header.split(","):
+        metric, _, params = part.strip().partition(";")
+        if metric == name and params.startswith("dur="):
+            return float(params[4:])
+    return 0.0
+
+def run(event_counts, repeat):
+    client = server.app.test_client()
+    brotli_missing = dashboard_payload.brotli is None
+    print(f"JSON encoder: {'orjson' if dashboard_payload.orjson else 'json'}; brotli {'not installed' if brotli_missing else 'available'}")
+    for count in event_counts:
+        fill_state(count)
+        print(f"\n{count} events")
+        print(f"  {'variant':<18}{'encoding':<10}{'bytes':>10}{'vs verbose':>12}{'app p50 ms':>12}{'ser p50 ms':>12}{'cmp p50 ms':>12}")
+        baseline = None
+        for label, query, encoding in VARIANTS:
+            if encoding == "br" and brotli_missing:
+                continue
+            headers = {"Accept-Encoding": encoding}
+            app_ms, ser_ms, cmp_ms, size = [], [], [], 0
+            for _ in range(repeat):
+                response = client.get(f"/get_active_events_data?{query}", headers=headers)
+                timing = response.headers.get("Server-Timing", "")
+                app_ms.append(_timing(timing, "app"))
+                ser_ms.append(_timing(timing, "ser"))
+                cmp_ms.append(_timing(timing, "cmp"))
+                size = len(response.get_data())
+            baseline = baseline or size
+            print(f"  {label:<18}{encoding:<10}{size:>10}{size / baseline:>11.0%} {percentile(sorted(app_ms), 50):>11.2f}"
+                  f"{percentile(sorted(ser_ms), 50):>12.2f}{percentile(sorted(cmp_ms), 50):>12.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", default="5,25,100", help="Active event counts to test (comma separated).")
+    parser.add_argument("--repeat", type=int, default=30, help="Requests per variant.")
+    args = parser.parse_args()
+    run([int(n) for n in args.events.split(",")], args.repeat)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Cold-start time of the PODBot server against wsgi.py's budget (PODBOT_COLD_START_BUDGET, default 1.5s).
+
+Measures, each as the median of --runs fresh processes:
+    import   `python -c "import server"`: module imports, app and background objects, no config read
+    ready    `python wsgi.py` until /metrics answers: imports, config validation, background tasks, bind
+and lists the slowest imports reported by `python -X importtime -c "import server"`.
+Exits non-zero when the ready time is over the budget, so it can gate a change.
+
+    python benchmarks/bench_startup.py --runs 5
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from standin_books import write_scraper_config  # noqa: E402
+
+def _env(config_path):
+    return dict(os.environ, PODBOT_CONFIG_PATH=config_path, PODBOT_LOG_LEVEL="WARNING", PODBOT_STATE_BACKEND="memory",
+                PODBOT_PRICE_HISTORY_DIR="", PODBOT_CAPTURE_DIR="")
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def time_import(env):
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import server"], env=env, cwd=REPO_DIR, check=True)
+    return time.perf_counter() - start
+
+def time_ready(env, timeout=30):
+    port = _free_port()
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, os.path.join(REPO_DIR, "wsgi.py"), "--host", "127.0.0.1", "--port", str(port)],
+                            env=env, cwd=REPO_DIR)
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                requests.get(f"http://127.0.0.1:{port}/metrics", timeout=1)
+                return time.perf_counter() - start
+            except requests.RequestException:
+                if proc.poll() is not None:
+                    sys.exit(f"wsgi.py exited with status {proc.returncode} before answering.")
+                time.sleep(0.01)
+        sys.exit(f"wsgi.py did not answer within {timeout}s.")
+    finally:
+        proc.terminate()
+        try:
+            proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+def slowest_imports(env, limit):
+    """(cumulative seconds, module) of the slowest modules imported directly by server.py."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import server"], env=env, cwd=REPO_DIR,
+                            capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if name.startswith("   ") and not name.startswith("     "):  # two spaces per nesting level
+            rows.append((int(cumulative) / 1e6, name.strip()))
+    return sorted(rows, reverse=True)[:limit]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=float(os.environ.get("PODBOT_COLD_START_BUDGET", "1.5")),
+                        help="Seconds allowed until the server answers.")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        env = _env(write_scraper_config(os.path.join(config_dir, "config.json"), "http://127.0.0.1:9"))
+        imports = [time_import(env) for _ in range(args.runs)]
+        ready = [time_ready(env) for _ in range(args.runs)]
+        slowest = slowest_imports(env, args.top)
+
+    print(f"import server  median {statistics.median(imports):.3f}s  (min {min(imports):.3f}s, {args.runs} runs)")
+    print(f"ready          median {statistics.median(ready):.3f}s  (min {min(ready):.3f}s, budget {args.budget:.2f}s)")
+    print("slowest imports (cumulative):")
+    for seconds, name in slowest:
+        print(f"  {seconds * 1000:8.1f} ms  {name}")
+    if statistics.median(ready) > args.budget:
+        sys.exit(f"Cold start {statistics.median(ready):.2f}s is over the {args.budget:.2f}s budget.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Board sweep cycle time as the board grows, against the sweep budget.
+
+Starts the stand-in books (benchmarks/standin_books.py) in this process, lists --events synthetic
+games at both books in one league and runs board_sweep cycles in process, with hits collected
+instead of ingested. Board sizes are cumulative, e.g. --events 200,1000,3000.
+
+    python benchmarks/bench_sweep.py --events 200,1000,3000 --budget 20
+    python benchmarks/bench_sweep.py --parse-workers 2 --latency-ms 80   # parse pool on, slower books
+
+Reported per board size:
+    cycle      wall time of one sweep cycle (median of --runs)
+    games      BetBCK board games read, and how many joined a Swordfish event
+    markets    markets priced against Pinnacle NVPs
+    hits       games whose best market reached --min-ev
+    requests   upstream requests per cycle (BetBCK, Swordfish)
+Exits non-zero when a cycle leaves a league for the next one, i.e. ran out of budget.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+
+from standin_books import _CITIES, Knobs, StandInBooks, synthetic_event_id, write_scraper_config  # noqa: E402
+
+LEAGUE = "Stand-in League"
+
+def _write_config(path, betbck_url, budget, min_ev):
+    write_scraper_config(path, betbck_url)
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    config["sweep"] = {"enabled": True, "interval_seconds": max(60, budget), "budget_seconds": budget, "min_ev": min_ev,
+                       "leagues": {LEAGUE: _CITIES}}
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+    return path
+
+def _requests(knobs):
+    return sum(n for key, n in knobs.as_dict()["requests"].items() if key != "errors")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", default="200,1000,3000", help="Comma-separated cumulative board sizes.")
+    parser.add_argument("--runs", type=int, default=3, help="Cycles per board size.")
+    parser.add_argument("--budget", type=float, default=20.0, help="sweep.budget_seconds")
+    parser.add_argument("--min-ev", type=float, default=0.02, help="sweep.min_ev (fraction)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Added to every stand-in response.")
+    parser.add_argument("--parse-workers", type=int, default=0, help="PODBOT_PARSE_WORKERS for the sweep's page parses.")
+    parser.add_argument("--rate-limits", default=None, help="PODBOT_RATE_LIMITS (default: the server's own).")
+    args = parser.parse_args()
+    sizes = [int(n) for n in args.events.split(",")]
+
+    books = StandInBooks(betbck_knobs=Knobs(args.latency_ms), swordfish_knobs=Knobs(args.latency_ms)).start()
+    config_dir = tempfile.TemporaryDirectory()
+    os.environ.update(PODBOT_CONFIG_PATH=_write_config(os.path.join(config_dir.name, "config.json"), books.betbck_url, args.budget, args.min_ev),
+                      PODBOT_SWORDFISH_URL=books.swordfish_url, PODBOT_SWORDFISH_BULK_URL=books.swordfish_bulk_url,
+                      PODBOT_PARSE_WORKERS=str(args.parse_workers), PODBOT_LOG_LEVEL="WARNING", PODBOT_CAPTURE_DIR="")
+    if args.rate_limits is not None:
+        os.environ["PODBOT_RATE_LIMITS"] = args.rate_limits
+    from board_sweep import BoardSweep  # after the environment, which these modules read on import
+    from parse_pool import parse_pool
+
+    hits = {}
+
+    def collect(event_id, payload, result, wrapper_html):
+        hits[event_id] = payload
+        return True
+
+    sweep = BoardSweep(collect)
+    parse_pool.start()
+    over_budget = False
+    try:
+        registered = 0
+        for size in sizes:
+            books.register_synthetic_events(synthetic_event_id(n) for n in range(registered, size))
+            registered = size
+            cycles, summary = [], None
+            betbck_before, swordfish_before = _requests(books.betbck.knobs), _requests(books.swordfish.knobs)
+            for _ in range(args.runs):
+                summary = sweep.run_cycle()
+                cycles.append(summary["seconds"])
+                over_budget = over_budget or bool(summary["over_budget"])
+            betbck_requests = (_requests(books.betbck.knobs) - betbck_before) / args.runs
+            swordfish_requests = (_requests(books.swordfish.knobs) - swordfish_before) / args.runs
+            print(f"{size:6d} events  cycle median {statistics.median(cycles):6.2f}s (max {max(cycles):.2f}s, budget {args.budget:g}s)  "
+                  f"games {summary['matched']}/{summary['games']} matched  markets {summary['markets']}  hits {summary['hits']}  "
+                  f"requests {betbck_requests:.0f} BetBCK, {swordfish_requests:.0f} Swordfish"
+                  + ("  OVER BUDGET" if summary["over_budget"] else ""))
+    finally:
+        parse_pool.stop()
+        books.stop()
+        config_dir.cleanup()
+    if over_budget:
+        sys.exit(f"A sweep cycle ran out of its {args.budget:g}s budget.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+End-to-end load test: synthetic POD alerts -> PODBot server -> local stand-in books -> dashboard.
+
+Starts the BetBCK and Swordfish stand-ins (benchmarks/standin_books.py) in this process,
+launches `python wsgi.py` pointed at them, then fires waves of alerts for new synthetic
+events at /pod_alert while polling /get_active_events_data. Waves are cumulative, so
+each one runs with more events already active.
+
+    python benchmarks/load_alerts.py --steps 5,10,20,40 --concurrency 8 --latency-ms 120 --jitter-ms 40
+    python benchmarks/load_alerts.py --error-rate 0.05 --session-ttl 0.5      # flaky upstream
+    python benchmarks/load_alerts.py --bulk                                   # league-level Pinnacle refreshes
+    python benchmarks/load_alerts.py --filler-pages 3 --parse-workers 4       # parse-heavy pages, parse pool on
+    python benchmarks/load_alerts.py --whole-page                             # read whole search pages, no streaming
+
+Reported per wave:
+    alerts/s        alerts completed per second of wall time
+    response        client-observed /pod_alert latency
+    queueing        response time minus the server's own processing time (Server-Timing header),
+                    i.e. time spent waiting for a worker thread and on the wire
+    alert->display  time from sending an alert until its event first shows up in a dashboard poll
+                    (resolution is --poll-interval)
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from bench_http import percentile  # noqa: E402
+from standin_books import Knobs, StandInBooks, synthetic_event_id, synthetic_matchup, write_scraper_config  # noqa: E402
+
+def _server_timing_ms(response):
+    for part in response.headers.get("Server-Timing", "").split(","):
+        name, _, params = part.strip().partition(";")
+        if name == "app" and params.startswith("dur="):
+            return float(params[4:])
+    return None
+
+class DashboardPoller(threading.Thread):
+    """Polls the dashboard endpoint and remembers when each event id was first served."""
+
+    def __init__(self, base_url, interval):
+        super().__init__(name="dashboard-poller", daemon=True)
+        self.url, self.interval = f"{base_url}/get_active_events_data", interval
+        self.first_seen = {}
+        self.active_count = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        session = requests.Session()
+        while not self._stop_event.is_set():
+            try:
+                events = session.get(self.url, timeout=10).json()
+                now = time.perf_counter()
+                self.active_count = len(events)
+                for event_id in events:
+                    self.first_seen.setdefault(str(event_id), now)
+            except (requests.RequestException, ValueError):
+                pass
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+
+def _alert_payload(event_id):
+    home, away = synthetic_matchup(event_id)
+    return {"eventId": str(event_id), "homeTeam": home, "awayTeam": away, "leagueName": "Stand-in League",
+            "betDescription": f"{home} ML", "oldOdds": "+110", "newOdds": "-105", "noVigPriceFromAlert": "+102"}
+
+def run_wave(base_url, event_ids, concurrency, poller, display_timeout):
+    local = threading.local()
+
+    def send(event_id):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        sent = time.perf_counter()
+        try:
+            response = session.post(f"{base_url}/pod_alert", json=_alert_payload(event_id), timeout=120)
+            ok = response.status_code == 200 and response.json().get("status") == "success"
+            app_ms = _server_timing_ms(response)
+        except (requests.RequestException, ValueError):
+            ok, app_ms = False, None
+        return str(event_id), sent, time.perf_counter(), ok, app_ms
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(send, event_ids))
+    elapsed = time.perf_counter() - start
+
+    ok_ids = {r[0] for r in results if r[3]}
+    deadline = time.perf_counter() + display_timeout
+    while time.perf_counter() < deadline and not ok_ids.issubset(poller.first_seen):
+        time.sleep(poller.interval / 2)
+
+    responses = sorted(r[2] - r[1] for r in results)
+    queueing = sorted(max(0.0, (r[2] - r[1]) - r[4] / 1000.0) for r in results if r[4] is not None)
+    display = sorted(poller.first_seen[r[0]] - r[1] for r in results if r[0] in poller.first_seen)
+    return {
+        "alerts": len(results), "ok": len(ok_ids), "alerts_per_sec": len(results) / elapsed if elapsed else 0.0,
+        "response_p50_ms": percentile(responses, 50) * 1000, "response_p95_ms": percentile(responses, 95) * 1000,
+        "queue_p50_ms": percentile(queueing, 50) * 1000, "queue_p95_ms": percentile(queueing, 95) * 1000,
+        "display_p50_ms": percentile(display, 50) * 1000, "display_p95_ms": percentile(display, 95) * 1000,
+        "not_displayed": len(ok_ids - set(poller.first_seen)),
+    }
+
+def _wait_for_server(base_url, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            requests.get(f"{base_url}/metrics", timeout=2)
+            return True
+        except requests.RequestException:
+            time.sleep(0.2)
+    return False
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", default="5,10,20,40", help="New events per wave (comma separated).")
+    parser.add_argument("--concurrency", type=int, default=8, help="Alerts in flight at once.")
+    parser.add_argument("--poll-interval", type=float, default=0.1, help="Dashboard poll interval in seconds.")
+    parser.add_argument("--display-timeout", type=float, default=30.0)
+    parser.add_argument("--latency-ms", type=float, default=100.0)
+    parser.add_argument("--jitter-ms", type=float, default=30.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--session-ttl", type=float, default=None)
+    parser.add_argument("--rate-limits", default="*=0",
+                        help="PODBOT_RATE_LIMITS for the server. Off by default, so waves measure the server rather than the limits.")
+    parser.add_argument("--filler-pages", type=int, default=0,
+                        help="Put N copies of every recorded BetBCK page in front of each search result (parse load).")
+    parser.add_argument("--parse-workers", type=int, default=0, help="PODBOT_PARSE_WORKERS for the server.")
+    parser.add_argument("--whole-page", action="store_true", help="Set betbck.stream_search_results to false for the server.")
+    parser.add_argument("--bulk", action="store_true",
+                        help="Let the server refresh Pinnacle odds with one Swordfish request per league.")
+    parser.add_argument("--port", type=int, default=5055, help="Port for the PODBot server under test.")
+    parser.add_argument("--server-args", default="--threads 16", help="Extra arguments for wsgi.py.")
+    parser.add_argument("--server-url", help="Use an already running server (it must already point at the stand-ins).")
+    args = parser.parse_args()
+
+    knobs = lambda **extra: Knobs(args.latency_ms, args.jitter_ms, args.error_rate, args.session_ttl, **extra)
+    books = StandInBooks(betbck_knobs=knobs(filler_pages=args.filler_pages), swordfish_knobs=knobs()).start()
+    server_proc, config_dir = None, tempfile.TemporaryDirectory()
+    base_url = args.server_url
+    try:
+        if not base_url:
+            config_path = write_scraper_config(os.path.join(config_dir.name, "config.json"), books.betbck_url,
+                                               stream_search_results=not args.whole_page)
+            env = dict(os.environ, PODBOT_CONFIG_PATH=config_path, PODBOT_SWORDFISH_URL=books.swordfish_url,
+                       PODBOT_LOG_LEVEL=os.environ.get("PODBOT_LOG_LEVEL", "WARNING"), PODBOT_STATE_BACKEND="memory",
+                       PODBOT_RATE_LIMITS=args.rate_limits, PODBOT_SWORDFISH_BULK_URL=books.swordfish_bulk_url if args.bulk else "",
+                       PODBOT_PARSE_WORKERS=str(args.parse_workers))
+            server_proc = subprocess.Popen([sys.executable, os.path.join(REPO_DIR, "wsgi.py"), "--host", "127.0.0.1",
+                                            "--port", str(args.port)] + args.server_args.split(), env=env, cwd=REPO_DIR)
+            base_url = f"http://127.0.0.1:{args.port}"
+        if not _wait_for_server(base_url):
+            sys.exit(f"Server at {base_url} did not come up.")
+
+        print(f"Stand-ins: BetBCK {books.betbck_url}  Swordfish {books.swordfish_url}  "
+              f"latency={args.latency_ms}ms jitter={args.jitter_ms}ms errors={args.error_rate:.0%} session_ttl={args.session_ttl}")
+        print(f"{'wave':>4} {'new':>4} {'active':>6} {'ok':>4} {'alerts/s':>8} {'resp p50/p95 ms':>17} "
+              f"{'queue p50/p95 ms':>17} {'display p50/p95 ms':>19} {'missing':>7}")
+        poller = DashboardPoller(base_url, args.poll_interval)
+        poller.start()
+        next_id = 0
+        for wave, count in enumerate(int(s) for s in args.steps.split(",")):
+            event_ids = [synthetic_event_id(n) for n in range(next_id, next_id + count)]
+            next_id += count
+            books.register_synthetic_events(event_ids)
+            r = run_wave(base_url, event_ids, args.concurrency, poller, args.display_timeout)
+            print(f"{wave + 1:>4} {count:>4} {poller.active_count:>6} {r['ok']:>4} {r['alerts_per_sec']:>8.2f} "
+                  f"{r['response_p50_ms']:>8.0f}/{r['response_p95_ms']:<8.0f} {r['queue_p50_ms']:>8.1f}/{r['queue_p95_ms']:<8.1f} "
+                  f"{r['display_p50_ms']:>9.0f}/{r['display_p95_ms']:<9.0f} {r['not_displayed']:>7}", flush=True)
+        poller.stop()
+        print(f"Upstream requests: BetBCK {books.betbck.knobs.as_dict()['requests']}")
+        print(f"                   Swordfish {books.swordfish.knobs.as_dict()['requests']}")
+    finally:
+        if server_proc:
+            server_proc.terminate()
+            try:
+                server_proc.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                server_proc.kill()
+        books.stop()
+        config_dir.cleanup()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""
+Replays captured production traffic (traffic_capture.py) through a local PODBot server.
+
+Capture first, by running the server with PODBOT_CAPTURE_DIR set. Then:
+
+    python benchmarks/replay_capture.py capture_dir/                     # real time
+    python benchmarks/replay_capture.py capture_dir/ --speed 10          # ten times faster
+    python benchmarks/replay_capture.py capture_dir/ --speed 10 --save replay.json
+    python benchmarks/replay_capture.py capture_dir/ --speed 10 --compare replay.json
+
+The stand-in books (benchmarks/standin_books.py) answer from the capture. Swordfish returns the
+event's captured response whose request was sent closest to the replay clock, so refreshes see
+the odds move as they did. BetBCK does the same per search keyword, and falls back to the
+stand-in's own pages for keywords that were never captured. Each answer is delayed by the
+captured upstream time divided by --speed (--upstream-latency-ms sets a fixed delay instead).
+
+The server runs with PODBOT_CLOCK_SPEED=--speed, so its background refreshes and event expiry
+keep pace with the replay clock. Alerts and alert batches are sent at their captured offsets
+divided by --speed. The same capture, speed and commit give the same request stream. That makes
+the run repeatable enough to compare commits and bisect a regression.
+
+Reported: alerts/s, /pod_alert response and queueing latency (as in load_alerts.py),
+alert->display latency, how late alerts were sent (the replay client falling behind), and
+upstream request counts. --compare prints the change against a saved run.
+"""
+import argparse
+import bisect
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from bench_http import percentile  # noqa: E402
+from load_alerts import DashboardPoller, _server_timing_ms, _wait_for_server  # noqa: E402
+from standin_books import Knobs, StandInBooks, write_scraper_config  # noqa: E402
+from traffic_capture import load_capture  # noqa: E402
+
+# Summary keys where a larger value is worse, for --compare.
+_LOWER_IS_BETTER = ("response_p50_ms", "response_p95_ms", "response_p99_ms", "queue_p95_ms", "display_p50_ms",
+                    "display_p95_ms", "send_lag_p95_ms")
+
+class ReplayClock:
+    """Capture time that corresponds to now: starts at `origin` and runs `speed` times faster than the wall clock."""
+
+    def __init__(self, origin, speed):
+        self.origin, self.speed = origin, speed
+        self.started = time.perf_counter()
+
+    def now(self):
+        return self.origin + (time.perf_counter() - self.started) * self.speed
+
+    def wall_delay(self, capture_time):
+        """Seconds of wall time until the replay clock reaches `capture_time`."""
+        return (capture_time - self.origin) / self.speed - (time.perf_counter() - self.started)
+
+class _Timeline:
+    """Captured answers for one key, by the time their request was sent."""
+
+    def __init__(self):
+        self.times, self.answers = [], []
+
+    def add(self, record, answer):
+        # Records are written when the answer arrived; its request went out "ms" earlier.
+        sent = record["t"] - record.get("ms", 0.0) / 1000.0
+        i = bisect.bisect_right(self.times, sent)
+        self.times.insert(i, sent)
+        self.answers.insert(i, answer)
+
+    def at(self, t):
+        """The answer whose request was sent closest to `t`. Several alerts can share a BetBCK keyword and each
+        captured page only has the games listed when it was fetched, so the nearest fetch is the one to replay."""
+        i = bisect.bisect_left(self.times, t)
+        if i == len(self.times) or (i > 0 and t - self.times[i - 1] <= self.times[i] - t):
+            i -= 1
+        return self.answers[i]
+
+class CapturedUpstream:
+    """Serves Swordfish responses and BetBCK search pages from a capture, through the stand-ins."""
+
+    def __init__(self, records, clock, fixed_latency_ms=None):
+        self.clock, self.fixed_latency_ms = clock, fixed_latency_ms
+        self.swordfish, self.searches = {}, {}
+        for r in records:
+            if r["kind"] == "swordfish":
+                self.swordfish.setdefault(r["event_id"], _Timeline()).add(r, (r["status"], r["body"], r.get("ms", 0.0)))
+            elif r["kind"] == "betbck_search":
+                self.searches.setdefault(r["keyword"].lower().strip(), _Timeline()).add(r, (r["html"], r.get("ms", 0.0)))
+
+    def _delay(self, captured_ms):
+        ms = captured_ms / self.clock.speed if self.fixed_latency_ms is None else self.fixed_latency_ms
+        if ms > 0:
+            time.sleep(ms / 1000.0)
+
+    def install(self, books):
+        default_lookup, default_search = books.swordfish.lookup, books.betbck.search
+
+        def lookup(event_id):
+            timeline = self.swordfish.get(event_id)
+            if timeline is None:
+                return default_lookup(event_id)
+            status, body, ms = timeline.at(self.clock.now())
+            self._delay(ms)
+            return status, body
+
+        def search(keyword):
+            timeline = self.searches.get(keyword.lower().strip())
+            if timeline is None:
+                return default_search(keyword)
+            html, ms = timeline.at(self.clock.now())
+            self._delay(ms)
+            return html
+
+        books.swordfish.lookup, books.betbck.search = lookup, search
+
+def replay(base_url, records, clock, concurrency, poller, display_timeout):
+    inbound = [r for r in records if r["kind"] in ("alert", "alert_batch")]  # not sweep_hit: the replayed server sweeps for itself
+    local = threading.local()
+
+    def send(record):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        lag = max(0.0, -clock.wall_delay(record["t"]))
+        sent = time.perf_counter()
+        try:
+            if record["kind"] == "alert":
+                response = session.post(f"{base_url}/pod_alert", json=record["payload"], timeout=120)
+                ok_ids = [str(record["payload"].get("eventId"))] if response.json().get("status") == "success" else []
+            else:
+                response = session.post(f"{base_url}/pod_alert_batch", json=record["alerts"], timeout=300)
+                ok_ids = [r["eventId"] for r in response.json().get("results", []) if r.get("status") == "success"]
+            ok = response.status_code == 200
+            app_ms = _server_timing_ms(response)
+        except (requests.RequestException, ValueError):
+            ok, ok_ids, app_ms = False, [], None
+        return sent, time.perf_counter(), ok, ok_ids, app_ms, lag
+
+    start = time.perf_counter()
+    futures = []
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for record in inbound:
+            delay = clock.wall_delay(record["t"])
+            if delay > 0:
+                time.sleep(delay)
+            futures.append(pool.submit(send, record))
+        results = [f.result() for f in futures]
+    elapsed = time.perf_counter() - start
+
+    ok_ids = {(event_id, r[0]) for r in results for event_id in r[3]}
+    deadline = time.perf_counter() + display_timeout
+    while time.perf_counter() < deadline and not {e for e, _ in ok_ids}.issubset(poller.first_seen):
+        time.sleep(poller.interval / 2)
+
+    responses = sorted(r[1] - r[0] for r in results)
+    queueing = sorted(max(0.0, (r[1] - r[0]) - r[4] / 1000.0) for r in results if r[4] is not None)
+    # An event already on the dashboard before this request was sent (a repeat alert) has no display latency.
+    display = sorted(poller.first_seen[e] - sent for e, sent in ok_ids if poller.first_seen.get(e, 0) >= sent)
+    lags = sorted(r[5] for r in results)
+    return {
+        "requests": len(results), "ok": sum(1 for r in results if r[2]), "events": len({e for e, _ in ok_ids}),
+        "seconds": elapsed, "requests_per_sec": len(results) / elapsed if elapsed else 0.0,
+        "response_p50_ms": percentile(responses, 50) * 1000, "response_p95_ms": percentile(responses, 95) * 1000,
+        "response_p99_ms": percentile(responses, 99) * 1000,
+        "queue_p50_ms": percentile(queueing, 50) * 1000, "queue_p95_ms": percentile(queueing, 95) * 1000,
+        "display_p50_ms": percentile(display, 50) * 1000, "display_p95_ms": percentile(display, 95) * 1000,
+        "send_lag_p95_ms": percentile(lags, 95) * 1000,
+        "not_displayed": len({e for e, _ in ok_ids} - set(poller.first_seen)),
+    }
+
+def print_comparison(summary, baseline):
+    print("\nAgainst baseline:")
+    for key in _LOWER_IS_BETTER + ("requests_per_sec",):
+        old, new = baseline.get(key), summary.get(key)
+        if old and new is not None:
+            change = (new - old) / old
+            worse = change > 0 if key in _LOWER_IS_BETTER else change < 0
+            print(f"  {key:<18} {old:10.1f} -> {new:10.1f}  {change:+7.1%}{'  worse' if worse and abs(change) >= 0.1 else ''}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("capture", help="Capture directory (PODBOT_CAPTURE_DIR) or one capture-*.jsonl file.")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay clock speed (1 = real time).")
+    parser.add_argument("--upstream-latency-ms", type=float, default=None,
+                        help="Fixed stand-in latency instead of the captured upstream time / speed.")
+    parser.add_argument("--concurrency", type=int, default=16, help="Most alert requests in flight at once.")
+    parser.add_argument("--poll-interval", type=float, default=0.1, help="Dashboard poll interval in seconds.")
+    parser.add_argument("--display-timeout", type=float, default=30.0)
+    parser.add_argument("--port", type=int, default=5056, help="Port for the PODBot server under test.")
+    parser.add_argument("--server-args", default="--threads 16", help="Extra arguments for wsgi.py.")
+    parser.add_argument("--save", metavar="PATH", help="Write the summary as JSON.")
+    parser.add_argument("--compare", metavar="PATH", help="Compare with a summary saved by --save.")
+    args = parser.parse_args()
+
+    records = load_capture(args.capture)
+    if not any(r["kind"] in ("alert", "alert_batch") for r in records):
+        sys.exit(f"No captured alerts in {args.capture}.")
+    books = StandInBooks(betbck_knobs=Knobs(), swordfish_knobs=Knobs())
+    # The clock is restarted once the server is up, so the first captured record lines up with the first request.
+    upstream = CapturedUpstream(records, ReplayClock(records[0]["t"], args.speed), args.upstream_latency_ms)
+    upstream.install(books)
+    books.start()
+    server_proc, config_dir = None, tempfile.TemporaryDirectory()
+    try:
+        config_path = write_scraper_config(os.path.join(config_dir.name, "config.json"), books.betbck_url)
+        env = dict(os.environ, PODBOT_CONFIG_PATH=config_path, PODBOT_SWORDFISH_URL=books.swordfish_url,
+                   PODBOT_LOG_LEVEL=os.environ.get("PODBOT_LOG_LEVEL", "WARNING"), PODBOT_STATE_BACKEND="memory",
+                   PODBOT_RATE_LIMITS="*=0", PODBOT_CLOCK_SPEED=str(args.speed), PODBOT_CAPTURE_DIR="",
+                   PODBOT_PRICE_HISTORY_DIR="", PODBOT_SWORDFISH_BULK_URL="")
+        base_url = f"http://127.0.0.1:{args.port}"
+        server_proc = subprocess.Popen([sys.executable, os.path.join(REPO_DIR, "wsgi.py"), "--host", "127.0.0.1",
+                                        "--port", str(args.port)] + args.server_args.split(), env=env, cwd=REPO_DIR)
+        if not _wait_for_server(base_url):
+            sys.exit(f"Server at {base_url} did not come up.")
+
+        span = records[-1]["t"] - records[0]["t"]
+        print(f"Replaying {len(records)} records ({span:.0f}s captured) at {args.speed:g}x, about {span / args.speed:.0f}s")
+        poller = DashboardPoller(base_url, args.poll_interval)
+        poller.start()
+        upstream.clock = ReplayClock(records[0]["t"], args.speed)
+        summary = replay(base_url, records, upstream.clock, args.concurrency, poller, args.display_timeout)
+        poller.stop()
+        summary.update(speed=args.speed, upstream={"betbck": books.betbck.knobs.as_dict()["requests"],
+                                                   "swordfish": books.swordfish.knobs.as_dict()["requests"]})
+        print(f"{summary['requests']} requests ({summary['ok']} ok, {summary['events']} events) in {summary['seconds']:.1f}s, "
+              f"{summary['requests_per_sec']:.2f}/s")
+        print(f"response p50/p95/p99 {summary['response_p50_ms']:.0f}/{summary['response_p95_ms']:.0f}/{summary['response_p99_ms']:.0f} ms  "
+              f"queue p50/p95 {summary['queue_p50_ms']:.1f}/{summary['queue_p95_ms']:.1f} ms")
+        print(f"alert->display p50/p95 {summary['display_p50_ms']:.0f}/{summary['display_p95_ms']:.0f} ms  "
+              f"not displayed {summary['not_displayed']}  send lag p95 {summary['send_lag_p95_ms']:.0f} ms")
+        print(f"Upstream requests: BetBCK {summary['upstream']['betbck']}")
+        print(f"                   Swordfish {summary['upstream']['swordfish']}")
+        if args.save:
+            with open(args.save, "w", encoding="utf-8") as f:
+                json.dump(summary, f, indent=2)
+        if args.compare:
+            with open(args.compare, encoding="utf-8") as f:
+                print_comparison(summary, json.load(f))
+    finally:
+        if server_proc:
+            server_proc.terminate()
+            try:
+                server_proc.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                server_proc.kill()
+        books.stop()
+        config_dir.cleanup()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,422 @@
+"""
+Local stand-ins for BetBCK and the Swordfish API, for load tests that must not touch the real books.
+
+    python benchmarks/standin_books.py --betbck-port 8801 --swordfish-port 8802 \\
+        --latency-ms 150 --jitter-ms 50 --error-rate 0.02 --session-ttl 60
+
+BetBCK stand-in (paths match config.json, so only the host changes):
+    GET  /                                      login page
+    POST /Qubic/SecurityPage.php                sets a session cookie, redirects to the sport selection page
+    GET  /Qubic/StraightLoginSportSelection.php landing page after login ("Logout" link)
+    GET  /Qubic/StraightSportSelection.php      search form with inetWagerNumber
+    POST /Qubic/PlayerGameSelection.php         search results for keyword_search
+
+Swordfish stand-in:
+    GET  /events/<id>                           event JSON
+    GET  /events?league=<name>                  every known event of the league (bulk fetch), as a list
+
+Search results are the recorded pages in benchmarks/fixtures whose games contain the keyword,
+plus a generated table for every synthetic event (see synthetic_matchup) whose team names
+contain it. Swordfish serves the recorded event JSON for recorded event ids and derives one
+for any other id. Expired or missing sessions get the login page back, like the real site.
+
+Both servers expose GET /__control (knobs and request counts) and POST /__control with a
+JSON body to change the knobs while running (latency_ms, jitter_ms, error_rate, session_ttl,
+filler_pages). With filler_pages=N every BetBCK search result starts with N copies of every
+recorded page's games, so the parser has to work through them first.
+
+Use write_scraper_config() and the PODBOT_CONFIG_PATH / PODBOT_SWORDFISH_URL (and optionally
+PODBOT_SWORDFISH_BULK_URL, see StandInBooks.swordfish_bulk_url) environment variables to point the PODBot server at these stand-ins (benchmarks/load_alerts.py does this).
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+FIXTURE_DIR = os.path.join(BENCH_DIR, "fixtures")
+
+SYNTHETIC_EVENT_ID_BASE = 7_000_000_000
+_CITIES = ["Harbor", "Granite", "Redwood", "Ironvale", "Lakeside", "Summit", "Westfield", "Oakridge", "Stonebridge",
+           "Maplewood", "Riverton", "Ashford", "Brookhaven", "Clearwater", "Eastport", "Foxborough", "Glenwood",
+           "Highland", "Kingsport", "Northgate"]
+_MASCOTS = ["Falcons", "Wolves", "Comets", "Pioneers", "Stallions", "Hornets", "Raptors", "Mariners", "Badgers",
+            "Vipers", "Titans", "Rangers", "Bison", "Ospreys", "Knights", "Coyotes", "Herons", "Panthers",
+            "Jaguars", "Mustangs"]
+
+def synthetic_event_id(n):
+    return SYNTHETIC_EVENT_ID_BASE + n
+
+def synthetic_matchup(event_id):
+    """Deterministic (home, away) team names for a synthetic event id."""
+    k = int(event_id) - SYNTHETIC_EVENT_ID_BASE
+    n = len(_CITIES)
+    home = f"{_CITIES[k % n]} {_MASCOTS[(k // n) % n]}"
+    away = f"{_CITIES[(k + 7) % n]} {_MASCOTS[(k // n + k // (n * n) + 11) % n]}"  # pairs repeat only after n**3 events
+    return home, away
+
+def _is_synthetic(event_id):
+    return str(event_id).isdigit() and SYNTHETIC_EVENT_ID_BASE <= int(event_id) < SYNTHETIC_EVENT_ID_BASE + 1_000_000
+
+def _american(decimal_odds):
+    return f"+{round((decimal_odds - 1) * 100)}" if decimal_odds >= 2 else f"-{round(100 / (decimal_odds - 1))}"
+
+def _synthetic_prices(event_id):
+    rng = random.Random(int(event_id))
+    home = round(rng.uniform(1.7, 2.3), 3)
+    away = round(1 / max(0.05, 1.045 - 1 / home), 3)
+    return {"ml": (home, away), "hdp": rng.choice([-1.5, -1, -0.5, 0.5, 1]), "points": rng.choice([2.5, 3, 8.5, 214.5]),
+            "spread": (round(rng.uniform(1.85, 2.05), 3), round(rng.uniform(1.85, 2.05), 3)),
+            "total": (round(rng.uniform(1.85, 2.05), 3), round(rng.uniform(1.85, 2.05), 3))}
+
+def synthetic_swordfish_event(event_id):
+    home, away = synthetic_matchup(event_id)
+    p = _synthetic_prices(event_id)
+    hdp, points = p["hdp"], p["points"]
+    period = {
+        "money_line": {"home": p["ml"][0], "away": p["ml"][1]},
+        "spreads": {f"{hdp:g}": {"hdp": hdp, "home": p["spread"][0], "away": p["spread"][1], "max": 2000}},
+        "totals": {f"{points:g}": {"points": points, "over": p["total"][0], "under": p["total"][1], "max": 1500}},
+    }
+    return {"data": {"event_id": int(event_id), "home": home, "away": away, "league_name": "Stand-in League",
+                     "starts": time.strftime("%Y-%m-%d %H:%M", time.gmtime(time.time() + 3 * 3600)),
+                     "periods": {"num_0": period}}}
+
+def _cell(inner):
+    return f'<td class="tbl_betAmount_td">{inner}<input type="text" class="bet_amount" value="" maxlength="7"/></td>'
+
+def synthetic_game_table(event_id):
+    """One BetBCK game wrapper table for a synthetic event, priced slightly off the Swordfish stand-in."""
+    home, away = synthetic_matchup(event_id)
+    p = _synthetic_prices(event_id)
+    hdp, points = p["hdp"], p["points"]
+    bump = 1.02 if int(event_id) % 3 == 0 else 0.97  # every third event shows a small edge at BetBCK
+    ml_h, ml_a = _american(p["ml"][0] * bump), _american(p["ml"][1] * 0.97)
+    sp_h, sp_a = _american(p["spread"][0] * bump), _american(p["spread"][1] * 0.97)
+    to_o, to_u = _american(p["total"][0] * bump), _american(p["total"][1] * 0.97)
+    fmt_line = lambda v: "pk" if v == 0 else f"{v:+g}"
+    rows = (f"<tr>{_cell(f'<select><option selected>{fmt_line(hdp)} {sp_h}</option></select>')}{_cell(ml_h)}"
+            f"{_cell(f'<select><option selected>o{points:g} {to_o}</option></select>')}</tr>"
+            f"<tr>{_cell(f'<select><option selected>{fmt_line(-hdp)} {sp_a}</option></select>')}{_cell(ml_a)}"
+            f"{_cell(f'<select><option selected>u{points:g} {to_u}</option></select>')}</tr>")
+    return ('<table class="table_container_betting Soccer"><tr><td class="tbl_betAmount_team1_main_name">'
+            f'<div class="team1_name_up"><span class="game_number_local">{event_id % 10000}</span><span data-language="h">{home}</span></div>'
+            f'<div class="team2_name_down"><span class="game_number_visitor">{event_id % 10000 + 1}</span><span data-language="a">{away}</span></div>'
+            f'</td><td><table class="new_tb_cont"><tbody>{rows}</tbody></table></td></tr></table>\n')
+
+_LOGIN_PAGE = ('<html><body><form action="/Qubic/SecurityPage.php" method="post"><input name="customerID"/>'
+               '<input name="password" type="password"/></form></body></html>')
+_LANDING_PAGE = '<html><body><a href="/Qubic/Logout.php">Logout</a><a href="/Qubic/StraightSportSelection.php">Sports</a></body></html>'
+_SEARCH_FORM = ('<html><body><a href="/Qubic/Logout.php">Logout</a><form name="SportSelection" method="post" action="PlayerGameSelection.php">'
+                '<input type="hidden" id="inetWagerNumber" name="inetWagerNumber" value="{wager}"/>'
+                '<input type="hidden" id="inetSportSelection" name="inetSportSelection" value="sport"/>'
+                '<input type="text" name="keyword_search"/></form></body></html>')
+_RESULTS_HEAD = ('<html><body><a href="/Qubic/Logout.php">Logout</a>'
+                 '<form name="GameSelectionForm" id="GameSelectionForm" method="post" action="PlayerGameSelection.php">')
+_RESULTS_TAIL = '</form></body></html>'
+_TEAM_SPAN = re.compile(r'<span data-language="[^"]*">([^<]+)</span>')
+
+class Knobs:
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, session_ttl=None, filler_pages=0):
+        self.latency_ms, self.jitter_ms, self.error_rate, self.session_ttl = latency_ms, jitter_ms, error_rate, session_ttl
+        self.filler_pages = filler_pages
+        self.lock = threading.Lock()
+        self.requests = {}
+
+    def as_dict(self):
+        with self.lock:
+            return {"latency_ms": self.latency_ms, "jitter_ms": self.jitter_ms, "error_rate": self.error_rate,
+                    "session_ttl": self.session_ttl, "filler_pages": self.filler_pages, "requests": dict(self.requests)}
+
+    def update(self, values):
+        with self.lock:
+            for key in ("latency_ms", "jitter_ms", "error_rate", "session_ttl", "filler_pages"):
+                if key in values:
+                    setattr(self, key, values[key])
+
+    def count(self, key):
+        with self.lock:
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    knobs = None  # set per server class
+
+    def log_message(self, fmt, *args):
+        pass
+
+    def _send(self, status, body, content_type="text/html; charset=utf-8", headers=None):
+        data = body.encode("utf-8") if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _control(self):
+        if self.command == "POST":
+            self.knobs.update(json.loads(self._read_body() or b"{}"))
+        self._send(200, json.dumps(self.knobs.as_dict()), "application/json")
+
+    def _delay_or_fail(self, key):
+        """Applies latency/jitter and the error rate. Returns True if an error response was sent."""
+        knobs = self.knobs
+        knobs.count(key)
+        delay = max(0.0, knobs.latency_ms + random.uniform(-knobs.jitter_ms, knobs.jitter_ms)) / 1000.0
+        if delay:
+            time.sleep(delay)
+        if knobs.error_rate and random.random() < knobs.error_rate:
+            knobs.count("errors")
+            self._send(503, "<html><body>Service Unavailable</body></html>")
+            return True
+        return False
+
+class BetbckStandIn(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, knobs, recorded_pages):
+        self.knobs = knobs
+        self.recorded_pages = recorded_pages  # [(html, [team names])]
+        self.sessions = {}
+        self.sessions_lock = threading.Lock()
+        self.synthetic_events = set()
+        handler = type("BetbckHandler", (_BetbckHandler,), {"knobs": knobs})
+        super().__init__(address, handler)
+
+    def handle_error(self, request, client_address):
+        # The scraper hangs up mid-page once its streaming parse has found the game.
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def session_valid(self, token):
+        with self.sessions_lock:
+            created = self.sessions.get(token)
+        ttl = self.knobs.session_ttl
+        return created is not None and (not ttl or time.time() - created < ttl)
+
+    def new_session(self):
+        token = uuid.uuid4().hex
+        with self.sessions_lock:
+            self.sessions[token] = time.time()
+        return token
+
+    def search(self, keyword):
+        keyword = keyword.lower().strip()
+        parts = [_page_games(html) for html, _ in self.recorded_pages] * self.knobs.filler_pages
+        for html, teams in self.recorded_pages:
+            if keyword and any(keyword in team.lower() for team in teams):
+                parts.append(_page_games(html))
+        for event_id in sorted(self.synthetic_events):
+            if keyword and any(keyword in team.lower() for team in synthetic_matchup(event_id)):
+                parts.append(synthetic_game_table(event_id))
+        return _RESULTS_HEAD + "".join(parts) + _RESULTS_TAIL
+
+def _page_games(html):
+    start, end = html.find('id="GameSelectionForm"'), html.rfind("</form>")
+    return html[html.find(">", start) + 1:end] if start != -1 and end != -1 else html
+
+class _BetbckHandler(_StandInHandler):
+    def _session_token(self):
+        for part in (self.headers.get("Cookie") or "").split(";"):
+            name, _, value = part.strip().partition("=")
+            if name == "PHPSESSID":
+                return value
+        return None
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/__control":
+            return self._control()
+        if self._delay_or_fail(f"GET {path}"):
+            return
+        if path == "/":
+            return self._send(200, _LOGIN_PAGE)
+        if not self.server.session_valid(self._session_token()):
+            self.knobs.count("expired_session")
+            return self._send(200, _LOGIN_PAGE)
+        if path == "/Qubic/StraightLoginSportSelection.php":
+            return self._send(200, _LANDING_PAGE)
+        if path == "/Qubic/StraightSportSelection.php":
+            return self._send(200, _SEARCH_FORM.format(wager=round(random.random(), 7)))
+        self._send(404, "not found")
+
+    def do_POST(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/__control":
+            return self._control()
+        form = {k: v[0] for k, v in parse_qs(self._read_body().decode("utf-8", "replace")).items()}
+        if self._delay_or_fail(f"POST {path}"):
+            return
+        if path == "/Qubic/SecurityPage.php":
+            if not form.get("customerID") or not form.get("password"):
+                return self._send(200, _LOGIN_PAGE.replace("<form", "<p>Invalid User</p><form"))
+            token = self.server.new_session()
+            return self._send(302, "", headers={"Location": "/Qubic/StraightLoginSportSelection.php",
+                                                "Set-Cookie": f"PHPSESSID={token}; Path=/"})
+        if path == "/Qubic/PlayerGameSelection.php":
+            if not self.server.session_valid(self._session_token()):
+                self.knobs.count("expired_session")
+                return self._send(200, _LOGIN_PAGE)
+            return self._send(200, self.server.search(form.get("keyword_search", "")))
+        self._send(404, "not found")
+
+class SwordfishStandIn(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, knobs, recorded_events):
+        self.knobs = knobs
+        self.recorded_events = recorded_events  # {event_id str: json}
+        self.synthetic_events = set()  # registered synthetic ids, listed by league lookups
+        handler = type("SwordfishHandler", (_SwordfishHandler,), {"knobs": knobs})
+        super().__init__(address, handler)
+
+    def lookup(self, event_id):
+        """(status, JSON body) for GET /events/<event_id>."""
+        event = self.recorded_events.get(event_id)
+        if event is None and _is_synthetic(event_id):
+            event = synthetic_swordfish_event(event_id)
+        if event is None:
+            return 404, json.dumps({"error": "unknown event"})
+        return 200, json.dumps(event)
+
+    def league(self, league_name):
+        """(status, JSON body) for GET /events?league=<name>: every known event of the league, as a list."""
+        events = [e for e in self.recorded_events.values() if e["data"].get("league_name") == league_name]
+        events += [e for e in map(synthetic_swordfish_event, sorted(self.synthetic_events)) if e["data"]["league_name"] == league_name]
+        return 200, json.dumps(events)
+
+class _SwordfishHandler(_StandInHandler):
+    def do_GET(self):
+        path, _, query = self.path.partition("?")
+        if path == "/__control":
+            return self._control()
+        league = parse_qs(query).get("league")
+        if path.rstrip("/") == "/events" and league:
+            if self._delay_or_fail("GET /events?league"):
+                return
+            return self._send(*self.server.league(league[0]), "application/json")
+        if self._delay_or_fail("GET /events"):
+            return
+        m = re.fullmatch(r"/events/(\d+)", path)
+        if not m:
+            return self._send(404, json.dumps({"error": "not found"}), "application/json")
+        status, body = self.server.lookup(m.group(1))
+        self._send(status, body, "application/json")
+
+    def do_POST(self):
+        if self.path.split("?", 1)[0] == "/__control":
+            return self._control()
+        self._send(404, "not found")
+
+def load_recorded(fixture_dir=FIXTURE_DIR):
+    with open(os.path.join(fixture_dir, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    pages, events = [], {}
+    for entry in manifest:
+        with open(os.path.join(fixture_dir, "betbck", entry["file"]), encoding="utf-8") as f:
+            html = f.read()
+        pages.append((html, _TEAM_SPAN.findall(html)))
+        if entry.get("swordfish"):
+            with open(os.path.join(fixture_dir, "swordfish", entry["swordfish"]), encoding="utf-8") as f:
+                event = json.load(f)
+            events[str(event["data"]["event_id"])] = event
+    return pages, events
+
+class StandInBooks:
+    """Runs both stand-ins on background threads."""
+
+    def __init__(self, host="127.0.0.1", betbck_port=0, swordfish_port=0, betbck_knobs=None, swordfish_knobs=None):
+        pages, events = load_recorded()
+        self.betbck = BetbckStandIn((host, betbck_port), betbck_knobs or Knobs(), pages)
+        self.swordfish = SwordfishStandIn((host, swordfish_port), swordfish_knobs or Knobs(), events)
+        self.host = host
+        self._threads = []
+
+    @property
+    def betbck_url(self):
+        return f"http://{self.host}:{self.betbck.server_address[1]}"
+
+    @property
+    def swordfish_url(self):
+        return f"http://{self.host}:{self.swordfish.server_address[1]}/events/"
+
+    @property
+    def swordfish_bulk_url(self):
+        return f"http://{self.host}:{self.swordfish.server_address[1]}/events?league={{league}}"
+
+    def register_synthetic_events(self, event_ids):
+        event_ids = [int(e) for e in event_ids]
+        self.betbck.synthetic_events.update(event_ids)
+        self.swordfish.synthetic_events.update(event_ids)
+
+    def start(self):
+        for server in (self.betbck, self.swordfish):
+            thread = threading.Thread(target=server.serve_forever, name=type(server).__name__, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        for server in (self.betbck, self.swordfish):
+            server.shutdown()
+            server.server_close()
+
+def write_scraper_config(path, betbck_url, base_config_path=os.path.join(REPO_DIR, "config.json"), stream_search_results=None):
+    """Writes a copy of config.json with every BetBCK URL pointed at the stand-in (and stream_search_results, if given)."""
+    with open(base_config_path, encoding="utf-8") as f:
+        config = json.load(f)
+    betbck = config.setdefault("betbck", {})
+    for key in ("login_page_url", "login_action_url", "main_page_url_after_login", "search_action_url"):
+        if betbck.get(key):
+            betbck[key] = re.sub(r"^https?://[^/]+", betbck_url, betbck[key])
+    if stream_search_results is not None:
+        betbck["stream_search_results"] = stream_search_results
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=2)
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--betbck-port", type=int, default=8801)
+    parser.add_argument("--swordfish-port", type=int, default=8802)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Added to every response (both books).")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform +/- jitter around the latency.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503.")
+    parser.add_argument("--session-ttl", type=float, default=None, help="Seconds before a BetBCK session expires.")
+    parser.add_argument("--synthetic-events", type=int, default=200, help="Synthetic events searchable at BetBCK.")
+    parser.add_argument("--write-config", metavar="PATH", help="Also write a scraper config pointing at the stand-in.")
+    args = parser.parse_args()
+
+    knobs = lambda: Knobs(args.latency_ms, args.jitter_ms, args.error_rate, args.session_ttl)
+    books = StandInBooks(args.host, args.betbck_port, args.swordfish_port, knobs(), knobs())
+    books.register_synthetic_events(synthetic_event_id(n) for n in range(args.synthetic_events))
+    books.start()
+    if args.write_config:
+        write_scraper_config(args.write_config, books.betbck_url)
+        print(f"Scraper config written to {args.write_config}")
+    print(f"BetBCK stand-in:    {books.betbck_url}")
+    print(f"Swordfish stand-in: {books.swordfish_url}")
+    print(f"Point the server at them with PODBOT_CONFIG_PATH=<config> PODBOT_SWORDFISH_URL={books.swordfish_url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        books.stop()
+
+if __name__ == "__main__":
+    main()
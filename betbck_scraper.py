@@ -1,117 +1,129 @@
 import requests
-from bs4 import BeautifulSoup
 import json
+import logging
 import re
 import os
+import threading
 import time
+from collections import OrderedDict
+from metrics import counter, observe_stage, stage_timer, timed_stage
+from parse_pool import run as run_parse
+from podbot_config import current as current_config
+from podbot_logging import get_logger, sample_every
+from rate_limit import DeadlineExceeded, wait_for_slot
+from sportsbooks import SportsbookAdapter, market_record, register_adapter
+from traffic_capture import capture, capturing
 from utils import normalize_team_name_for_matching
 
-# Attempt to import fuzzywuzzy for robust team matching
-try:
-    from fuzzywuzzy import fuzz
-    FUZZY_MATCH_THRESHOLD = 70  # Threshold for team name matching (0-100) - Adjust cautiously
-    print("[BetbckScraper] fuzzywuzzy library loaded.")
-except ImportError:
-    print("[BetbckScraper] WARNING: fuzzywuzzy library not found. Team matching will rely on more exact normalization.")
-    fuzz = None
-    FUZZY_MATCH_THRESHOLD = 101 # Effectively disables fuzzy matching
-
-# --- Configuration Loading ---
-SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-CONFIG_FILE_PATH = os.path.join(SCRIPT_DIR, 'config.json')
-DEFAULT_GAME_WRAPPER_PRIMARY_CLASSES = [
-    'table_container_betting Soccer', 'table_container_betting Baseball',
-    'table_container_betting Basketball', 'table_container_betting Hockey',
-    'table_container_betting American Football', 'table_container_betting Tennis'
-]
-DEFAULT_GAME_WRAPPER_FALLBACK_CLASSES = ['teams_betting_options_2', 'teams_betting_options']
-
-try:
-    with open(CONFIG_FILE_PATH, 'r') as f:
-        config = json.load(f)
-    betbck_config = config.get('betbck', {}) 
-    LOGIN_PAYLOAD_TEMPLATE = betbck_config.get('credentials')
-    BASE_HEADERS = betbck_config.get('headers', {}).copy()
-    LOGIN_PAGE_URL = betbck_config.get('login_page_url')
-    LOGIN_ACTION_URL = betbck_config.get('login_action_url')
-    MAIN_PAGE_URL_AFTER_LOGIN = betbck_config.get('main_page_url_after_login')
-    SEARCH_ACTION_URL = betbck_config.get('search_action_url', "https://betbck.com/Qubic/PlayerGameSelection.php") 
-    GAME_WRAPPER_PRIMARY_CLASSES = betbck_config.get('game_wrapper_primary_classes', DEFAULT_GAME_WRAPPER_PRIMARY_CLASSES)
-    GAME_WRAPPER_FALLBACK_CLASSES = betbck_config.get('game_wrapper_fallback_classes', DEFAULT_GAME_WRAPPER_FALLBACK_CLASSES)
-
-    if not all([LOGIN_PAYLOAD_TEMPLATE, LOGIN_PAGE_URL, LOGIN_ACTION_URL, MAIN_PAGE_URL_AFTER_LOGIN, SEARCH_ACTION_URL]):
-        raise KeyError("One or more critical BetBCK config URLs or credentials are missing.")
-except FileNotFoundError:
-    print(f"CRITICAL ERROR: config.json not found at {CONFIG_FILE_PATH}. Scraper will likely fail or use incomplete defaults.")
-    LOGIN_PAYLOAD_TEMPLATE, BASE_HEADERS, LOGIN_PAGE_URL, LOGIN_ACTION_URL, MAIN_PAGE_URL_AFTER_LOGIN, SEARCH_ACTION_URL = {},{},None,None,None,None
-    GAME_WRAPPER_PRIMARY_CLASSES, GAME_WRAPPER_FALLBACK_CLASSES = DEFAULT_GAME_WRAPPER_PRIMARY_CLASSES, DEFAULT_GAME_WRAPPER_FALLBACK_CLASSES
-    if not LOGIN_PAGE_URL: print("Exiting due to missing login critical config."); exit()
-except (KeyError, TypeError, json.JSONDecodeError) as e: 
-    print(f"CRITICAL ERROR: Problem loading or parsing config.json: {e}. Exiting.")
-    exit()
-except Exception as e_cfg:
-    print(f"CRITICAL ERROR: General error loading config: {e_cfg}. Exiting."); exit()
+logger = get_logger("scraper")
+parser_logger = get_logger("parser")
+norm_logger = get_logger("norm")
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))  # betbck_html_logs/ lives next to this file
+
+LOGINS = counter("podbot_betbck_logins_total", "BetBCK login attempts by result.")
+SEARCHES = counter("podbot_betbck_searches_total", "BetBCK search POSTs by result.")
+
+FUZZY_MATCH_THRESHOLD = 70  # Threshold for team name matching (0-100) - Adjust cautiously
+_fuzz = None
+_fuzz_loaded = False
+
+def _fuzzy():
+    """fuzzywuzzy's fuzz module, imported on the first fuzzy comparison rather than at startup. None if not installed."""
+    global _fuzz, _fuzz_loaded
+    if not _fuzz_loaded:
+        try:
+            from fuzzywuzzy import fuzz as _fuzz
+        except ImportError:
+            logger.warning("[BetbckScraper] fuzzywuzzy library not found. Team matching will rely on more exact normalization.")
+        _fuzz_loaded = True
+    return _fuzz
+
+def _soup(html):
+    # bs4 is only needed once a page is parsed, so it is not imported with the module.
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(html, 'html.parser')
 
 # --- Core Scraper Functions ---
+@timed_stage("betbck_login")
 def login_to_betbck(session):
-    print(f"[BetbckScraper] Attempting login to BetBCK...")
-    request_headers = BASE_HEADERS.copy(); request_headers['Referer'] = LOGIN_PAGE_URL
-    login_payload = LOGIN_PAYLOAD_TEMPLATE.copy()
+    logger.info("[BetbckScraper] Attempting login to BetBCK...")
+    cfg = current_config().betbck
+    request_headers = dict(cfg.headers); request_headers['Referer'] = cfg.login_page_url
+    login_payload = dict(cfg.credentials)
     try:
-        session.get(LOGIN_PAGE_URL, headers=request_headers, timeout=10) 
-        login_response = session.post(LOGIN_ACTION_URL, data=login_payload, headers=request_headers, allow_redirects=True, timeout=10)
+        wait_for_slot(cfg.login_page_url)
+        session.get(cfg.login_page_url, headers=request_headers, timeout=10) 
+        wait_for_slot(cfg.login_action_url)
+        login_response = session.post(cfg.login_action_url, data=login_payload, headers=request_headers, allow_redirects=True, timeout=10)
         if ("StraightLoginSportSelection.php" in login_response.url or "MainMenu.php" in login_response.url) and \
            "Logout" in login_response.text and "Invalid User" not in login_response.text:
-            print(f"[BetbckScraper] Login SUCCESSFUL.")
+            logger.info("[BetbckScraper] Login SUCCESSFUL.")
+            LOGINS.inc(result="ok")
             return True
-        print(f"[BetbckScraper] Login FAILED. Status: {login_response.status_code}. URL: {login_response.url}")
+        logger.warning("[BetbckScraper] Login FAILED. Status: %s. URL: %s", login_response.status_code, login_response.url)
+        LOGINS.inc(result="rejected")
         return False
-    except requests.exceptions.Timeout: print(f"[BetbckScraper] Login process timed out."); return False
-    except Exception as e: print(f"[BetbckScraper] Login process failed: {e}"); return False
+    except requests.exceptions.Timeout: logger.error("[BetbckScraper] Login process timed out."); LOGINS.inc(result="timeout"); return False
+    except DeadlineExceeded as e: logger.warning("[BetbckScraper] Login dropped: %s", e); LOGINS.inc(result="stale"); return False
+    except Exception as e: logger.error("[BetbckScraper] Login process failed: %s", e); LOGINS.inc(result="error"); return False
 
+@timed_stage("betbck_search_form")
 def get_search_prerequisites(session, page_url_with_search_form):
-    print(f"[BetbckScraper] Getting search prerequisites from: {page_url_with_search_form}")
+    logger.debug("[BetbckScraper] Getting search prerequisites from: %s", page_url_with_search_form)
     try:
+        wait_for_slot(page_url_with_search_form)
         response = session.get(page_url_with_search_form, timeout=10); response.raise_for_status()
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = _soup(response.text)
         wager_input = soup.find('input', {'id': 'inetWagerNumber'}) or soup.find('input', {'name': 'inetWagerNumber'})
         sport_input = soup.find('input', {'id': 'inetSportSelection'}) or soup.find('input', {'name': 'inetSportSelection'})
         inet_wager_value = wager_input['value'] if wager_input and 'value' in wager_input.attrs else None
         inet_sport_selection_value = (sport_input['value'] if sport_input and 'value' in sport_input.attrs else 'sport') or 'sport'
         if inet_wager_value:
             return inet_wager_value, inet_sport_selection_value
-        print("[BetbckScraper] inetWagerNumber not found on prerequisite page."); return None, 'sport'
-    except requests.exceptions.Timeout: print(f"[BetbckScraper] Timeout getting search prerequisites."); return None, 'sport'
-    except Exception as e: print(f"[BetbckScraper] Failed to get search prerequisites: {e}"); return None, 'sport'
+        logger.warning("[BetbckScraper] inetWagerNumber not found on prerequisite page."); return None, 'sport'
+    except requests.exceptions.Timeout: logger.error("[BetbckScraper] Timeout getting search prerequisites."); return None, 'sport'
+    except DeadlineExceeded as e: logger.warning("[BetbckScraper] Search form request dropped: %s", e); return None, 'sport'
+    except Exception as e: logger.error("[BetbckScraper] Failed to get search prerequisites: %s", e); return None, 'sport'
 
-def search_team_and_get_results_html(session, team_name_query, inet_wager_val, inet_sport_select_val):
-    if not all([session, team_name_query, inet_wager_val, inet_sport_select_val]): print("[BetbckScraper] Search prerequisites missing."); return None
+@timed_stage("betbck_search_post")
+def search_team_and_get_results_html(session, team_name_query, inet_wager_val, inet_sport_select_val, game_parser=None):
+    """
+    Runs one keyword search and returns the results page HTML. With a StreamingGameParser the
+    response is fed to it as it arrives instead, reading stops once it has found the game, and
+    True is returned.
+    """
+    if not all([session, team_name_query, inet_wager_val, inet_sport_select_val]): logger.warning("[BetbckScraper] Search prerequisites missing."); return None
+    cfg = current_config().betbck
     search_payload = {"action": "Search", "keyword_search": team_name_query, "inetWagerNumber": inet_wager_val, "inetSportSelection": inet_sport_select_val}
-    print(f"[BetbckScraper] Searching BetBCK for '{team_name_query}'...")
+    logger.info("[BetbckScraper] Searching BetBCK for '%s'...", team_name_query)
     try:
-        response = session.post(SEARCH_ACTION_URL, data=search_payload, headers=BASE_HEADERS, timeout=15); response.raise_for_status()
-        print(f"[BetbckScraper] Search POST successful (Status: {response.status_code}). Response size: {len(response.text)} bytes."); return response.text
-    except requests.exceptions.Timeout: print(f"[BetbckScraper] Team search POST timed out for '{team_name_query}'."); return None
-    except Exception as e: print(f"[BetbckScraper] Team search POST failed for '{team_name_query}': {e}"); return None
+        wait_for_slot(cfg.search_action_url)
+        started = time.perf_counter()
+        response = session.post(cfg.search_action_url, data=search_payload, headers=dict(cfg.headers), timeout=15, stream=game_parser is not None); response.raise_for_status()
+        if game_parser is not None:
+            if response.encoding is None: response.encoding = 'utf-8'
+            captured = [] if capturing() else None
+            try:
+                for chunk in response.iter_content(chunk_size=STREAM_CHUNK_SIZE, decode_unicode=True):
+                    if captured is not None: captured.append(chunk)
+                    if game_parser.feed(chunk): break
+            finally: response.close()
+            if captured is not None: capture("betbck_search", keyword=team_name_query, html="".join(captured), complete=not game_parser.done, ms=round((time.perf_counter() - started) * 1000, 1))
+            logger.info("[BetbckScraper] Streamed search results for '%s': read %d chars, %s.", team_name_query, game_parser.chars_read, "stopped at the game" if game_parser.done else "whole page")
+            SEARCHES.inc(result="ok"); return True
+        logger.info("[BetbckScraper] Search POST successful (Status: %s). Response size: %d bytes.", response.status_code, len(response.text))
+        if capturing(): capture("betbck_search", keyword=team_name_query, html=response.text, complete=True, ms=round((time.perf_counter() - started) * 1000, 1))
+        SEARCHES.inc(result="ok"); return response.text
+    except requests.exceptions.Timeout: logger.error("[BetbckScraper] Team search POST timed out for '%s'.", team_name_query); SEARCHES.inc(result="timeout"); return None
+    except DeadlineExceeded as e: logger.warning("[BetbckScraper] Team search for '%s' dropped: %s", team_name_query, e); SEARCHES.inc(result="stale"); return None
+    except Exception as e: logger.error("[BetbckScraper] Team search POST failed for '%s': %s", team_name_query, e); SEARCHES.inc(result="error"); return None
 
 # --- Normalization and Parsing Utilities ---
-TEAM_ALIASES = {
-    'north korea': ['korea dpr', 'dpr korea', 'democratic people\'s republic of korea'],
-    'south korea': ['korea republic', 'republic of korea'],
-    'ivory coast': ['cote d\'ivoire'],
-    'czech republic': ['czechia'],
-    'united states': ['usa', 'us', 'united states of america'],
-    'iran': ['iran', 'iran isl', 'islamic republic of iran'],
-    'russia': ['russian federation'],
-    # Add more as needed
-}
-
 def alias_normalize(name):
+    """Canonical name for a team alias (normalization.team_aliases in config.json)."""
     name = name.lower().strip()
-    for canonical, aliases in TEAM_ALIASES.items():
-        if name == canonical or name in aliases:
-            return canonical
-    return name
+    return current_config().normalization.alias_to_canonical.get(name, name)
 
 def normalize_team_name_for_matching(name):
     original_name_for_debug = name
@@ -141,7 +153,7 @@ def normalize_team_name_for_matching(name):
     # Use alias normalization
     final_normalized_name = alias_normalize(final_normalized_name)
     if original_name_for_debug and original_name_for_debug.lower().strip() != final_normalized_name and final_normalized_name:
-        print(f"[NORM_DEBUG] Original: '{original_name_for_debug}' ---> Normalized: '{final_normalized_name}'")
+        norm_logger.debug("[NORM_DEBUG] Original: '%s' ---> Normalized: '%s'", original_name_for_debug, final_normalized_name, extra=sample_every(50))
     return final_normalized_name if final_normalized_name else (original_name_for_debug.lower().strip() if original_name_for_debug else "")
 
 market_type_context_for_normalization = "Spread"
@@ -284,149 +296,529 @@ def get_cleaned_team_name_from_div(team_div):
     raw_name = re.sub(r'\s*\((hits\+runs\+errors|h\+r\+e|hre)\)$', '', raw_name, flags=re.IGNORECASE).strip()
     return " ".join(raw_name.split()) if raw_name else ""
 
-def parse_specific_game_from_search_html(html_content, target_home_team_pod, target_away_team_pod):
-    if not html_content: print("[BetbckParser] No HTML content."); return None
-    soup = BeautifulSoup(html_content, 'html.parser'); search_context = soup.find('form', {'name': 'GameSelectionForm', 'id': 'GameSelectionForm'}) or soup
-    game_wrappers = []
-    for gw_class in GAME_WRAPPER_PRIMARY_CLASSES: game_wrappers.extend(f for f in search_context.find_all('table', class_=gw_class) if f not in game_wrappers)
-    if not game_wrappers and GAME_WRAPPER_FALLBACK_CLASSES:
-        print(f"[BetbckParser] No primary wrappers. Fallbacks: {GAME_WRAPPER_FALLBACK_CLASSES}")
-        for gw_class in GAME_WRAPPER_FALLBACK_CLASSES:
-            for f_table in search_context.find_all('table', class_=gw_class):
-                potential_inner = f_table.find_all('table', class_=lambda x: x and x.startswith('table_container_betting'))
-                if potential_inner: game_wrappers.extend(iw for iw in potential_inner if iw not in game_wrappers)
-                elif f_table.find('table',class_='new_tb_cont') and f_table not in game_wrappers: game_wrappers.append(f_table)
-    print(f"[BetbckParser] Found {len(game_wrappers)} potential game wrapper tables.")
-    if not game_wrappers: return None
+# --- Game pins ---
+# Once a Pinnacle event has been matched to a BetBCK game, its BetBCK game number (the
+# game_number_local span) and orientation are pinned to the event ID. Later scrapes for that
+# event cut the pinned game's wrapper table straight out of the results HTML and parse only
+# its odds; full matching runs again only if the pinned number is gone or now shows other teams.
+GAME_PIN_MAX = 1000
+PINS = counter("podbot_betbck_game_pins_total", "Pinned BetBCK game lookups by result (hit, miss, pinned).")
+_game_pins = OrderedDict()  # event_id -> (game_number, bck_local_is_pod_home, raw local name, raw visitor name)
+_game_pins_lock = threading.Lock()
+_TABLE_TAG_RE = re.compile(r'<(/?)table\b', re.IGNORECASE)
+_GAME_NUMBER_RE = re.compile(r'class="game_number_local"[^>]*>\s*([^<\s]+)\s*<')
+
+def _game_number(game_wrapper_table):
+    span = game_wrapper_table.find('span', class_='game_number_local')
+    return span.get_text(strip=True) if span else None
+
+def _pin_game(event_id, output_data, bck_local_is_pod_home):
+    game_number = output_data.get("betbck_game_number")
+    if not game_number: return
+    with _game_pins_lock:
+        _game_pins[event_id] = (game_number, bck_local_is_pod_home, output_data["betbck_displayed_local"], output_data["betbck_displayed_visitor"])
+        _game_pins.move_to_end(event_id)
+        while len(_game_pins) > GAME_PIN_MAX: _game_pins.popitem(last=False)
+    PINS.inc(result="pinned")
+    parser_logger.debug("[BetbckParser] Pinned Event ID %s to BetBCK game %s (local is POD home: %s).", event_id, game_number, bck_local_is_pod_home)
+
+def get_game_pin(event_id):
+    with _game_pins_lock:
+        return _game_pins.get(event_id)
+
+def forget_game_pin(event_id):
+    with _game_pins_lock:
+        _game_pins.pop(event_id, None)
+
+def _pinned_wrapper_html(html_content, game_number):
+    """The innermost <table>...</table> around game `game_number`'s game_number_local span, or None."""
+    span = re.search(r'class="game_number_local"[^>]*>\s*' + re.escape(game_number) + r'\s*<', html_content)
+    if not span: return None
+    open_tables = []
+    for tag in _TABLE_TAG_RE.finditer(html_content, 0, span.start()):
+        if tag.group(1): open_tables and open_tables.pop()
+        else: open_tables.append(tag.start())
+    if not open_tables: return None
+    start, depth = open_tables[-1], 0
+    for tag in _TABLE_TAG_RE.finditer(html_content, start):
+        depth += -1 if tag.group(1) else 1
+        if depth == 0:
+            end = html_content.find('>', tag.end())
+            return html_content[start:end + 1] if end != -1 else None
+    return None
+
+def _parse_pinned_game(html_content, pin, target_home_team_pod, target_away_team_pod):
+    wrapper_html = _pinned_wrapper_html(html_content, pin[0])
+    if not wrapper_html: return None
+    return _parse_pinned_wrapper(_soup(wrapper_html).find('table'), pin, target_home_team_pod, target_away_team_pod)
+
+def _parse_pinned_wrapper(game_wrapper_table, pin, target_home_team_pod, target_away_team_pod):
+    game_number, bck_local_is_pod_home, pinned_local, pinned_visitor = pin
+    team_name_td = game_wrapper_table.find('td', class_=lambda x: x and x.startswith('tbl_betAmount_team1_main_name'))
+    if not team_name_td: return None
+    raw_bck_l = get_cleaned_team_name_from_div(team_name_td.find('div', class_='team1_name_up'))
+    raw_bck_v = get_cleaned_team_name_from_div(team_name_td.find('div', class_='team2_name_down'))
+    if (raw_bck_l, raw_bck_v) != (pinned_local, pinned_visitor):
+        parser_logger.info("[BetbckParser] Pinned BetBCK game %s now shows %s vs %s; re-matching.", game_number, raw_bck_l, raw_bck_v)
+        return None
+    return _parse_game_odds(game_wrapper_table, 0, raw_bck_l, raw_bck_v, bck_local_is_pod_home, target_home_team_pod, target_away_team_pod)
 
+def _parse_game_odds(game_wrapper_table, idx, raw_bck_l, raw_bck_v, bck_local_is_pod_home, target_home_team_pod, target_away_team_pod):
+    odds_table = game_wrapper_table.find('table', class_='new_tb_cont')
+    if not odds_table: parser_logger.warning("[BetbckParser] No 'new_tb_cont' odds table for game %d.", idx); return None
+    
+    output_data = {"source":"betbck.com","betbck_displayed_local":raw_bck_l,"betbck_displayed_visitor":raw_bck_v,"betbck_game_number":_game_number(game_wrapper_table),"pod_home_team":target_home_team_pod,"pod_away_team":target_away_team_pod,"home_moneyline_american":None,"away_moneyline_american":None,"draw_moneyline_american":None,"home_spreads":[],"away_spreads":[],"game_total_line":None,"game_total_over_odds":None,"game_total_under_odds":None,"home_team_total_over_line":None, "home_team_total_over_odds":None,"home_team_total_under_line":None, "home_team_total_under_odds":None,"away_team_total_over_line":None, "away_team_total_over_odds":None,"away_team_total_under_line":None, "away_team_total_under_odds":None}
+    
+    data_rows_source = odds_table.find('tbody') or odds_table
+    all_tr_in_odds_section = data_rows_source.find_all('tr', recursive=False) 
+    data_rows = [r for r in all_tr_in_odds_section if r.find('td', class_=lambda x: x and 'tbl_betAmount_td' in x) and not r.find('td', colspan=True)]
+    parser_logger.debug("[BetbckParser] Game %d: Extracted %d potential data rows from odds table.", idx, len(data_rows))
+    if len(data_rows) < 2: parser_logger.warning("[BetbckParser] Insufficient data rows (%d) for game %d.", len(data_rows), idx); return None 
+    
+    tds_bck_displayed_local_row = data_rows[0].find_all('td',class_=lambda x: x and 'tbl_betAmount_td' in x)
+    tds_bck_displayed_visitor_row = data_rows[1].find_all('td',class_=lambda x: x and 'tbl_betAmount_td' in x)
+    
+    h_cells = tds_bck_displayed_local_row if bck_local_is_pod_home else tds_bck_displayed_visitor_row
+    a_cells = tds_bck_displayed_visitor_row if bck_local_is_pod_home else tds_bck_displayed_local_row
+
+    if len(h_cells)>0: output_data["home_spreads"]=extract_all_spread_options_from_text(h_cells[0])
+    if len(a_cells)>0: output_data["away_spreads"]=extract_all_spread_options_from_text(a_cells[0])
+    if len(h_cells)>1: output_data["home_moneyline_american"]=extract_american_odds_from_text(h_cells[1])
+    if len(a_cells)>1: output_data["away_moneyline_american"]=extract_american_odds_from_text(a_cells[1])
+
+    if len(tds_bck_displayed_local_row)>2: 
+        total_cell_bck_local = tds_bck_displayed_local_row[2]
+        if not output_data.get("game_total_line"): output_data["game_total_line"]=extract_line_value_from_text(total_cell_bck_local,"Total")
+        if "o" in total_cell_bck_local.get_text(" ", strip=True).lower(): output_data["game_total_over_odds"]=extract_american_odds_from_text(total_cell_bck_local)
+    if len(tds_bck_displayed_visitor_row)>2: 
+        total_cell_bck_visitor = tds_bck_displayed_visitor_row[2]
+        if not output_data.get("game_total_line"): output_data["game_total_line"]=extract_line_value_from_text(total_cell_bck_visitor,"Total")
+        if "u" in total_cell_bck_visitor.get_text(" ", strip=True).lower(): output_data["game_total_under_odds"]=extract_american_odds_from_text(total_cell_bck_visitor)
+    
+    if len(h_cells)>3: txt_el=h_cells[3];_and_True = "o" in txt_el.get_text(" ",strip=True).lower() and (output_data.update({"home_team_total_over_line":extract_line_value_from_text(txt_el,"Total"), "home_team_total_over_odds":extract_american_odds_from_text(txt_el)}))
+    if len(h_cells)>4: txt_el=h_cells[4];_and_True = "u" in txt_el.get_text(" ",strip=True).lower() and (output_data.update({"home_team_total_under_line":extract_line_value_from_text(txt_el,"Total"), "home_team_total_under_odds":extract_american_odds_from_text(txt_el)}))
+    if len(a_cells)>3: txt_el=a_cells[3];_and_True = "o" in txt_el.get_text(" ",strip=True).lower() and (output_data.update({"away_team_total_over_line":extract_line_value_from_text(txt_el,"Total"), "away_team_total_over_odds":extract_american_odds_from_text(txt_el)}))
+    if len(a_cells)>4: txt_el=a_cells[4];_and_True = "u" in txt_el.get_text(" ",strip=True).lower() and (output_data.update({"away_team_total_under_line":extract_line_value_from_text(txt_el,"Total"), "away_team_total_under_odds":extract_american_odds_from_text(txt_el)}))
+    
+    if len(data_rows)>2 and "draw" in data_rows[2].get_text(strip=True).lower():
+        tds_draw = data_rows[2].find_all('td',class_=lambda x:x and 'tbl_betAmount_td' in x)
+        if len(tds_draw)>1: output_data["draw_moneyline_american"]=extract_american_odds_from_text(tds_draw[1])
+    if parser_logger.isEnabledFor(logging.DEBUG): parser_logger.debug("[BetbckParser] Final Parsed Data: %s", json.dumps(output_data))
+    return output_data
+
+def parse_specific_game_from_search_html(html_content, target_home_team_pod, target_away_team_pod, event_id=None):
+    """
+    Finds the POD game on a BetBCK search results page and parses its full-game odds. With an
+    event_id, a game pinned to that event is parsed directly and a newly matched game is pinned.
+    The parse runs on a parse_pool worker when the pool is on.
+    """
+    with stage_timer("betbck_parse"):
+        pin = get_game_pin(event_id) if event_id is not None and html_content else None
+        output_data, bck_local_is_pod_home, pin_result, timings = run_parse(_find_game, html_content, target_home_team_pod, target_away_team_pod, pin)
+    _observe_parse_timings(timings)
+    if pin_result == "hit":
+        PINS.inc(result="hit")
+        return output_data
+    if pin_result == "miss":
+        PINS.inc(result="miss")
+        forget_game_pin(event_id)
+        parser_logger.info("[BetbckParser] Pinned BetBCK game %s for Event ID %s not found; ran full match.", pin[0], event_id)
+    if output_data is not None and event_id is not None: _pin_game(event_id, output_data, bck_local_is_pod_home)
+    return output_data
+
+def _observe_parse_timings(timings):
+    if timings.get("html_tree"): observe_stage("betbck_html_tree", timings["html_tree"])
+    if timings["match"]: observe_stage("betbck_match", timings["match"])
+
+# --- Parse tasks (module-level and side-effect free, so parse_pool can run them in a worker) ---
+def _find_game(html_content, target_home_team_pod, target_away_team_pod, pin):
+    """
+    Whole-page parse: the pinned game if it still shows the pinned teams, otherwise a full match.
+    Returns (output_data, bck_local_is_pod_home, pin result "hit"/"miss"/None, timings).
+    """
+    timings = {"match": 0.0, "html_tree": 0.0}
+    if pin:
+        output_data = _parse_pinned_game(html_content, pin, target_home_team_pod, target_away_team_pod)
+        if output_data is not None: return output_data, pin[1], "hit", timings
+    output_data, bck_local_is_pod_home = _parse_specific_game(html_content, target_home_team_pod, target_away_team_pod, timings)
+    return output_data, bck_local_is_pod_home, "miss" if pin else None, timings
+
+def _examine_wrapper(wrapper_html, idx, target_home_team_pod, target_away_team_pod, norm_pod_h, norm_pod_a, pin):
+    """
+    One game wrapper table for StreamingGameParser. Without a pin it is matched against the POD
+    teams; with one, only the pinned game number is parsed. Returns (output_data,
+    bck_local_is_pod_home, state, timings); state is "hit", "moved" (the pinned number shows other
+    teams), "other" (not the pinned game) or None (matched or not, unpinned).
+    """
+    timings = {"match": 0.0}
+    game_wrapper_table = _soup(wrapper_html).find('table')
+    if pin is not None:
+        if _game_number(game_wrapper_table) != pin[0]: return None, None, "other", timings
+        output_data = _parse_pinned_wrapper(game_wrapper_table, pin, target_home_team_pod, target_away_team_pod)
+        return output_data, pin[1], "hit" if output_data is not None else "moved", timings
+    matched = _match_wrapper(game_wrapper_table, idx, norm_pod_h, norm_pod_a, timings)
+    if not matched: return None, None, None, timings
+    parser_logger.info("[BetbckParser] Game Matched! BetBCK Local is POD Home: %s. Parsing odds...", matched[2])
+    return _parse_game_odds(game_wrapper_table, idx, *matched, target_home_team_pod, target_away_team_pod), matched[2], None, timings
+
+def _match_wrapper(game_wrapper_table, idx, norm_pod_h, norm_pod_a, timings):
+    """Matches one game wrapper table against the normalized POD teams. Returns (raw local, raw visitor, bck_local_is_pod_home) or None."""
+    team_name_td = game_wrapper_table.find('td', class_=lambda x: x and x.startswith('tbl_betAmount_team1_main_name'))
+    if not team_name_td: return None
+    div_t1 = team_name_td.find('div', class_='team1_name_up'); div_t2 = team_name_td.find('div', class_='team2_name_down')
+    if not (div_t1 and div_t2): return None
+    raw_bck_l, raw_bck_v = get_cleaned_team_name_from_div(div_t1), get_cleaned_team_name_from_div(div_t2)
+    if not raw_bck_l or not raw_bck_v: parser_logger.debug("[BetbckParser] Wrapper %d: Empty raw names. L='%s', V='%s'", idx, raw_bck_l, raw_bck_v, extra=sample_every(20)); return None
+    
+    if _is_partial_game(raw_bck_l, raw_bck_v):
+        parser_logger.debug("[BetbckParser] Skipping non-full game/prop: %s vs %s", raw_bck_l, raw_bck_v, extra=sample_every(20)); return None
+        
+    match_start = time.perf_counter()
+    norm_bck_l, norm_bck_v = normalize_team_name_for_matching(raw_bck_l), normalize_team_name_for_matching(raw_bck_v)
+    parser_logger.debug("[BetbckParser] Comparing POD: H='%s' A='%s' WITH BCK %d: L='%s' V='%s' (Raw: L='%s', V='%s')", norm_pod_h, norm_pod_a, idx, norm_bck_l, norm_bck_v, raw_bck_l, raw_bck_v, extra=sample_every(20))
+    matched, bck_local_is_pod_home = False, False
+
+    if norm_pod_h == norm_bck_l and norm_pod_a == norm_bck_v: matched, bck_local_is_pod_home = True, True; parser_logger.info("[BetbckParser] Exact Match (Order 1) for %s vs %s", raw_bck_l, raw_bck_v)
+    elif norm_pod_h == norm_bck_v and norm_pod_a == norm_bck_l: matched, bck_local_is_pod_home = True, False; parser_logger.info("[BetbckParser] Exact Match (Order 2 - Flipped) for %s vs %s", raw_bck_l, raw_bck_v)
+    else:
+        fuzzy_local_is_home = _fuzzy_teams_match(norm_pod_h, norm_pod_a, norm_bck_l, norm_bck_v)
+        if fuzzy_local_is_home is not None: matched, bck_local_is_pod_home = True, fuzzy_local_is_home
+    timings["match"] += time.perf_counter() - match_start
+    return (raw_bck_l, raw_bck_v, bck_local_is_pod_home) if matched else None
+
+_SKIP_INDICATORS = [ind.lower() for ind in ("1H", "1st Half", "First Half", "1st 5 Innings", "First Five Innings", "1st Period", "2nd Period", "3rd Period", "hits+runs+errors", "h+r+e", "hre", "corners", "series")]
+
+def _is_partial_game(raw_bck_l, raw_bck_v):
+    """True for period, prop and series lines, which are listed like games but are not the full game."""
+    names = (raw_bck_l.lower(), raw_bck_v.lower())
+    return any(ind in name for ind in _SKIP_INDICATORS for name in names)
+
+def _fuzzy_teams_match(norm_pod_h, norm_pod_a, norm_bck_l, norm_bck_v):
+    """Fuzzy match over every alias combination in both orders. Returns bck_local_is_pod_home, or None without a match (or fuzzywuzzy)."""
+    if not _fuzzy(): return None
+    fuzz = _fuzz
+    team_aliases = current_config().normalization.team_aliases
+    pod_h_aliases = [norm_pod_h, *team_aliases.get(norm_pod_h, ())]
+    pod_a_aliases = [norm_pod_a, *team_aliases.get(norm_pod_a, ())]
+    bck_l_aliases = [norm_bck_l, *team_aliases.get(norm_bck_l, ())]
+    bck_v_aliases = [norm_bck_v, *team_aliases.get(norm_bck_v, ())]
+    for ph in pod_h_aliases:
+        for bh in bck_l_aliases:
+            for pa in pod_a_aliases:
+                for bv in bck_v_aliases:
+                    s_hl = fuzz.token_set_ratio(ph, bh)
+                    s_av = fuzz.token_set_ratio(pa, bv)
+                    s_hv = fuzz.token_set_ratio(ph, bv)
+                    s_al = fuzz.token_set_ratio(pa, bh)
+                    parser_logger.debug("[DEBUG] Comparing normalized: POD H='%s', A='%s' with BCK H='%s', A='%s' | Scores: (H-L %s A-V %s) OR (H-V %s A-L %s)", ph, pa, bh, bv, s_hl, s_av, s_hv, s_al, extra=sample_every(100))
+                    if s_hl >= FUZZY_MATCH_THRESHOLD and s_av >= FUZZY_MATCH_THRESHOLD:
+                        parser_logger.info("[BetbckParser] Fuzzy Alias Match (Order 1)")
+                        return True
+                    if s_hv >= FUZZY_MATCH_THRESHOLD and s_al >= FUZZY_MATCH_THRESHOLD:
+                        parser_logger.info("[BetbckParser] Fuzzy Alias Match (Order 2 - Flipped)")
+                        return False
+    return None
+
+def _parse_specific_game(html_content, target_home_team_pod, target_away_team_pod, timings):
+    """Returns (output_data, bck_local_is_pod_home), or (None, None) when no wrapper matches."""
+    if not html_content: parser_logger.warning("[BetbckParser] No HTML content."); return None, None
+    tree_start = time.perf_counter()
+    soup = _soup(html_content)
+    timings["html_tree"] = timings.get("html_tree", 0.0) + time.perf_counter() - tree_start
+    game_wrappers = _game_wrappers(soup)
+    if not game_wrappers: return None, None
+
+    match_start = time.perf_counter()
     norm_pod_h = normalize_team_name_for_matching(target_home_team_pod)
     norm_pod_a = normalize_team_name_for_matching(target_away_team_pod)
-    print(f"[BetbckParser] Normalized POD Targets: Home='{norm_pod_h}', Away='{norm_pod_a}'")
+    timings["match"] += time.perf_counter() - match_start
+    parser_logger.debug("[BetbckParser] Normalized POD Targets: Home='%s', Away='%s'", norm_pod_h, norm_pod_a)
 
     for idx, game_wrapper_table in enumerate(game_wrappers):
-        team_name_td = game_wrapper_table.find('td', class_=lambda x: x and x.startswith('tbl_betAmount_team1_main_name'))
-        if not team_name_td: continue
-        div_t1 = team_name_td.find('div', class_='team1_name_up'); div_t2 = team_name_td.find('div', class_='team2_name_down')
-        if not (div_t1 and div_t2): continue
-        raw_bck_l, raw_bck_v = get_cleaned_team_name_from_div(div_t1), get_cleaned_team_name_from_div(div_t2)
-        if not raw_bck_l or not raw_bck_v: print(f"[BetbckParser] Wrapper {idx}: Empty raw names. L='{raw_bck_l}', V='{raw_bck_v}'"); continue
-        
-        skip_indicators = ["1H", "1st Half", "First Half", "1st 5 Innings", "First Five Innings", "1st Period", "2nd Period", "3rd Period", "hits+runs+errors", "h+r+e", "hre", "corners", "series"]
-        if any(ind.lower() in raw_bck_l.lower() for ind in skip_indicators) or \
-           any(ind.lower() in raw_bck_v.lower() for ind in skip_indicators):
-            print(f"[BetbckParser] Skipping non-full game/prop: {raw_bck_l} vs {raw_bck_v}"); continue
-            
-        norm_bck_l, norm_bck_v = normalize_team_name_for_matching(raw_bck_l), normalize_team_name_for_matching(raw_bck_v)
-        print(f"[BetbckParser] Comparing POD: H='{norm_pod_h}' A='{norm_pod_a}' WITH BCK {idx}: L='{norm_bck_l}' V='{norm_bck_v}' (Raw: L='{raw_bck_l}', V='{raw_bck_v}')")
-        matched, bck_local_is_pod_home = False, False
-
-        if norm_pod_h == norm_bck_l and norm_pod_a == norm_bck_v: matched, bck_local_is_pod_home = True, True; print(f"[BetbckParser] Exact Match (Order 1) for {raw_bck_l} vs {raw_bck_v}")
-        elif norm_pod_h == norm_bck_v and norm_pod_a == norm_bck_l: matched, bck_local_is_pod_home = True, False; print(f"[BetbckParser] Exact Match (Order 2 - Flipped) for {raw_bck_l} vs {raw_bck_v}")
-        elif fuzz:
-            # Try all alias combinations for both orders
-            pod_h_aliases = [norm_pod_h] + TEAM_ALIASES.get(norm_pod_h, [])
-            pod_a_aliases = [norm_pod_a] + TEAM_ALIASES.get(norm_pod_a, [])
-            bck_l_aliases = [norm_bck_l] + TEAM_ALIASES.get(norm_bck_l, [])
-            bck_v_aliases = [norm_bck_v] + TEAM_ALIASES.get(norm_bck_v, [])
-            found_fuzzy = False
-            for ph in pod_h_aliases:
-                for bh in bck_l_aliases:
-                    for pa in pod_a_aliases:
-                        for bv in bck_v_aliases:
-                            s_hl = fuzz.token_set_ratio(ph, bh)
-                            s_av = fuzz.token_set_ratio(pa, bv)
-                            s_hv = fuzz.token_set_ratio(ph, bv)
-                            s_al = fuzz.token_set_ratio(pa, bh)
-                            print(f"[DEBUG] Comparing normalized: POD H='{ph}', A='{pa}' with BCK H='{bh}', A='{bv}' | Scores: (H-L {s_hl} A-V {s_av}) OR (H-V {s_hv} A-L {s_al})")
-                            if s_hl >= FUZZY_MATCH_THRESHOLD and s_av >= FUZZY_MATCH_THRESHOLD:
-                                matched, bck_local_is_pod_home = True, True
-                                print(f"[BetbckParser] Fuzzy Alias Match (Order 1)")
-                                found_fuzzy = True
-                                break
-                            elif s_hv >= FUZZY_MATCH_THRESHOLD and s_al >= FUZZY_MATCH_THRESHOLD:
-                                matched, bck_local_is_pod_home = True, False
-                                print(f"[BetbckParser] Fuzzy Alias Match (Order 2 - Flipped)")
-                                found_fuzzy = True
-                                break
-                        if found_fuzzy: break
-                    if found_fuzzy: break
-                if found_fuzzy: break
-            if not matched: continue
-        
+        matched = _match_wrapper(game_wrapper_table, idx, norm_pod_h, norm_pod_a, timings)
         if not matched: continue
+        raw_bck_l, raw_bck_v, bck_local_is_pod_home = matched
         
-        print(f"[BetbckParser] Game Matched! BetBCK Local is POD Home: {bck_local_is_pod_home}. Parsing odds...")
-        odds_table = game_wrapper_table.find('table', class_='new_tb_cont')
-        if not odds_table: print(f"[BetbckParser] No 'new_tb_cont' odds table for game {idx}."); continue
-        
-        output_data = {"source":"betbck.com","betbck_displayed_local":raw_bck_l,"betbck_displayed_visitor":raw_bck_v,"pod_home_team":target_home_team_pod,"pod_away_team":target_away_team_pod,"home_moneyline_american":None,"away_moneyline_american":None,"draw_moneyline_american":None,"home_spreads":[],"away_spreads":[],"game_total_line":None,"game_total_over_odds":None,"game_total_under_odds":None,"home_team_total_over_line":None, "home_team_total_over_odds":None,"home_team_total_under_line":None, "home_team_total_under_odds":None,"away_team_total_over_line":None, "away_team_total_over_odds":None,"away_team_total_under_line":None, "away_team_total_under_odds":None}
-        
-        data_rows_source = odds_table.find('tbody') or odds_table
-        all_tr_in_odds_section = data_rows_source.find_all('tr', recursive=False) 
-        data_rows = [r for r in all_tr_in_odds_section if r.find('td', class_=lambda x: x and 'tbl_betAmount_td' in x) and not r.find('td', colspan=True)]
-        print(f"[BetbckParser] Game {idx}: Extracted {len(data_rows)} potential data rows from odds table.")
-        if len(data_rows) < 2: print(f"[BetbckParser] Insufficient data rows ({len(data_rows)}) for game {idx}."); continue 
-        
-        tds_bck_displayed_local_row = data_rows[0].find_all('td',class_=lambda x: x and 'tbl_betAmount_td' in x)
-        tds_bck_displayed_visitor_row = data_rows[1].find_all('td',class_=lambda x: x and 'tbl_betAmount_td' in x)
-        
-        h_cells = tds_bck_displayed_local_row if bck_local_is_pod_home else tds_bck_displayed_visitor_row
-        a_cells = tds_bck_displayed_visitor_row if bck_local_is_pod_home else tds_bck_displayed_local_row
-
-        if len(h_cells)>0: output_data["home_spreads"]=extract_all_spread_options_from_text(h_cells[0])
-        if len(a_cells)>0: output_data["away_spreads"]=extract_all_spread_options_from_text(a_cells[0])
-        if len(h_cells)>1: output_data["home_moneyline_american"]=extract_american_odds_from_text(h_cells[1])
-        if len(a_cells)>1: output_data["away_moneyline_american"]=extract_american_odds_from_text(a_cells[1])
-
-        if len(tds_bck_displayed_local_row)>2: 
-            total_cell_bck_local = tds_bck_displayed_local_row[2]
-            if not output_data.get("game_total_line"): output_data["game_total_line"]=extract_line_value_from_text(total_cell_bck_local,"Total")
-            if "o" in total_cell_bck_local.get_text(" ", strip=True).lower(): output_data["game_total_over_odds"]=extract_american_odds_from_text(total_cell_bck_local)
-        if len(tds_bck_displayed_visitor_row)>2: 
-            total_cell_bck_visitor = tds_bck_displayed_visitor_row[2]
-            if not output_data.get("game_total_line"): output_data["game_total_line"]=extract_line_value_from_text(total_cell_bck_visitor,"Total")
-            if "u" in total_cell_bck_visitor.get_text(" ", strip=True).lower(): output_data["game_total_under_odds"]=extract_american_odds_from_text(total_cell_bck_visitor)
-        
-        if len(h_cells)>3: txt_el=h_cells[3];_and_True = "o" in txt_el.get_text(" ",strip=True).lower() and (output_data.update({"home_team_total_over_line":extract_line_value_from_text(txt_el,"Total"), "home_team_total_over_odds":extract_american_odds_from_text(txt_el)}))
-        if len(h_cells)>4: txt_el=h_cells[4];_and_True = "u" in txt_el.get_text(" ",strip=True).lower() and (output_data.update({"home_team_total_under_line":extract_line_value_from_text(txt_el,"Total"), "home_team_total_under_odds":extract_american_odds_from_text(txt_el)}))
-        if len(a_cells)>3: txt_el=a_cells[3];_and_True = "o" in txt_el.get_text(" ",strip=True).lower() and (output_data.update({"away_team_total_over_line":extract_line_value_from_text(txt_el,"Total"), "away_team_total_over_odds":extract_american_odds_from_text(txt_el)}))
-        if len(a_cells)>4: txt_el=a_cells[4];_and_True = "u" in txt_el.get_text(" ",strip=True).lower() and (output_data.update({"away_team_total_under_line":extract_line_value_from_text(txt_el,"Total"), "away_team_total_under_odds":extract_american_odds_from_text(txt_el)}))
-        
-        if len(data_rows)>2 and "draw" in data_rows[2].get_text(strip=True).lower():
-            tds_draw = data_rows[2].find_all('td',class_=lambda x:x and 'tbl_betAmount_td' in x)
-            if len(tds_draw)>1: output_data["draw_moneyline_american"]=extract_american_odds_from_text(tds_draw[1])
-        print(f"[BetbckParser] Final Parsed Data: {json.dumps(output_data, indent=2)}"); return output_data
-    print(f"[BetbckParser] No game matching POD teams found after all wrappers."); return None
+        parser_logger.info("[BetbckParser] Game Matched! BetBCK Local is POD Home: %s. Parsing odds...", bck_local_is_pod_home)
+        output_data = _parse_game_odds(game_wrapper_table, idx, raw_bck_l, raw_bck_v, bck_local_is_pod_home, target_home_team_pod, target_away_team_pod)
+        if output_data is None: continue
+        return output_data, bck_local_is_pod_home
+    parser_logger.info("[BetbckParser] No game matching POD teams found after all wrappers."); return None, None
+
+def _game_wrappers(soup):
+    """The game wrapper tables of a results page, in page order."""
+    search_context = soup.find('form', {'name': 'GameSelectionForm', 'id': 'GameSelectionForm'}) or soup
+    cfg = current_config().betbck
+    # Deduplicated by identity: Tag equality compares whole subtrees, which made this quadratic in the page size.
+    game_wrappers, seen = [], set()
+    def add(table):
+        if id(table) not in seen: seen.add(id(table)); game_wrappers.append(table)
+    for gw_class in cfg.game_wrapper_primary_classes:
+        for f in search_context.find_all('table', class_=gw_class): add(f)
+    if not game_wrappers and cfg.game_wrapper_fallback_classes:
+        parser_logger.debug("[BetbckParser] No primary wrappers. Fallbacks: %s", cfg.game_wrapper_fallback_classes)
+        for gw_class in cfg.game_wrapper_fallback_classes:
+            for f_table in search_context.find_all('table', class_=gw_class):
+                potential_inner = f_table.find_all('table', class_=lambda x: x and x.startswith('table_container_betting'))
+                if potential_inner:
+                    for iw in potential_inner: add(iw)
+                elif f_table.find('table',class_='new_tb_cont'): add(f_table)
+    parser_logger.debug("[BetbckParser] Found %d potential game wrapper tables.", len(game_wrappers))
+    return game_wrappers
+
+def _split_wrappers(html_content):
+    """The HTML of each top-level primary-class game wrapper table, found by regex like StreamingGameParser; [] when there are none."""
+    wrapper_classes, open_tables, wrappers = current_config().betbck.primary_class_set, [], []
+    for tag in _TABLE_OPEN_CLOSE_RE.finditer(html_content):
+        if not tag.group(1):
+            classes = _CLASS_ATTR_RE.search(tag.group(2))
+            is_wrapper = bool(classes) and " ".join(classes.group(1).split()) in wrapper_classes and not any(w for _, w in open_tables)
+            open_tables.append((tag.start(), is_wrapper))
+        elif open_tables:
+            table_start, is_wrapper = open_tables.pop()
+            if is_wrapper: wrappers.append(html_content[table_start:tag.end()])
+    return wrappers
+
+def _board_games(html_content, skip_game_numbers=()):
+    """
+    Every full game on a results page, for board_sweep: dicts with the raw and normalized local and
+    visitor names, the game's odds with the local team as home ("odds") and the wrapper table HTML.
+    Games numbered in skip_game_numbers (already read from another page) are not parsed again.
+    """
+    games = []
+    if not html_content: return games
+    wrapper_htmls = _split_wrappers(html_content)
+    if wrapper_htmls:
+        numbers = [_GAME_NUMBER_RE.search(w) for w in wrapper_htmls]
+        game_wrappers = [_soup(w).find('table') for w, n in zip(wrapper_htmls, numbers) if not (n and n.group(1) in skip_game_numbers)]
+    else: game_wrappers = _game_wrappers(_soup(html_content))  # fallback-class layouts are parsed whole
+    for idx, game_wrapper_table in enumerate(game_wrappers):
+        team_name_td = game_wrapper_table.find('td', class_=lambda x: x and x.startswith('tbl_betAmount_team1_main_name'))
+        if not team_name_td or not game_wrapper_table.find('table', class_='new_tb_cont'): continue
+        raw_bck_l = get_cleaned_team_name_from_div(team_name_td.find('div', class_='team1_name_up'))
+        raw_bck_v = get_cleaned_team_name_from_div(team_name_td.find('div', class_='team2_name_down'))
+        if not raw_bck_l or not raw_bck_v or _is_partial_game(raw_bck_l, raw_bck_v): continue
+        odds = _parse_game_odds(game_wrapper_table, idx, raw_bck_l, raw_bck_v, True, raw_bck_l, raw_bck_v)
+        if odds is None: continue
+        games.append({"raw_local": raw_bck_l, "raw_visitor": raw_bck_v, "norm_local": normalize_team_name_for_matching(raw_bck_l),
+                      "norm_visitor": normalize_team_name_for_matching(raw_bck_v), "odds": odds, "wrapper_html": str(game_wrapper_table)})
+    return games
+
+# --- Streaming parse ---
+STREAM_CHUNK_SIZE = 16384
+STREAMED = counter("podbot_betbck_streamed_parses_total", "Streamed BetBCK result page parses by outcome.")
+_TABLE_OPEN_CLOSE_RE = re.compile(r'<(/?)table\b([^>]*)>', re.IGNORECASE)
+_CLASS_ATTR_RE = re.compile(r'class\s*=\s*["\']([^"\']*)["\']', re.IGNORECASE)
+
+class StreamingGameParser:
+    """
+    parse_specific_game_from_search_html for a page that is still arriving. feed() each chunk of
+    the results HTML: every primary-class game wrapper table is matched as soon as its closing tag
+    has arrived, and feed() returns True once the game is found so the caller can stop reading.
+    Text before the last closed top-level table is dropped as it is consumed. close() returns the
+    parsed game (or None); pages with no primary wrappers are parsed whole there, the usual way.
+    Unlike the whole-page parse, wrappers are tried in page order. Each wrapper is matched on a
+    parse_pool worker when the pool is on; the table scanning here is regex only.
+    """
+
+    def __init__(self, target_home_team_pod, target_away_team_pod, event_id=None):
+        self.home, self.away, self.event_id = target_home_team_pod, target_away_team_pod, event_id
+        self.result, self.done, self.chars_read = None, False, 0
+        self.timings = {"match": 0.0}
+        self._parse_seconds = 0.0
+        self._buf, self._pos = "", 0
+        self._open = []  # (start offset, is game wrapper) per unclosed <table>
+        self._wrapper_classes = current_config().betbck.primary_class_set
+        self._seen_wrapper = False
+        self._wrapper_count = 0
+        self._pin = get_game_pin(event_id) if event_id is not None else None
+        self._deferred = []  # (idx, wrapper HTML) passed over while looking for the pinned game
+        self._norm_h = normalize_team_name_for_matching(target_home_team_pod)
+        self._norm_a = normalize_team_name_for_matching(target_away_team_pod)
+
+    def feed(self, text):
+        if self.done or not text: return self.done
+        start = time.perf_counter()
+        self.chars_read += len(text)
+        self._buf += text
+        # A tag cut off at the end of the chunk does not match yet; it is found again from _pos on the next feed.
+        for tag in _TABLE_OPEN_CLOSE_RE.finditer(self._buf, self._pos):
+            self._pos = tag.end()
+            if not tag.group(1):
+                classes = _CLASS_ATTR_RE.search(tag.group(2))
+                is_wrapper = bool(classes) and " ".join(classes.group(1).split()) in self._wrapper_classes and not any(w for _, w in self._open)
+                self._open.append((tag.start(), is_wrapper))
+                self._seen_wrapper = self._seen_wrapper or is_wrapper
+            elif self._open:
+                table_start, is_wrapper = self._open.pop()
+                if is_wrapper and self._check_wrapper(self._buf[table_start:tag.end()]): break
+        if self._seen_wrapper and not self._open:
+            self._buf, self._pos = self._buf[self._pos:], 0
+        self._parse_seconds += time.perf_counter() - start
+        return self.done
+
+    def _check_wrapper(self, wrapper_html):
+        idx, self._wrapper_count = self._wrapper_count, self._wrapper_count + 1
+        if self._pin is None: return self._match(idx, wrapper_html)
+        output_data, _, state, _ = run_parse(_examine_wrapper, wrapper_html, idx, self.home, self.away, self._norm_h, self._norm_a, self._pin)
+        if state == "hit":
+            PINS.inc(result="hit")
+            self.result, self.done = output_data, True
+            return True
+        self._deferred.append((idx, wrapper_html))
+        # The pinned number now shows other teams: match everything seen so far and carry on unpinned.
+        return state == "moved" and self._drop_pin()
+
+    def _drop_pin(self):
+        PINS.inc(result="miss")
+        forget_game_pin(self.event_id)
+        parser_logger.info("[BetbckParser] Pinned BetBCK game %s for Event ID %s not found; running full match.", self._pin[0], self.event_id)
+        self._pin, deferred, self._deferred = None, self._deferred, []
+        return any(self._match(idx, wrapper_html) for idx, wrapper_html in deferred)
+
+    def _match(self, idx, wrapper_html):
+        output_data, bck_local_is_pod_home, _, timings = run_parse(_examine_wrapper, wrapper_html, idx, self.home, self.away,
+                                                                   self._norm_h, self._norm_a, None)
+        self.timings["match"] += timings["match"]
+        return self._found(output_data, bck_local_is_pod_home)
+
+    def _found(self, output_data, bck_local_is_pod_home):
+        if output_data is None: return False
+        if self.event_id is not None: _pin_game(self.event_id, output_data, bck_local_is_pod_home)
+        self.result, self.done = output_data, True
+        return True
+
+    def close(self):
+        start = time.perf_counter()
+        outcome = "early_exit" if self.done else None
+        if outcome is None and self._pin is not None and self._drop_pin(): outcome = "matched_at_end"
+        if outcome is None and not self._seen_wrapper:
+            outcome = "whole_page"
+            output_data, bck_local_is_pod_home, _, timings = run_parse(_find_game, self._buf, self.home, self.away, None)
+            self.timings["match"] += timings["match"]
+            if timings["html_tree"]: observe_stage("betbck_html_tree", timings["html_tree"])
+            self._found(output_data, bck_local_is_pod_home)
+        elif outcome is None:
+            outcome = "no_match"
+            parser_logger.info("[BetbckParser] No game matching POD teams found after all wrappers.")
+        self._buf, self._open, self._deferred, self.done = "", [], [], True
+        STREAMED.inc(outcome=outcome)
+        observe_stage("betbck_parse", self._parse_seconds + time.perf_counter() - start)
+        if self.timings["match"]: observe_stage("betbck_match", self.timings["match"])
+        return self.result
 
 # --- Main Callable Function ---
-def scrape_betbck_for_game(pod_home_team, pod_away_team, search_team_name_betbck=None):
-    print(f"\n[BetbckScraper-CORE] Initiating scrape for: '{pod_home_team}' vs '{pod_away_team}'")
+def derive_search_query(pod_home_team):
+    temp_cleaned_home = normalize_team_name_for_matching(pod_home_team) 
+    home_parts = temp_cleaned_home.split()
+    if home_parts: 
+        if len(home_parts) > 1 and len(home_parts[-1]) > 3 and home_parts[-1].lower() not in ['fc','sc','united','city','club','de','do','ac','if','bk', 'aif', 'kc']: return home_parts[-1]
+        elif len(home_parts[0]) > 2 and home_parts[0].lower() not in ['fc','sc','ac','if','bk','de','do', 'aif', 'kc']: return home_parts[0]
+        else: return temp_cleaned_home 
+    return pod_home_team 
+
+def fetch_search_results_html(search_query, game_parser=None):
+    """
+    Logs in, loads the search form and runs one keyword search. Returns the results page HTML or None;
+    with a game_parser the page is streamed into it instead (see search_team_and_get_results_html).
+    """
     session = requests.Session();
-    if not login_to_betbck(session): print("[BetbckScraper-CORE] Login failed."); return None
-    inet_wager, inet_sport_select = get_search_prerequisites(session, MAIN_PAGE_URL_AFTER_LOGIN)
-    if not inet_wager : print("[BetbckScraper-CORE] Failed to get inetWagerNumber."); return None 
+    if not login_to_betbck(session): logger.error("[BetbckScraper-CORE] Login failed."); return None
+    inet_wager, inet_sport_select = get_search_prerequisites(session, current_config().betbck.main_page_url_after_login)
+    if not inet_wager : logger.error("[BetbckScraper-CORE] Failed to get inetWagerNumber."); return None 
+    logger.debug("[BetbckScraper-CORE] Using BetBCK search query: '%s'", search_query)
+    search_results_html = search_team_and_get_results_html(session, search_query, inet_wager, inet_sport_select or 'sport', game_parser)
+    if not search_results_html: logger.warning("[BetbckScraper-CORE] No search results HTML for '%s'.", search_query); return None
+    return search_results_html
+
+def prefetch_search_for_game(search_query, pod_home_team, pod_away_team, event_id=None):
+    """
+    Runs the BetBCK search for one game ahead of scrape_betbck_for_game, e.g. alongside the Pinnacle
+    fetch. Returns (search_results_html, game_parser) to pass on to it: the parser the page was
+    streamed into when betbck.stream_search_results is on, else the page HTML ("" when the search failed).
+    """
+    if current_config().betbck.stream_search_results:
+        game_parser = StreamingGameParser(pod_home_team, pod_away_team, event_id)
+        if fetch_search_results_html(search_query, game_parser): return None, game_parser
+        return "", None
+    return fetch_search_results_html(search_query) or "", None
+
+def fetch_board_html(search_queries):
+    """
+    Yields (query, results page HTML or None) for each keyword search, on one logged-in session;
+    board_sweep reads the board this way. Stops early when the login fails.
+    """
+    session = requests.Session()
+    if not login_to_betbck(session): logger.error("[BetbckScraper-CORE] Login failed."); return
+    for search_query in search_queries:
+        inet_wager, inet_sport_select = get_search_prerequisites(session, current_config().betbck.main_page_url_after_login)
+        if not inet_wager: logger.error("[BetbckScraper-CORE] Failed to get inetWagerNumber."); yield search_query, None; continue
+        yield search_query, search_team_and_get_results_html(session, search_query, inet_wager, inet_sport_select or 'sport')
+
+@timed_stage("betbck_scrape_total")
+def scrape_betbck_for_game(pod_home_team, pod_away_team, search_team_name_betbck=None, search_results_html=None, event_id=None, game_parser=None):
+    """
+    Scrapes BetBCK odds for one POD game. Pass search_results_html to parse an already
+    fetched results page (e.g. one search shared by several alerts) instead of searching again,
+    or a game_parser the search was already streamed into (see /pod_alert), and the Pinnacle
+    event_id to use (and keep) its pinned BetBCK game.
+    """
+    logger.info("[BetbckScraper-CORE] Initiating scrape for: '%s' vs '%s'", pod_home_team, pod_away_team)
     actual_search_query = search_team_name_betbck
     if not actual_search_query:
-        temp_cleaned_home = normalize_team_name_for_matching(pod_home_team) 
-        home_parts = temp_cleaned_home.split()
-        if home_parts: 
-            if len(home_parts) > 1 and len(home_parts[-1]) > 3 and home_parts[-1].lower() not in ['fc','sc','united','city','club','de','do','ac','if','bk', 'aif', 'kc']: actual_search_query = home_parts[-1]
-            elif len(home_parts[0]) > 2 and home_parts[0].lower() not in ['fc','sc','ac','if','bk','de','do', 'aif', 'kc']: actual_search_query = home_parts[0]
-            else: actual_search_query = temp_cleaned_home 
-        else: actual_search_query = pod_home_team 
-        print(f"[BetbckScraper-CORE] Derived search query '{actual_search_query}' from '{pod_home_team}'")
-    print(f"[BetbckScraper-CORE] Using BetBCK search query: '{actual_search_query}'")
-    search_results_html = search_team_and_get_results_html(session, actual_search_query, inet_wager, inet_sport_select or 'sport')
-    if not search_results_html: print(f"[BetbckScraper-CORE] No search results HTML for '{actual_search_query}'."); return None
-    debug_html_dir = os.path.join(SCRIPT_DIR, "betbck_html_logs"); os.makedirs(debug_html_dir, exist_ok=True)
-    safe_pod_home = re.sub(r'[^\w\-_.]', '_', normalize_team_name_for_matching(pod_home_team)); safe_pod_away = re.sub(r'[^\w\-_.]', '_', normalize_team_name_for_matching(pod_away_team))
-    pod_teams_fn_part = f"{safe_pod_home}_vs_{safe_pod_away}"[:100]; safe_search_q = re.sub(r'[^\w\-_.]', '_', actual_search_query); ts = time.strftime('%Y%m%d_%H%M%S')
-    debug_fn = os.path.join(debug_html_dir, f"search_{safe_search_q}_{pod_teams_fn_part}_{ts}.html")
-    try:
-        with open(debug_fn, "w", encoding="utf-8") as f: f.write(search_results_html)
-        print(f"[BetbckScraper-CORE] DEBUG: Saved BetBCK search HTML to {debug_fn}")
-    except Exception as e: print(f"[BetbckScraper-CORE] DEBUG: ERROR saving HTML: {e}")
-    parsed_game_data = parse_specific_game_from_search_html(search_results_html, pod_home_team, pod_away_team)
-    if parsed_game_data: print(f"[BetbckScraper-CORE] Scraper returned parsed game data.")
-    else: print(f"[BetbckScraper-CORE] Scraper did NOT find or parse specific game from HTML.")
-    return parsed_game_data
\ No newline at end of file
+        actual_search_query = derive_search_query(pod_home_team)
+        logger.debug("[BetbckScraper-CORE] Derived search query '%s' from '%s'", actual_search_query, pod_home_team)
+    if game_parser is None and search_results_html is None and current_config().betbck.stream_search_results:
+        game_parser = StreamingGameParser(pod_home_team, pod_away_team, event_id)
+        if not fetch_search_results_html(actual_search_query, game_parser): return None
+    if game_parser is not None:
+        # Streamed pages are not kept whole, so they are not saved to betbck_html_logs.
+        parsed_game_data = game_parser.close()
+        if parsed_game_data: logger.info("[BetbckScraper-CORE] Scraper returned parsed game data.")
+        else: logger.info("[BetbckScraper-CORE] Scraper did NOT find or parse specific game from HTML.")
+        return parsed_game_data
+    if search_results_html is None:
+        search_results_html = fetch_search_results_html(actual_search_query)
+        if not search_results_html: return None
+        debug_html_dir = os.path.join(SCRIPT_DIR, "betbck_html_logs"); os.makedirs(debug_html_dir, exist_ok=True)
+        safe_pod_home = re.sub(r'[^\w\-_.]', '_', normalize_team_name_for_matching(pod_home_team)); safe_pod_away = re.sub(r'[^\w\-_.]', '_', normalize_team_name_for_matching(pod_away_team))
+        pod_teams_fn_part = f"{safe_pod_home}_vs_{safe_pod_away}"[:100]; safe_search_q = re.sub(r'[^\w\-_.]', '_', actual_search_query); ts = time.strftime('%Y%m%d_%H%M%S')
+        debug_fn = os.path.join(debug_html_dir, f"search_{safe_search_q}_{pod_teams_fn_part}_{ts}.html")
+        try:
+            with open(debug_fn, "w", encoding="utf-8") as f: f.write(search_results_html)
+            logger.debug("[BetbckScraper-CORE] Saved BetBCK search HTML to %s", debug_fn)
+        except Exception as e: logger.warning("[BetbckScraper-CORE] ERROR saving HTML: %s", e)
+    parsed_game_data = parse_specific_game_from_search_html(search_results_html, pod_home_team, pod_away_team, event_id)
+    if parsed_game_data: logger.info("[BetbckScraper-CORE] Scraper returned parsed game data.")
+    else: logger.info("[BetbckScraper-CORE] Scraper did NOT find or parse specific game from HTML.")
+    return parsed_game_data
+
+# --- Sportsbook adapter ---
+def betbck_markets(bet_data):
+    """Full-game odds from parse_specific_game_from_search_html output as normalized market records (see sportsbooks)."""
+    records = []
+    for side in ("home", "away", "draw"):
+        if bet_data.get(f"{side}_moneyline_american"):
+            records.append(market_record("betbck", "ML", side, "", bet_data[f"{side}_moneyline_american"]))
+    for side in ("home", "away"):
+        for spread in bet_data.get(f"{side}_spreads") or []:
+            records.append(market_record("betbck", "Spread", side, spread.get("line"), spread.get("odds")))
+    if bet_data.get("game_total_line"):
+        for side in ("over", "under"):
+            if bet_data.get(f"game_total_{side}_odds"):
+                records.append(market_record("betbck", "Total", side, bet_data["game_total_line"], bet_data[f"game_total_{side}_odds"]))
+    return records
+
+class BetbckAdapter(SportsbookAdapter):
+    name = "betbck"
+
+    def quote(self, event_id, alert, pinnacle_processed, search_query=None, search_results_html=None, game_parser=None):
+        bet_data = scrape_betbck_for_game(alert.get("homeTeam", ""), alert.get("awayTeam", ""),
+                                          search_team_name_betbck=search_query, search_results_html=search_results_html,
+                                          event_id=event_id, game_parser=game_parser)
+        if not isinstance(bet_data, dict) or bet_data.get("source") != "betbck.com":
+            error_msg = bet_data["message"] if isinstance(bet_data, dict) and "message" in bet_data else "Scraper returned no data."
+            return {"status": "error_betbck_scrape_failed", "message": f"{error_msg} (Searched: '{search_query}')"}
+        return {"status": "success", "markets": betbck_markets(bet_data), "data": bet_data}
+
+register_adapter(BetbckAdapter())
@@ -0,0 +1,246 @@
+"""
+Board sweep: finds +EV BetBCK lines without waiting for a POD alert.
+
+Each cycle, for every league in config.json's "sweep" section
+({"leagues": {"<Pinnacle league>": ["<BetBCK keyword>", ...]}}), the sweep fetches the whole
+league from Swordfish in one request (pinnacle_fetcher.SWORDFISH_BULK_URL), runs the league's
+BetBCK keyword searches on one session, parses every game on those pages (on parse_pool workers
+when the pool is on) and joins the two boards on normalized team names. Every joined game is
+priced with the same NVP/EV engine as alerts; one whose best market reaches "min_ev" is handed
+to on_hit, which the server feeds into the same path as a POD alert.
+
+A cycle starts no new league, search or fuzzy match once "budget_seconds" have passed, and its
+upstream requests run at PRIORITY_SWEEP with that deadline, so alerts, re-checks and refreshes
+always go first. When a cycle runs out of time, the next one starts with the leagues it did not
+reach, and a league it cut short resumes from the first keyword it did not search.
+"""
+import threading
+import time
+
+from betbck_scraper import _board_games, _fuzzy_teams_match, fetch_board_html, normalize_team_name_for_matching
+from main_logic import find_ev_bets
+from metrics import counter, histogram, stage_timer
+from parse_pool import run as run_parse
+from pinnacle_fetcher import bulk_enabled, fetch_live_pinnacle_league_odds
+from podbot_config import current as current_config
+from podbot_logging import get_logger
+from rate_limit import PRIORITY_SWEEP, outbound_job
+from utils import process_event_odds_for_display
+
+logger = get_logger("sweep")
+
+CYCLE_SECONDS = histogram("podbot_sweep_cycle_seconds", "Wall time of board sweep cycles.")
+LEAGUES = counter("podbot_sweep_leagues_total", "Leagues per sweep cycle by result (swept, partial, over_budget, no_pinnacle).")
+GAMES = counter("podbot_sweep_games_total", "BetBCK board games per sweep by join result (matched, unmatched).")
+MARKETS = counter("podbot_sweep_markets_priced_total", "Markets priced against Pinnacle NVPs by the board sweep.")
+HITS = counter("podbot_sweep_hits_total", "Swept games whose best market reached the EV threshold, by result (ingested, skipped, failed).")
+
+def _orient(odds, local_is_home):
+    """BetBCK odds parsed with the local team as home, flipped when the Pinnacle home team is BetBCK's visitor."""
+    if local_is_home:
+        return dict(odds)
+    flipped = {}
+    for key, value in odds.items():
+        if key.startswith("home_"):
+            key = "away_" + key[len("home_"):]
+        elif key.startswith("away_"):
+            key = "home_" + key[len("away_"):]
+        flipped[key] = value
+    return flipped
+
+def _pinnacle_teams(result):
+    event = (result.get("data") or {}).get("data") or {}
+    return event.get("home"), event.get("away")
+
+class BoardSweep:
+    """
+    Runs sweep cycles on a background thread every sweep.interval_seconds while sweep.enabled.
+
+    on_hit(event_id, alert_payload, pinnacle_result, wrapper_html) ingests a hit and returns True on
+    success; skip_event(event_id) says whether a hit is already known (active or dismissed); leader()
+    whether this process should sweep (with several server processes only the lease holder does).
+    """
+
+    def __init__(self, on_hit, skip_event=lambda event_id: False, leader=lambda: True):
+        self.on_hit, self.skip_event, self.leader = on_hit, skip_event, leader
+        self._next_league = 0  # where the next cycle starts in the configured league order
+        self._next_keyword = {}  # league -> first keyword the last cycle did not search
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run_cycle(self, now=None):
+        """One sweep over the configured leagues. Returns a summary dict (also logged)."""
+        cfg = current_config().sweep
+        started = time.perf_counter()
+        deadline = (now or time.time()) + cfg.budget_seconds
+        leagues = list(cfg.leagues)
+        if leagues:
+            start = self._next_league % len(leagues)
+            leagues = leagues[start:] + leagues[:start]
+        summary = {"leagues": 0, "games": 0, "matched": 0, "markets": 0, "hits": 0, "over_budget": []}
+        for position, league in enumerate(leagues):
+            if self._stop.is_set() or time.time() >= deadline:
+                summary["over_budget"] = leagues[position:]
+                self._next_league += position
+                LEAGUES.inc(len(leagues) - position, result="over_budget")
+                break
+            with outbound_job(PRIORITY_SWEEP, deadline=deadline):
+                finished = self._sweep_league(league, cfg.leagues[league], cfg.min_ev, deadline, summary)
+            if not finished:
+                summary["over_budget"] = leagues[position:]  # this one resumes at its next keyword when its turn comes
+                self._next_league += position + 1
+                LEAGUES.inc(len(leagues) - position - 1, result="over_budget")
+                break
+        else:
+            self._next_league = 0
+        seconds = time.perf_counter() - started
+        CYCLE_SECONDS.observe(seconds)
+        summary["seconds"] = round(seconds, 3)
+        if summary["over_budget"]:
+            logger.warning("[Sweep] Cycle used its %ss budget with %s league(s) not finished: %s",
+                           cfg.budget_seconds, len(summary["over_budget"]), ", ".join(summary["over_budget"]))
+        logger.info("[Sweep] Cycle done in %.2fs: %s leagues, %s of %s board games matched, %s markets priced, %s hits.",
+                    seconds, summary["leagues"], summary["matched"], summary["games"], summary["markets"], summary["hits"])
+        return summary
+
+    def _sweep_league(self, league, keywords, min_ev, deadline, summary):
+        """Sweeps one league. Returns False when the budget ran out before all its keywords were searched."""
+        pinnacle = fetch_live_pinnacle_league_odds(league)
+        if not pinnacle:
+            logger.warning("[Sweep] No Swordfish events for league '%s'; skipping it this cycle.", league)
+            LEAGUES.inc(result="no_pinnacle")
+            return time.time() < deadline
+        by_teams = {}  # (normalized home, normalized away) -> event_id
+        for event_id, result in pinnacle.items():
+            home, away = _pinnacle_teams(result)
+            if home and away:
+                by_teams[(normalize_team_name_for_matching(home), normalize_team_name_for_matching(away))] = event_id
+
+        # A game is listed on the page of every keyword naming either team; it is parsed from the first one only.
+        games, seen, numbers = [], set(), set()
+        first = self._next_keyword.pop(league, 0) % max(len(keywords), 1)
+        keywords = keywords[first:] + keywords[:first]
+        searched = 0
+        searches = fetch_board_html(keywords)
+        for keyword, html in searches:
+            searched += 1
+            if html:
+                with stage_timer("sweep_parse"):
+                    page_games = run_parse(_board_games, html, frozenset(numbers))
+                for game in page_games:
+                    key = game["odds"].get("betbck_game_number") or (game["raw_local"], game["raw_visitor"])
+                    if key not in seen:
+                        seen.add(key)
+                        numbers.add(game["odds"].get("betbck_game_number"))
+                        games.append(game)
+            if time.time() >= deadline:
+                searches.close()
+                break
+        finished = searched == len(keywords) or time.time() < deadline  # a failed login is not a budget overrun
+        if not finished:
+            self._next_keyword[league] = first + searched
+
+        matched, unmatched = {}, []  # event_id -> (game, local_is_home)
+        for game in games:
+            event_id = by_teams.get((game["norm_local"], game["norm_visitor"]))
+            if event_id is not None:
+                matched.setdefault(event_id, (game, True))
+                continue
+            event_id = by_teams.get((game["norm_visitor"], game["norm_local"]))
+            if event_id is not None:
+                matched.setdefault(event_id, (game, False))
+            else:
+                unmatched.append(game)
+        self._fuzzy_join(unmatched, {teams: event_id for teams, event_id in by_teams.items() if event_id not in matched},
+                         matched, deadline)
+        GAMES.inc(len(matched), result="matched")
+        GAMES.inc(len(games) - len(matched), result="unmatched")
+
+        for event_id, (game, local_is_home) in matched.items():
+            result = pinnacle[event_id]
+            processed = process_event_odds_for_display(result["data"])
+            if not processed.get("data"):
+                continue
+            home, away = _pinnacle_teams(result)
+            bet_data = _orient(game["odds"], local_is_home)
+            bet_data.update(pod_home_team=home, pod_away_team=away)
+            rows = find_ev_bets(bet_data, processed["data"])
+            summary["markets"] += len(rows)
+            MARKETS.inc(len(rows))
+            best = max((row["ev"] for row in rows if isinstance(row.get("ev"), (int, float))), default=None)
+            if best is None or best < min_ev:
+                continue
+            summary["hits"] += 1
+            self._hit(event_id, league, home, away, best, processed, result, game)
+        summary["leagues"] += 1
+        summary["games"] += len(games)
+        summary["matched"] += len(matched)
+        LEAGUES.inc(result="swept" if finished else "partial")
+        return finished
+
+    def _fuzzy_join(self, games, left, matched, deadline):
+        """
+        Names that differ by alias or spelling: fuzzy matches what the exact join left over, like ingest
+        does. Only events sharing a word (or an alias's word) with the game are tried, so the cost grows
+        with the board rather than with board x events.
+        """
+        team_aliases = current_config().normalization.team_aliases
+        words = lambda name: {word for alias in (name, *team_aliases.get(name, ())) for word in alias.split()}
+        by_word = {}
+        for teams in left:
+            for word in words(teams[0]) | words(teams[1]):
+                by_word.setdefault(word, []).append(teams)
+        for game in games:
+            if not left or time.time() >= deadline:
+                break
+            candidates = dict.fromkeys(teams for word in words(game["norm_local"]) | words(game["norm_visitor"])
+                                       for teams in by_word.get(word, ()))
+            for home, away in candidates:
+                if (home, away) not in left:
+                    continue
+                local_is_home = _fuzzy_teams_match(home, away, game["norm_local"], game["norm_visitor"])
+                if local_is_home is not None:
+                    matched[left.pop((home, away))] = (game, local_is_home)
+                    break
+
+    def _hit(self, event_id, league, home, away, best_ev, processed, result, game):
+        if self.skip_event(event_id):
+            HITS.inc(result="skipped")
+            return
+        logger.info("[Sweep] %s vs %s (Event ID %s) shows EV %.2f%% at BetBCK; adding it.", home, away, event_id, best_ev * 100)
+        payload = {"eventId": event_id, "homeTeam": home, "awayTeam": away, "leagueName": league,
+                   "startTime": processed.get("starts", "N/A"), "betDescription": f"Sweep: {home} vs {away}", "source": "sweep"}
+        try:
+            HITS.inc(result="ingested" if self.on_hit(event_id, payload, result, game["wrapper_html"]) else "failed")
+        except Exception as e:
+            HITS.inc(result="failed")
+            logger.exception("[Sweep] Adding Event ID %s failed: %s", event_id, e)
+
+    def _run(self):
+        while not self._stop.is_set():
+            cfg = current_config().sweep
+            if self._stop.wait(cfg.interval_seconds):
+                break
+            if not cfg.enabled or not cfg.leagues:
+                continue
+            if not bulk_enabled():
+                logger.warning("[Sweep] Swordfish league fetches are off (PODBOT_SWORDFISH_BULK_URL); not sweeping.")
+                continue
+            try:
+                if self.leader():
+                    self.run_cycle()
+            except Exception as e:
+                logger.exception("[Sweep] Cycle failed: %s", e)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return self._thread
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="board-sweep", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
@@ -0,0 +1,133 @@
+"""
+Self-triggered BetBCK re-checks from Pinnacle price movement.
+
+The background refresher hands every refreshed event to NvpChangeDetector.observe(). It
+recomputes EV against the stored BetBCK prices (find_ev_bets, so only markets BetBCK
+actually prices are looked at) and compares each market's NVP with the previous refresh.
+A move of at least NVP_MOVE_THRESHOLD in implied probability on a market whose recomputed
+EV is at least RECHECK_MIN_EV queues a BetBCK re-check, because the stored BetBCK price
+may now be a +EV bet and needs confirming before an alert would have asked for it.
+
+Re-checks run one at a time on RecheckQueue's worker, at most once per event per
+RECHECK_COOLDOWN_SECONDS. The refresher only runs on the leader process, so only the
+leader queues re-checks.
+"""
+import queue
+import threading
+import time
+
+from main_logic import find_ev_bets
+from metrics import counter
+from odds import implied_probability
+from podbot_logging import get_logger
+
+logger = get_logger("detector")
+
+NVP_MOVE_THRESHOLD = 0.01  # implied probability, i.e. one percentage point
+RECHECK_MIN_EV = 0.0
+RECHECK_COOLDOWN_SECONDS = 30
+RECHECK_QUEUE_SIZE = 50
+
+NVP_MOVES = counter("podbot_nvp_moves_total", "Pinnacle NVP moves past NVP_MOVE_THRESHOLD on markets BetBCK prices.")
+RECHECKS = counter("podbot_betbck_rechecks_total", "Self-triggered BetBCK re-checks by result.")
+
+class NvpChangeDetector:
+    """Per-event NVP snapshots from the previous refresh. Used from the refresher thread only."""
+
+    def __init__(self, threshold=NVP_MOVE_THRESHOLD, min_ev=RECHECK_MIN_EV):
+        self.threshold, self.min_ev = threshold, min_ev
+        self._snapshots = {}
+
+    def observe(self, event_id, pin_data_root, bet_data, rows=None):
+        """
+        Recomputes EV with the new Pinnacle data and returns the moves worth a BetBCK re-check,
+        as dicts with market, sel, line, old_nvp, new_nvp (decimal odds) and ev (a fraction).
+        Callers that already ran find_ev_bets on the new data pass its result as `rows`.
+        """
+        if rows is None:
+            rows = find_ev_bets(bet_data, pin_data_root)
+        snapshot = {(row["market"], row["sel"], str(row["line"])): row for row in rows}
+        previous = self._snapshots.get(event_id)
+        self._snapshots[event_id] = snapshot
+        moves = []
+        for key, row in (snapshot.items() if previous else ()):
+            old_row = previous.get(key)
+            if old_row is None:
+                continue
+            old_p, new_p = implied_probability(old_row["pin_nvp"]), implied_probability(row["pin_nvp"])
+            if old_p is None or new_p is None or abs(new_p - old_p) < self.threshold:
+                continue
+            NVP_MOVES.inc()
+            ev = row.get("ev")
+            if ev is not None and ev >= self.min_ev:
+                moves.append({"market": key[0], "sel": key[1], "line": key[2], "old_nvp": old_row["pin_nvp"],
+                              "new_nvp": row["pin_nvp"], "ev": row["ev"]})
+        return moves
+
+    def retain(self, event_ids):
+        """Drops snapshots of events that are no longer active."""
+        for event_id in set(self._snapshots) - set(event_ids):
+            del self._snapshots[event_id]
+
+class RecheckQueue:
+    """Runs handler(event_id) on a worker thread, deduplicating queued events and rate-limiting each one."""
+
+    def __init__(self, handler, cooldown=RECHECK_COOLDOWN_SECONDS, maxsize=RECHECK_QUEUE_SIZE):
+        self.handler, self.cooldown = handler, cooldown
+        self._queue = queue.Queue(maxsize)
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._last_run = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def submit(self, event_id, reason=""):
+        now = time.monotonic()
+        with self._lock:
+            if event_id in self._pending or now - self._last_run.get(event_id, float("-inf")) < self.cooldown:
+                RECHECKS.inc(result="throttled")
+                return False
+            self._pending.add(event_id)
+            if len(self._last_run) > 1000:
+                for key in [k for k, ts in self._last_run.items() if now - ts >= self.cooldown]:
+                    del self._last_run[key]
+        try:
+            self._queue.put_nowait(event_id)
+        except queue.Full:
+            with self._lock:
+                self._pending.discard(event_id)
+            RECHECKS.inc(result="queue_full")
+            return False
+        RECHECKS.inc(result="queued")
+        logger.info("[ChangeDetector] Queued BetBCK re-check for Event ID %s: %s", event_id, reason)
+        return True
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                event_id = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            with self._lock:
+                self._last_run[event_id] = time.monotonic()
+            try:
+                RECHECKS.inc(result="ok" if self.handler(event_id) else "failed")
+            except Exception as e:
+                RECHECKS.inc(result="failed")
+                logger.exception("[ChangeDetector] Re-check for Event ID %s failed: %s", event_id, e)
+            finally:
+                with self._lock:
+                    self._pending.discard(event_id)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return self._thread
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="betbck-recheck", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
@@ -0,0 +1,76 @@
+"""
+Consecutive-failure circuit breaker for upstream calls.
+
+    breaker = CircuitBreaker("swordfish")
+    if not breaker.allow():
+        ...  # fail fast / serve a fallback
+    try:
+        call()
+        breaker.record_success()
+    except UpstreamError:
+        breaker.record_failure()
+
+closed -> open after `failure_threshold` failures in a row. While open, allow() returns False.
+Once `reset_timeout` seconds have passed, one trial call is allowed (half-open). If it succeeds the
+breaker closes; if it fails the breaker opens for another `reset_timeout`.
+"""
+import threading
+import time
+
+from metrics import counter
+from podbot_logging import get_logger
+
+logger = get_logger("breaker")
+
+TRANSITIONS = counter("podbot_circuit_breaker_transitions_total", "Circuit breaker state changes by breaker and new state.")
+REJECTED = counter("podbot_circuit_breaker_rejected_total", "Calls failed fast by an open circuit breaker.")
+
+class CircuitBreaker:
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0):
+        self.name, self.failure_threshold, self.reset_timeout = name, failure_threshold, reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._half_open = False
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            return "half_open" if self._half_open else "open"
+
+    def _transition(self, state, reason):
+        TRANSITIONS.inc(breaker=self.name, state=state)
+        log = logger.warning if state == "open" else logger.info
+        log("[CircuitBreaker] %s -> %s (%s)", self.name, state, reason)
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            now = time.monotonic()
+            if now - self._opened_at >= self.reset_timeout:
+                # One trial per reset_timeout: if it never reports back, the next one is allowed later.
+                self._opened_at, self._half_open = now, True
+                self._transition("half_open", "trial call")
+                return True
+        REJECTED.inc(breaker=self.name)
+        return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            if self._opened_at is not None:
+                self._opened_at, self._half_open = None, False
+                self._transition("closed", "trial call succeeded")
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._half_open:
+                self._opened_at, self._half_open = time.monotonic(), False
+                self._transition("open", "trial call failed")
+            elif self._opened_at is None and self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._transition("open", f"{self._failures} consecutive failures")
@@ -0,0 +1,128 @@
+"""
+Wire formats for /get_active_events_data.
+
+The route builds one record per event from its raw parts (team names, league, start time,
+alert odds, markets) and encodes it as either:
+
+    verbose  (default)         {event_id: {"title", "meta_info", "alert_meta", "betbck_status", "markets": [{...}], ...}}
+    compact  (?format=compact) {"format": "compact-1", "market_columns": [...],
+                                "events": {event_id: {"home", "away", "league", "starts", "alert": [old, new, nvp],
+                                                      "betbck_status": null unless it is an error message,
+                                                      "markets": [[column values], ...], ...}}}
+
+The compact form ships the parts the verbose strings are built from, so nothing is
+repeated, and stores markets column by column in MARKET_COLUMNS order. realtime.js
+expands it back into the verbose shape.
+
+?fields=title,markets limits either format to the listed verbose fields. Responses above
+COMPRESS_MIN_BYTES are brotli- or gzip-compressed according to Accept-Encoding. orjson
+and brotli are used when installed and are not required.
+"""
+import gzip
+import json
+
+from odds import format_ev, format_odds
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPACT_FORMAT = "compact-1"
+COMPRESS_MIN_BYTES = 1024
+MARKET_COLUMNS = ("market", "selection", "line", "pinnacle_nvp", "betbck_odds", "ev")
+# Markets carry decimal odds and EV fractions; these are formatted here, at the response boundary.
+_MARKET_FORMATTERS = {"pinnacle_nvp": format_odds, "betbck_odds": format_odds, "ev": format_ev}
+
+def _format_market(m):
+    return {k: _MARKET_FORMATTERS[k](v) if k in _MARKET_FORMATTERS else v for k, v in m.items()}
+
+_VERBOSE_BUILDERS = {
+    "title": lambda ev: f"{ev['home']} vs {ev['away']}",
+    "meta_info": lambda ev: f"{ev['league']} | Starts: {ev['starts']}",
+    "last_update": lambda ev: ev["last_update"],
+    "betbck_last_update": lambda ev: ev["betbck_last_update"],
+    "alert_description": lambda ev: ev["alert_description"],
+    "alert_meta": lambda ev: f"(Alert: {ev['old_odds']} → {ev['new_odds']}, NVP: {ev['no_vig']})",
+    "betbck_status": lambda ev: f"Data Fetched: {ev['home']} vs {ev['away']}" if ev["betbck_status"] is None else ev["betbck_status"],
+    "markets": lambda ev: [_format_market(m) for m in ev["markets"]],
+    "alert_arrival_timestamp": lambda ev: ev["alert_arrival_timestamp"],
+}
+VERBOSE_FIELDS = tuple(_VERBOSE_BUILDERS)
+
+# Compact keys the client needs to rebuild each verbose field.
+_COMPACT_KEYS = {
+    "title": ("home", "away"),
+    "meta_info": ("league", "starts"),
+    "alert_meta": ("alert",),
+    "betbck_status": ("betbck_status", "home", "away"),
+}
+
+def parse_fields(spec):
+    """Parses ?fields=a,b into a tuple of verbose field names (all fields when empty). Raises ValueError on unknown names."""
+    if not spec:
+        return VERBOSE_FIELDS
+    fields = tuple(dict.fromkeys(f.strip() for f in spec.split(",") if f.strip()))
+    unknown = [f for f in fields if f not in _VERBOSE_BUILDERS]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(VERBOSE_FIELDS)}")
+    return fields
+
+def verbose_payload(events, fields=VERBOSE_FIELDS):
+    builders = [(f, _VERBOSE_BUILDERS[f]) for f in fields]
+    return {eid: {f: build(ev) for f, build in builders} for eid, ev in events.items()}
+
+def _compact_value(ev, key):
+    if key == "alert":
+        return [ev["old_odds"], ev["new_odds"], ev["no_vig"]]
+    if key == "markets":
+        markets = ev["markets"]
+        return [[_MARKET_FORMATTERS[col](m.get(col)) if col in _MARKET_FORMATTERS else m.get(col) for m in markets]
+                for col in MARKET_COLUMNS]
+    return ev[key]
+
+def compact_payload(events, fields=VERBOSE_FIELDS):
+    keys = tuple(dict.fromkeys(k for f in fields for k in _COMPACT_KEYS.get(f, (f,))))
+    return {
+        "format": COMPACT_FORMAT,
+        "market_columns": MARKET_COLUMNS,
+        "events": {eid: {k: _compact_value(ev, k) for k in keys} for eid, ev in events.items()},
+    }
+
+def dumps(obj):
+    """Serializes to UTF-8 JSON bytes, with orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+def negotiate_encoding(accept_encoding, size):
+    """Picks 'br', 'gzip' or None for a body of `size` bytes given the request's Accept-Encoding."""
+    if size < COMPRESS_MIN_BYTES or not accept_encoding:
+        return None
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+def compress(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=5)
+    return body
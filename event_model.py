@@ -0,0 +1,150 @@
+"""
+Compact in-memory form of active events.
+
+The state backends keep events through compact_event(). The result reads exactly like the event
+dicts the server builds, e.g.
+
+    entry["pinnacle_data_processed"]["data"]["periods"]["num_0"]["spreads"]["-1.5"].get("nvp_home")
+
+but holds much less:
+
+- only the Swordfish periods the EV code looks at (ANALYZED_PERIODS), and in them only the money
+  line, spreads and totals;
+- each Pinnacle line is a slotted PriceRow holding its decimal odds and NVPs as floats;
+- the POD payload keeps only the fields the server reads (ALERT_FIELDS);
+- every string is interned, so team names, leagues, keys and odds strings repeated across events
+  and refreshes are stored once.
+
+PriceRows are read-only Mappings; plain() turns a compact value back into JSON-ready dicts.
+benchmarks/bench_memory.py compares bytes per event with and without compaction.
+"""
+import sys
+from collections.abc import Mapping
+
+ANALYZED_PERIODS = ("num_0",)
+ALERT_FIELDS = ("eventId", "homeTeam", "awayTeam", "leagueName", "startTime", "betDescription", "oldOdds", "newOdds",
+                "noVigPriceFromAlert", "betbck_search_term_used", "betbck_comparison_data")
+
+class PriceRow(Mapping):
+    """One Pinnacle line. Subclasses name the sides held in slots a/b/c and the line key ('hdp', 'points')."""
+    __slots__ = ("line", "a", "b", "c", "nvp_a", "nvp_b", "nvp_c")
+    SIDES = ()
+    LINE_KEY = None
+    _FIELDS = {}
+
+    def __init__(self, market):
+        self.line = market.get(self.LINE_KEY) if self.LINE_KEY else None
+        for slot, side in zip("abc", self.SIDES):
+            setattr(self, slot, _number(market.get(side)))
+            setattr(self, "nvp_" + slot, _number(market.get("nvp_" + side)))
+        for slot in "abc"[len(self.SIDES):]:
+            setattr(self, slot, None)
+            setattr(self, "nvp_" + slot, None)
+
+    @classmethod
+    def _layout(cls):
+        fields = {cls.LINE_KEY: "line"} if cls.LINE_KEY else {}
+        for slot, side in zip("abc", cls.SIDES):
+            fields.update({side: slot, "nvp_" + side: "nvp_" + slot})
+        return fields
+
+    def __getitem__(self, key):
+        return getattr(self, self._FIELDS[key])
+
+    def __iter__(self):
+        return (key for key, slot in self._FIELDS.items() if getattr(self, slot) is not None)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self)!r})"
+
+class MoneyLine(PriceRow):
+    __slots__ = ()
+    SIDES = ("home", "draw", "away")
+
+class Spread(PriceRow):
+    __slots__ = ()
+    SIDES = ("home", "away")
+    LINE_KEY = "hdp"
+
+class Total(PriceRow):
+    __slots__ = ()
+    SIDES = ("over", "under")
+    LINE_KEY = "points"
+
+for _row_type in (MoneyLine, Spread, Total):
+    _row_type._FIELDS = _row_type._layout()
+
+def _number(value):
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+def _intern(value):
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, dict):
+        return {_intern(k): _intern(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_intern(v) for v in value]
+    return value
+
+def _compact_lines(lines, row_type):
+    if not isinstance(lines, dict):
+        return {}
+    return {sys.intern(str(key)): market if isinstance(market, PriceRow) else row_type(market)
+            for key, market in lines.items() if isinstance(market, (dict, PriceRow))}
+
+def compact_period(period):
+    compact = {}
+    money_line = period.get("money_line")
+    if isinstance(money_line, (dict, PriceRow)):
+        compact["money_line"] = money_line if isinstance(money_line, PriceRow) else MoneyLine(money_line)
+    if period.get("spreads"):
+        compact["spreads"] = _compact_lines(period["spreads"], Spread)
+    if period.get("totals"):
+        compact["totals"] = _compact_lines(period["totals"], Total)
+    return compact
+
+def compact_pinnacle(processed):
+    """Compacts a process_event_odds_for_display() result ({"data": {..., "periods": {...}}})."""
+    if not isinstance(processed, dict):
+        return processed
+    compact = {}
+    for key, value in processed.items():
+        if key == "data" and isinstance(value, dict):
+            periods = value.get("periods")
+            data = {sys.intern(k): _intern(v) for k, v in value.items() if k != "periods"}
+            if isinstance(periods, dict):
+                data["periods"] = {sys.intern(k): compact_period(periods[k]) for k in ANALYZED_PERIODS if isinstance(periods.get(k), dict)}
+            value = data
+        else:
+            value = _intern(value)
+        compact[sys.intern(key)] = value
+    return compact
+
+def compact_alert(payload):
+    if not isinstance(payload, dict):
+        return payload
+    return {sys.intern(k): _intern(payload[k]) for k in ALERT_FIELDS if k in payload}
+
+def compact_event(event_data):
+    """Compacts a whole active-event record, or an update_event_data() update. Already compact values are kept."""
+    compact = {}
+    for key, value in event_data.items():
+        if key == "pinnacle_data_processed":
+            value = compact_pinnacle(value)
+        elif key == "original_alert_details":
+            value = compact_alert(value)
+        else:
+            value = _intern(value)
+        compact[sys.intern(key)] = value
+    return compact
+
+def plain(value):
+    """Deep copy of a compact value as plain dicts and lists. Also usable as json.dumps(default=...)."""
+    if isinstance(value, Mapping):
+        return {k: plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [plain(v) for v in value]
+    return value
@@ -2,23 +2,23 @@ import traceback
 import re
 import math
 
+from metrics import timed_stage
+from podbot_logging import get_logger, sample_every
+
+logger = get_logger("main_logic")
+
 try:
-    from betbck_scraper import scrape_betbck_for_game
-    print("[MainLogic] SUCCESS: 'scrape_betbck_for_game' imported successfully.")
+    from betbck_scraper import betbck_markets  # importing betbck_scraper also registers its sportsbook adapter
+    logger.debug("[MainLogic] SUCCESS: 'betbck_scraper' imported successfully.")
 except ImportError as e:
-    print(f"[MainLogic] CRITICAL_ERROR: {e}")
+    logger.critical("[MainLogic] CRITICAL_ERROR: %s", e)
     raise
 
 # Import normalize_team_name_for_matching from utils to ensure consistent normalization
 from utils import normalize_team_name_for_matching
-
-def american_to_decimal(american_odds):
-    if american_odds is None or american_odds == "N/A": return None
-    try:
-        odds = float(str(american_odds).replace('PK', '0'))
-        if odds > 0: return (odds / 100) + 1
-        return (100 / abs(odds)) + 1
-    except (ValueError, TypeError): return None
+from odds import american_to_decimal
+from podbot_config import current as current_config
+from sportsbooks import quote_all_books
 
 def calculate_ev(bet_decimal_odds, true_decimal_odds):
     if not all([bet_decimal_odds, true_decimal_odds]) or true_decimal_odds <= 1.0: return None
@@ -32,13 +32,7 @@ def determine_betbck_search_term(pod_home_team_raw, pod_away_team_raw):
     pod_home_clean = clean_pod_team_name_for_search(pod_home_team_raw)
     pod_away_clean = clean_pod_team_name_for_search(pod_away_team_raw)
 
-    known_terms = {
-        "south korea": "Korea", "faroe islands": "Faroe", "milwaukee brewers": "Brewers",
-        "philadelphia phillies": "Phillies", "los angeles angels": "Angels", "pittsburgh pirates": "Pirates",
-        "arizona diamondbacks": "Diamondbacks", "san diego padres": "Padres", "italy": "Italy",
-        "st. louis cardinals": "Cardinals", "china pr": "China", "bahrain": "Bahrain", "czechia": "Czech Republic",
-        "athletic club": "Athletic Club", "romania": "Romania", "cyprus": "Cyprus"
-    }
+    known_terms = current_config().normalization.search_terms  # normalization.search_terms in config.json
     if pod_home_clean.lower() in known_terms:
         return known_terms[pod_home_clean.lower()]
     if pod_away_clean.lower() in known_terms:
@@ -54,16 +48,20 @@ def determine_betbck_search_term(pod_home_team_raw, pod_away_team_raw):
             return pod_home_clean
     return pod_home_clean if pod_home_clean else ""
 
+def is_prop_alert(pod_home_team_raw, pod_away_team_raw):
+    prop_keywords = ['(Corners)', '(Bookings)', '(Hits+Runs+Errors)']
+    return any(keyword.lower() in pod_home_team_raw.lower() for keyword in prop_keywords) or any(keyword.lower() in pod_away_team_raw.lower() for keyword in prop_keywords)
+
 def analyze_markets_for_ev(bet_data, pinnacle_data):
     """The core analysis function. Only include markets with both BetBCK and Pinnacle odds for EV calculation."""
     potential_bets = []
     if not pinnacle_data or not pinnacle_data.get('data'):
-        print("[AnalyzeMarkets] No Pinnacle data available")
+        logger.debug("[AnalyzeMarkets] No Pinnacle data available")
         return potential_bets
 
     pin_periods = pinnacle_data['data'].get("periods", {})
-    print(f"[MainLogic] Raw bet_data: {bet_data}")
-    print(f"[MainLogic] Raw pinnacle_data: {pinnacle_data}")
+    logger.debug("[MainLogic] Raw bet_data: %s", bet_data)
+    logger.debug("[MainLogic] Raw pinnacle_data: %s", pinnacle_data)
 
     # Analyze Full Game Markets
     pin_full_game = pin_periods.get("num_0", {})
@@ -72,68 +70,68 @@ def analyze_markets_for_ev(bet_data, pinnacle_data):
         if pin_full_game.get("money_line"):
             pin_ml = pin_full_game["money_line"]
             bet_odds_home = american_to_decimal(bet_data.get("home_moneyline_american"))
-            true_odds_home = american_to_decimal(pin_ml.get("nvp_american_home"))
+            true_odds_home = pin_ml.get("nvp_home")
             if bet_odds_home and true_odds_home:
                 ev = calculate_ev(bet_odds_home, true_odds_home)
-                print(f"[AnalyzeMarkets] Full Game Home ML: Bet={bet_odds_home}, True={true_odds_home}, EV={ev}")
+                logger.debug("[AnalyzeMarkets] Full Game Home ML: Bet=%s, True=%s, EV=%s", bet_odds_home, true_odds_home, ev, extra=sample_every(20))
                 if ev is not None:
-                    potential_bets.append({"market": "ML", "selection": "Home", "line": "", "ev": f"{ev*100:.2f}%"})
+                    potential_bets.append({"market": "ML", "selection": "Home", "line": "", "ev": ev})
             bet_odds_away = american_to_decimal(bet_data.get("away_moneyline_american"))
-            true_odds_away = american_to_decimal(pin_ml.get("nvp_american_away"))
+            true_odds_away = pin_ml.get("nvp_away")
             if bet_odds_away and true_odds_away:
                 ev = calculate_ev(bet_odds_away, true_odds_away)
-                print(f"[AnalyzeMarkets] Full Game Away ML: Bet={bet_odds_away}, True={true_odds_away}, EV={ev}")
+                logger.debug("[AnalyzeMarkets] Full Game Away ML: Bet=%s, True=%s, EV=%s", bet_odds_away, true_odds_away, ev, extra=sample_every(20))
                 if ev is not None:
-                    potential_bets.append({"market": "ML", "selection": "Away", "line": "", "ev": f"{ev*100:.2f}%"})
+                    potential_bets.append({"market": "ML", "selection": "Away", "line": "", "ev": ev})
             bet_odds_draw = american_to_decimal(bet_data.get("draw_moneyline_american"))
-            true_odds_draw = american_to_decimal(pin_ml.get("nvp_american_draw"))
+            true_odds_draw = pin_ml.get("nvp_draw")
             if bet_odds_draw and true_odds_draw:
                 ev = calculate_ev(bet_odds_draw, true_odds_draw)
-                print(f"[AnalyzeMarkets] Full Game Draw ML: Bet={bet_odds_draw}, True={true_odds_draw}, EV={ev}")
+                logger.debug("[AnalyzeMarkets] Full Game Draw ML: Bet=%s, True=%s, EV=%s", bet_odds_draw, true_odds_draw, ev, extra=sample_every(20))
                 if ev is not None:
-                    potential_bets.append({"market": "ML", "selection": "Draw", "line": "", "ev": f"{ev*100:.2f}%"})
+                    potential_bets.append({"market": "ML", "selection": "Draw", "line": "", "ev": ev})
 
         # Spreads
         if pin_full_game.get("spreads"):
-            print(f"[AnalyzeMarkets] Full Game Spreads: {pin_full_game.get('spreads')}")
+            logger.debug("[AnalyzeMarkets] Full Game Spreads: %s", pin_full_game.get('spreads'))
             for pin_spread in pin_full_game["spreads"].values():
                 line = str(pin_spread.get("hdp"))
                 bet_spreads_home = bet_data.get("home_spreads", [])
                 bet_spreads_away = bet_data.get("away_spreads", [])
                 bet_odds_home = next((american_to_decimal(s.get("odds")) for s in bet_spreads_home if str(s.get("line")) == line), None)
-                true_odds_home = american_to_decimal(pin_spread.get("nvp_american_home"))
+                true_odds_home = pin_spread.get("nvp_home")
                 if bet_odds_home and true_odds_home:
                     ev = calculate_ev(bet_odds_home, true_odds_home)
-                    print(f"[AnalyzeMarkets] Full Game Spread Home {line}: Bet={bet_odds_home}, True={true_odds_home}, EV={ev}")
+                    logger.debug("[AnalyzeMarkets] Full Game Spread Home %s: Bet=%s, True=%s, EV=%s", line, bet_odds_home, true_odds_home, ev, extra=sample_every(20))
                     if ev is not None:
-                        potential_bets.append({"market": "Spread", "selection": "Home", "line": line, "ev": f"{ev*100:.2f}%"})
+                        potential_bets.append({"market": "Spread", "selection": "Home", "line": line, "ev": ev})
                 bet_odds_away = next((american_to_decimal(s.get("odds")) for s in bet_spreads_away if str(s.get("line")) == str(-pin_spread.get("hdp"))), None)
-                true_odds_away = american_to_decimal(pin_spread.get("nvp_american_away"))
+                true_odds_away = pin_spread.get("nvp_away")
                 if bet_odds_away and true_odds_away:
                     ev = calculate_ev(bet_odds_away, true_odds_away)
-                    print(f"[AnalyzeMarkets] Full Game Spread Away {line}: Bet={bet_odds_away}, True={true_odds_away}, EV={ev}")
+                    logger.debug("[AnalyzeMarkets] Full Game Spread Away %s: Bet=%s, True=%s, EV=%s", line, bet_odds_away, true_odds_away, ev, extra=sample_every(20))
                     if ev is not None:
-                        potential_bets.append({"market": "Spread", "selection": "Away", "line": str(-pin_spread.get("hdp")), "ev": f"{ev*100:.2f}%"})
+                        potential_bets.append({"market": "Spread", "selection": "Away", "line": str(-pin_spread.get("hdp")), "ev": ev})
 
         # Totals
         if pin_full_game.get("totals"):
-            print(f"[AnalyzeMarkets] Full Game Totals: {pin_full_game.get('totals')}")
+            logger.debug("[AnalyzeMarkets] Full Game Totals: %s", pin_full_game.get('totals'))
             for pin_total in pin_full_game["totals"].values():
                 line = str(pin_total.get("points"))
                 bet_odds_over = american_to_decimal(bet_data.get("game_total_over_odds"))
-                true_odds_over = american_to_decimal(pin_total.get("nvp_american_over"))
+                true_odds_over = pin_total.get("nvp_over")
                 if bet_odds_over and true_odds_over:
                     ev = calculate_ev(bet_odds_over, true_odds_over)
-                    print(f"[AnalyzeMarkets] Full Game Total Over {line}: Bet={bet_odds_over}, True={true_odds_over}, EV={ev}")
+                    logger.debug("[AnalyzeMarkets] Full Game Total Over %s: Bet=%s, True=%s, EV=%s", line, bet_odds_over, true_odds_over, ev, extra=sample_every(20))
                     if ev is not None:
-                        potential_bets.append({"market": "Total", "selection": "Over", "line": line, "ev": f"{ev*100:.2f}%"})
+                        potential_bets.append({"market": "Total", "selection": "Over", "line": line, "ev": ev})
                 bet_odds_under = american_to_decimal(bet_data.get("game_total_under_odds"))
-                true_odds_under = american_to_decimal(pin_total.get("nvp_american_under"))
+                true_odds_under = pin_total.get("nvp_under")
                 if bet_odds_under and true_odds_under:
                     ev = calculate_ev(bet_odds_under, true_odds_under)
-                    print(f"[AnalyzeMarkets] Full Game Total Under {line}: Bet={bet_odds_under}, True={true_odds_under}, EV={ev}")
+                    logger.debug("[AnalyzeMarkets] Full Game Total Under %s: Bet=%s, True=%s, EV=%s", line, bet_odds_under, true_odds_under, ev, extra=sample_every(20))
                     if ev is not None:
-                        potential_bets.append({"market": "Total", "selection": "Under", "line": line, "ev": f"{ev*100:.2f}%"})
+                        potential_bets.append({"market": "Total", "selection": "Under", "line": line, "ev": ev})
 
     # Analyze 1H Markets
     pin_1h = pin_periods.get("num_1", {})
@@ -141,58 +139,58 @@ def analyze_markets_for_ev(bet_data, pinnacle_data):
         if pin_1h.get("money_line"):
             pin_ml_1h = pin_1h["money_line"]
             bet_odds_home = american_to_decimal(bet_data.get("home_moneyline_american_1h"))
-            true_odds_home = american_to_decimal(pin_ml_1h.get("nvp_american_home"))
+            true_odds_home = pin_ml_1h.get("nvp_home")
             ev = calculate_ev(bet_odds_home, true_odds_home)
-            print(f"[AnalyzeMarkets] 1H Home ML: Bet={bet_odds_home}, True={true_odds_home}, EV={ev}")
-            if ev is not None: potential_bets.append({"market": "ML 1H", "selection": "Home", "line": "", "ev": f"{ev*100:.2f}%"})
+            logger.debug("[AnalyzeMarkets] 1H Home ML: Bet=%s, True=%s, EV=%s", bet_odds_home, true_odds_home, ev, extra=sample_every(20))
+            if ev is not None: potential_bets.append({"market": "ML 1H", "selection": "Home", "line": "", "ev": ev})
             bet_odds_away = american_to_decimal(bet_data.get("away_moneyline_american_1h"))
-            true_odds_away = american_to_decimal(pin_ml_1h.get("nvp_american_away"))
+            true_odds_away = pin_ml_1h.get("nvp_away")
             ev = calculate_ev(bet_odds_away, true_odds_away)
-            print(f"[AnalyzeMarkets] 1H Away ML: Bet={bet_odds_away}, True={true_odds_away}, EV={ev}")
-            if ev is not None: potential_bets.append({"market": "ML 1H", "selection": "Away", "line": "", "ev": f"{ev*100:.2f}%"})
+            logger.debug("[AnalyzeMarkets] 1H Away ML: Bet=%s, True=%s, EV=%s", bet_odds_away, true_odds_away, ev, extra=sample_every(20))
+            if ev is not None: potential_bets.append({"market": "ML 1H", "selection": "Away", "line": "", "ev": ev})
             bet_odds_draw = american_to_decimal(bet_data.get("draw_moneyline_american_1h"))
-            true_odds_draw = american_to_decimal(pin_ml_1h.get("nvp_american_draw"))
+            true_odds_draw = pin_ml_1h.get("nvp_draw")
             ev = calculate_ev(bet_odds_draw, true_odds_draw)
-            print(f"[AnalyzeMarkets] 1H Draw ML: Bet={bet_odds_draw}, True={true_odds_draw}, EV={ev}")
-            if ev is not None: potential_bets.append({"market": "ML 1H", "selection": "Draw", "line": "", "ev": f"{ev*100:.2f}%"})
+            logger.debug("[AnalyzeMarkets] 1H Draw ML: Bet=%s, True=%s, EV=%s", bet_odds_draw, true_odds_draw, ev, extra=sample_every(20))
+            if ev is not None: potential_bets.append({"market": "ML 1H", "selection": "Draw", "line": "", "ev": ev})
 
         # 1H Spreads
         if pin_1h.get("spreads"):
-            print(f"[AnalyzeMarkets] 1H Spreads: {pin_1h.get('spreads')}")
+            logger.debug("[AnalyzeMarkets] 1H Spreads: %s", pin_1h.get('spreads'))
             for pin_spread in pin_1h["spreads"].values():
                 line = str(pin_spread.get("hdp"))
                 bet_spreads_home = bet_data.get("home_spreads_1h", [])
                 bet_spreads_away = bet_data.get("away_spreads_1h", [])
                 bet_odds_home = next((american_to_decimal(s.get("odds")) for s in bet_spreads_home if str(s.get("line")) == line), None)
-                true_odds_home = american_to_decimal(pin_spread.get("nvp_american_home"))
+                true_odds_home = pin_spread.get("nvp_home")
                 ev = calculate_ev(bet_odds_home, true_odds_home)
-                print(f"[AnalyzeMarkets] 1H Spread Home {line}: Bet={bet_odds_home}, True={true_odds_home}, EV={ev}")
+                logger.debug("[AnalyzeMarkets] 1H Spread Home %s: Bet=%s, True=%s, EV=%s", line, bet_odds_home, true_odds_home, ev, extra=sample_every(20))
                 if ev is not None and {"market": "Spread 1H", "selection": "Home", "line": line} not in [b for b in potential_bets]:
-                    potential_bets.append({"market": "Spread 1H", "selection": "Home", "line": line, "ev": f"{ev*100:.2f}%"})
+                    potential_bets.append({"market": "Spread 1H", "selection": "Home", "line": line, "ev": ev})
                 bet_odds_away = next((american_to_decimal(s.get("odds")) for s in bet_spreads_away if str(s.get("line")) == str(-pin_spread.get("hdp"))), None)
-                true_odds_away = american_to_decimal(pin_spread.get("nvp_american_away"))
+                true_odds_away = pin_spread.get("nvp_away")
                 ev = calculate_ev(bet_odds_away, true_odds_away)
-                print(f"[AnalyzeMarkets] 1H Spread Away {line}: Bet={bet_odds_away}, True={true_odds_away}, EV={ev}")
+                logger.debug("[AnalyzeMarkets] 1H Spread Away %s: Bet=%s, True=%s, EV=%s", line, bet_odds_away, true_odds_away, ev, extra=sample_every(20))
                 if ev is not None and {"market": "Spread 1H", "selection": "Away", "line": str(-pin_spread.get("hdp"))} not in [b for b in potential_bets]:
-                    potential_bets.append({"market": "Spread 1H", "selection": "Away", "line": str(-pin_spread.get("hdp")), "ev": f"{ev*100:.2f}%"})
+                    potential_bets.append({"market": "Spread 1H", "selection": "Away", "line": str(-pin_spread.get("hdp")), "ev": ev})
 
         # 1H Totals
         if pin_1h.get("totals"):
-            print(f"[AnalyzeMarkets] 1H Totals: {pin_1h.get('totals')}")
+            logger.debug("[AnalyzeMarkets] 1H Totals: %s", pin_1h.get('totals'))
             for pin_total in pin_1h["totals"].values():
                 line = str(pin_total.get("points"))
                 bet_odds_over = american_to_decimal(bet_data.get("game_total_over_odds_1h"))
-                true_odds_over = american_to_decimal(pin_total.get("nvp_american_over"))
+                true_odds_over = pin_total.get("nvp_over")
                 ev = calculate_ev(bet_odds_over, true_odds_over)
-                print(f"[AnalyzeMarkets] 1H Total Over {line}: Bet={bet_odds_over}, True={true_odds_over}, EV={ev}")
+                logger.debug("[AnalyzeMarkets] 1H Total Over %s: Bet=%s, True=%s, EV=%s", line, bet_odds_over, true_odds_over, ev, extra=sample_every(20))
                 if ev is not None and {"market": "Total 1H", "selection": "Over", "line": line} not in [b for b in potential_bets]:
-                    potential_bets.append({"market": "Total 1H", "selection": "Over", "line": line, "ev": f"{ev*100:.2f}%"})
+                    potential_bets.append({"market": "Total 1H", "selection": "Over", "line": line, "ev": ev})
                 bet_odds_under = american_to_decimal(bet_data.get("game_total_under_odds_1h"))
-                true_odds_under = american_to_decimal(pin_total.get("nvp_american_under"))
+                true_odds_under = pin_total.get("nvp_under")
                 ev = calculate_ev(bet_odds_under, true_odds_under)
-                print(f"[AnalyzeMarkets] 1H Total Under {line}: Bet={bet_odds_under}, True={true_odds_under}, EV={ev}")
+                logger.debug("[AnalyzeMarkets] 1H Total Under %s: Bet=%s, True=%s, EV=%s", line, bet_odds_under, true_odds_under, ev, extra=sample_every(20))
                 if ev is not None and {"market": "Total 1H", "selection": "Under", "line": line} not in [b for b in potential_bets]:
-                    potential_bets.append({"market": "Total 1H", "selection": "Under", "line": line, "ev": f"{ev*100:.2f}%"})
+                    potential_bets.append({"market": "Total 1H", "selection": "Under", "line": line, "ev": ev})
 
     if pin_spreads_dict:
         if bet_data.get("home_spreads"):
@@ -200,20 +198,20 @@ def analyze_markets_for_ev(bet_data, pinnacle_data):
                 try:
                     bck_line = float(bck_s["line"])
                     pin_s_market = next((s for s in pin_spreads_dict.values() if abs(float(s.get("hdp", 0)) - bck_line) < 0.01), None)
-                    if pin_s_market and pin_s_market.get("nvp_american_home"):
-                        ev = calculate_ev(american_to_decimal(bck_s["odds"]), american_to_decimal(pin_s_market.get("nvp_american_home")))
+                    if pin_s_market and pin_s_market.get("nvp_home"):
+                        ev = calculate_ev(american_to_decimal(bck_s["odds"]), pin_s_market.get("nvp_home"))
                         if ev is not None:
-                            potential_bets.append({"market":"Spread","sel":normalize_team_name_for_matching(bet_data["pod_home_team"]),"line":bck_s["line"],"bck_odds":bck_s["odds"],"pin_nvp":pin_s_market.get("nvp_american_home"),"ev":f"{ev*100:.2f}%"})
+                            potential_bets.append({"market":"Spread","sel":normalize_team_name_for_matching(bet_data["pod_home_team"]),"line":bck_s["line"],"bck_odds":american_to_decimal(bck_s["odds"]),"pin_nvp":pin_s_market.get("nvp_home"),"ev":ev})
                 except (ValueError, TypeError): continue
         if bet_data.get("away_spreads"):
             for bck_s in bet_data["away_spreads"]:
                 try:
                     bck_line = float(bck_s["line"])
                     pin_s_market = next((s for s in pin_spreads_dict.values() if abs(float(s.get("hdp", 0)) + bck_line) < 0.01), None)
-                    if pin_s_market and pin_s_market.get("nvp_american_away"):
-                        ev = calculate_ev(american_to_decimal(bck_s["odds"]), american_to_decimal(pin_s_market.get("nvp_american_away")))
+                    if pin_s_market and pin_s_market.get("nvp_away"):
+                        ev = calculate_ev(american_to_decimal(bck_s["odds"]), pin_s_market.get("nvp_away"))
                         if ev is not None:
-                            potential_bets.append({"market":"Spread","sel":normalize_team_name_for_matching(bet_data["pod_away_team"]),"line":bck_s["line"],"bck_odds":bck_s["odds"],"pin_nvp":pin_s_market.get("nvp_american_away"),"ev":f"{ev*100:.2f}%"})
+                            potential_bets.append({"market":"Spread","sel":normalize_team_name_for_matching(bet_data["pod_away_team"]),"line":bck_s["line"],"bck_odds":american_to_decimal(bck_s["odds"]),"pin_nvp":pin_s_market.get("nvp_away"),"ev":ev})
                 except (ValueError, TypeError): continue
     if pin_totals_dict:
         bck_total_line = bet_data.get("game_total_line")
@@ -222,104 +220,100 @@ def analyze_markets_for_ev(bet_data, pinnacle_data):
                 bck_total_line_float = float(bck_total_line)
                 pin_t_market = next((t for t in pin_totals_dict.values() if abs(float(t.get("points", 0)) - bck_total_line_float) < 0.01), None)
                 if pin_t_market:
-                    if bet_data.get("game_total_over_odds") and pin_t_market.get("nvp_american_over"):
-                        ev = calculate_ev(american_to_decimal(bet_data["game_total_over_odds"]), american_to_decimal(pin_t_market.get("nvp_american_over")))
+                    if bet_data.get("game_total_over_odds") and pin_t_market.get("nvp_over"):
+                        ev = calculate_ev(american_to_decimal(bet_data["game_total_over_odds"]), pin_t_market.get("nvp_over"))
                         if ev is not None:
-                            potential_bets.append({"market":"Total","sel":"Over","line":bck_total_line,"bck_odds":bet_data["game_total_over_odds"],"pin_nvp":pin_t_market.get("nvp_american_over"),"ev":f"{ev*100:.2f}%"})
-                    if bet_data.get("game_total_under_odds") and pin_t_market.get("nvp_american_under"):
-                        ev = calculate_ev(american_to_decimal(bet_data["game_total_under_odds"]), american_to_decimal(pin_t_market.get("nvp_american_under")))
+                            potential_bets.append({"market":"Total","sel":"Over","line":bck_total_line,"bck_odds":american_to_decimal(bet_data["game_total_over_odds"]),"pin_nvp":pin_t_market.get("nvp_over"),"ev":ev})
+                    if bet_data.get("game_total_under_odds") and pin_t_market.get("nvp_under"):
+                        ev = calculate_ev(american_to_decimal(bet_data["game_total_under_odds"]), pin_t_market.get("nvp_under"))
                         if ev is not None:
-                            potential_bets.append({"market":"Total","sel":"Under","line":bck_total_line,"bck_odds":bet_data["game_total_under_odds"],"pin_nvp":pin_t_market.get("nvp_american_under"),"ev":f"{ev*100:.2f}%"})
+                            potential_bets.append({"market":"Total","sel":"Under","line":bck_total_line,"bck_odds":american_to_decimal(bet_data["game_total_under_odds"]),"pin_nvp":pin_t_market.get("nvp_under"),"ev":ev})
             except (ValueError, TypeError):
                 pass
     bet_data["potential_bets_analyzed"] = potential_bets
     return {"status": "success", "message": "BetBCK odds analyzed.", "data": bet_data }
 
-def process_alert_and_scrape_betbck(event_id, original_alert_details, processed_pinnacle_data, scrape_betbck=True):
-    print(f"\n[MainLogic] process_alert_and_scrape_betbck initiated for Event ID: {event_id}")
+def ev_rows_for_markets(market_records, pin_data_root, home_sel, away_sel):
+    """
+    Prices normalized market records (see sportsbooks) against Pinnacle's full-game NVPs; returns potential_bets_analyzed
+    rows. Odds in and out are decimal floats and "ev" is a fraction (see odds.py); "pin_odds" is Pinnacle's own price.
+    """
+    potential_bets = []
+    pin_full_game = pin_data_root.get("periods", {}).get("num_0", {})
+    pin_ml = pin_full_game.get("money_line")
+    pin_spreads_dict = pin_full_game.get("spreads")
+    pin_totals_dict = pin_full_game.get("totals")
+    selections = {"home": home_sel, "away": away_sel, "draw": "Draw", "over": "Over", "under": "Under"}
+    for record in market_records:
+        market, side = record["market"], record["side"]
+        try:
+            if market == "ML" and pin_ml:
+                pin_market = pin_ml
+            elif market == "Spread" and pin_spreads_dict:
+                # Pinnacle's hdp is the home line; an away line of +x is hdp -x.
+                hdp = float(record["line"]) * (1 if side == "home" else -1)
+                pin_market = next((s for s in pin_spreads_dict.values() if abs(float(s.get("hdp", 0)) - hdp) < 0.01), None)
+            elif market == "Total" and pin_totals_dict:
+                points = float(record["line"])
+                pin_market = next((t for t in pin_totals_dict.values() if abs(float(t.get("points", 0)) - points) < 0.01), None)
+            else:
+                continue
+        except (ValueError, TypeError):
+            continue
+        pin_nvp = pin_market.get(f"nvp_{side}") if pin_market else None
+        if not pin_nvp:
+            continue
+        ev = calculate_ev(record["odds"], pin_nvp)
+        if ev is not None:
+            potential_bets.append({"market": market, "sel": selections[side], "line": record["line"], "bck_odds": record["odds"],
+                                   "pin_nvp": pin_nvp, "ev": ev, "book": record["book"], "side": side, "pin_odds": pin_market.get(side)})
+    return potential_bets
+
+@timed_stage("ev_analysis")
+def find_ev_bets(bet_data, pin_data_root):
+    """
+    Compares the alert's sportsbook odds against Pinnacle NVPs; returns the rows for potential_bets_analyzed.
+    Uses the merged records of every book (bet_data["book_markets"]) when present, else BetBCK's parsed odds.
+    """
+    market_records = bet_data.get("book_markets")
+    if market_records is None:
+        market_records = betbck_markets(bet_data)
+    return ev_rows_for_markets(market_records, pin_data_root,
+                               normalize_team_name_for_matching(bet_data.get("pod_home_team", "")),
+                               normalize_team_name_for_matching(bet_data.get("pod_away_team", "")))
+
+def process_alert_and_scrape_betbck(event_id, original_alert_details, processed_pinnacle_data, scrape_betbck=True, search_results_html=None, game_parser=None):
+    logger.info("[MainLogic] process_alert_and_scrape_betbck initiated for Event ID: %s", event_id)
     pod_home_team_raw = original_alert_details.get("homeTeam", "")
     pod_away_team_raw = original_alert_details.get("awayTeam", "")
-    prop_keywords = ['(Corners)', '(Bookings)', '(Hits+Runs+Errors)']
-    if any(keyword.lower() in pod_home_team_raw.lower() for keyword in prop_keywords) or any(keyword.lower() in pod_away_team_raw.lower() for keyword in prop_keywords):
-        print(f"[MainLogic] Alert is for a prop bet. Skipping event {event_id}.")
+    if is_prop_alert(pod_home_team_raw, pod_away_team_raw):
+        logger.info("[MainLogic] Alert is for a prop bet. Skipping event %s.", event_id)
         return {"status": "error_prop_bet", "message": "Alert was for a prop bet, which is not supported."}
     if scrape_betbck:
         betbck_search_query = determine_betbck_search_term(pod_home_team_raw, pod_away_team_raw)
         if isinstance(original_alert_details, dict): original_alert_details['betbck_search_term_used'] = betbck_search_query
-        print(f"[MainLogic] POD Teams (Raw): '{pod_home_team_raw}' vs '{pod_away_team_raw}'. BetBCK Search: '{betbck_search_query}'")
-        bet_data = scrape_betbck_for_game(pod_home_team_raw, pod_away_team_raw, search_team_name_betbck=betbck_search_query)
-        if not isinstance(bet_data, dict) or bet_data.get("source") != "betbck.com":
-            error_msg = "Scraper returned no data."
-            if isinstance(bet_data, dict) and "message" in bet_data: error_msg = bet_data["message"]
-            print(f"[MainLogic] Failed BetBCK scrape for '{pod_home_team_raw}'. Reason: {error_msg}")
-            return {"status": "error_betbck_scrape_failed", "message": f"{error_msg} (Searched: '{betbck_search_query}')"}
+        logger.info("[MainLogic] POD Teams (Raw): '%s' vs '%s'. BetBCK Search: '%s'", pod_home_team_raw, pod_away_team_raw, betbck_search_query)
+        quotes = quote_all_books(event_id, original_alert_details, processed_pinnacle_data, book_options={
+            "betbck": {"search_query": betbck_search_query, "search_results_html": search_results_html, "game_parser": game_parser}})
+        quoted = {name: quote for name, quote in quotes.items() if quote.get("status") == "success"}
+        if not quoted:
+            failure = quotes.get("betbck") or next(iter(quotes.values()), {"status": "error", "message": "No sportsbooks are enabled."})
+            logger.warning("[MainLogic] No sportsbook quoted '%s'. Reason: %s", pod_home_team_raw, failure.get("message"))
+            return {"status": failure.get("status", "error"), "message": failure.get("message", "No sportsbook returned odds.")}
+        # BetBCK's parsed odds stay the event's base data (the dashboard and re-checks read them); other books add records.
+        bet_data = dict(quoted["betbck"]["data"]) if "betbck" in quoted else {"pod_home_team": pod_home_team_raw, "pod_away_team": pod_away_team_raw}
+        bet_data["book_markets"] = [record for quote in quoted.values() for record in quote["markets"]]
+        bet_data["books"] = {name: {"status": quote.get("status"), "message": quote.get("message")} for name, quote in quotes.items()}
     else:
         bet_data = original_alert_details.get("betbck_comparison_data", {}).get("data")
         if not bet_data: return {"status": "error", "message": "Re-analysis called but no BetBCK data was found."}
-    print(f"[MainLogic] Analyzing for EV...")
-    potential_bets = []
+    logger.debug("[MainLogic] Analyzing for EV...")
     pin_data_root = processed_pinnacle_data.get("data") if isinstance(processed_pinnacle_data, dict) else None
     if not pin_data_root:
-        print("[MainLogic] ERROR: Pinnacle data is missing or malformed. Cannot analyze for EV.")
+        logger.error("[MainLogic] ERROR: Pinnacle data is missing or malformed. Cannot analyze for EV.")
         bet_data["potential_bets_analyzed"] = []
         return {"status": "success", "message": "BetBCK odds scraped, but Pinnacle data was missing for analysis.", "data": bet_data }
-    pin_periods = pin_data_root.get("periods", {})
-    pin_full_game = pin_periods.get("num_0", {})
-    pin_ml = pin_full_game.get("money_line")
-    pin_spreads_dict = pin_full_game.get("spreads")
-    pin_totals_dict = pin_full_game.get("totals")
-    if pin_ml:
-        if bet_data.get("home_moneyline_american"):
-            ev = calculate_ev(american_to_decimal(bet_data["home_moneyline_american"]), american_to_decimal(pin_ml.get("nvp_american_home")))
-            if ev is not None:
-                potential_bets.append({"market":"ML","sel":normalize_team_name_for_matching(bet_data["pod_home_team"]),"line":"","bck_odds":bet_data["home_moneyline_american"],"pin_nvp":pin_ml.get("nvp_american_home"),"ev":f"{ev*100:.2f}%"})
-        if bet_data.get("away_moneyline_american"):
-            ev = calculate_ev(american_to_decimal(bet_data["away_moneyline_american"]), american_to_decimal(pin_ml.get("nvp_american_away")))
-            if ev is not None:
-                potential_bets.append({"market":"ML","sel":normalize_team_name_for_matching(bet_data["pod_away_team"]),"line":"","bck_odds":bet_data["away_moneyline_american"],"pin_nvp":pin_ml.get("nvp_american_away"),"ev":f"{ev*100:.2f}%"})
-        if bet_data.get("draw_moneyline_american") and pin_ml.get("nvp_american_draw"):
-            ev = calculate_ev(american_to_decimal(bet_data["draw_moneyline_american"]), american_to_decimal(pin_ml.get("nvp_american_draw")))
-            if ev is not None:
-                potential_bets.append({"market":"ML","sel":"Draw","line":"","bck_odds":bet_data["draw_moneyline_american"],"pin_nvp":pin_ml.get("nvp_american_draw"),"ev":f"{ev*100:.2f}%"})
-    if pin_spreads_dict:
-        if bet_data.get("home_spreads"):
-            for bck_s in bet_data["home_spreads"]:
-                try:
-                    bck_line = float(bck_s["line"])
-                    pin_s_market = next((s for s in pin_spreads_dict.values() if abs(float(s.get("hdp", 0)) - bck_line) < 0.01), None)
-                    if pin_s_market and pin_s_market.get("nvp_american_home"):
-                        ev = calculate_ev(american_to_decimal(bck_s["odds"]), american_to_decimal(pin_s_market.get("nvp_american_home")))
-                        if ev is not None:
-                            potential_bets.append({"market":"Spread","sel":normalize_team_name_for_matching(bet_data["pod_home_team"]),"line":bck_s["line"],"bck_odds":bck_s["odds"],"pin_nvp":pin_s_market.get("nvp_american_home"),"ev":f"{ev*100:.2f}%"})
-                except (ValueError, TypeError): continue
-        if bet_data.get("away_spreads"):
-            for bck_s in bet_data["away_spreads"]:
-                try:
-                    bck_line = float(bck_s["line"])
-                    pin_s_market = next((s for s in pin_spreads_dict.values() if abs(float(s.get("hdp", 0)) + bck_line) < 0.01), None)
-                    if pin_s_market and pin_s_market.get("nvp_american_away"):
-                        ev = calculate_ev(american_to_decimal(bck_s["odds"]), american_to_decimal(pin_s_market.get("nvp_american_away")))
-                        if ev is not None:
-                            potential_bets.append({"market":"Spread","sel":normalize_team_name_for_matching(bet_data["pod_away_team"]),"line":bck_s["line"],"bck_odds":bck_s["odds"],"pin_nvp":pin_s_market.get("nvp_american_away"),"ev":f"{ev*100:.2f}%"})
-                except (ValueError, TypeError): continue
-    if pin_totals_dict:
-        bck_total_line = bet_data.get("game_total_line")
-        if bck_total_line:
-            try:
-                bck_total_line_float = float(bck_total_line)
-                pin_t_market = next((t for t in pin_totals_dict.values() if abs(float(t.get("points", 0)) - bck_total_line_float) < 0.01), None)
-                if pin_t_market:
-                    if bet_data.get("game_total_over_odds") and pin_t_market.get("nvp_american_over"):
-                        ev = calculate_ev(american_to_decimal(bet_data["game_total_over_odds"]), american_to_decimal(pin_t_market.get("nvp_american_over")))
-                        if ev is not None:
-                            potential_bets.append({"market":"Total","sel":"Over","line":bck_total_line,"bck_odds":bet_data["game_total_over_odds"],"pin_nvp":pin_t_market.get("nvp_american_over"),"ev":f"{ev*100:.2f}%"})
-                    if bet_data.get("game_total_under_odds") and pin_t_market.get("nvp_american_under"):
-                        ev = calculate_ev(american_to_decimal(bet_data["game_total_under_odds"]), american_to_decimal(pin_t_market.get("nvp_american_under")))
-                        if ev is not None:
-                            potential_bets.append({"market":"Total","sel":"Under","line":bck_total_line,"bck_odds":bet_data["game_total_under_odds"],"pin_nvp":pin_t_market.get("nvp_american_under"),"ev":f"{ev*100:.2f}%"})
-            except (ValueError, TypeError):
-                pass
-    bet_data["potential_bets_analyzed"] = potential_bets
+    bet_data["potential_bets_analyzed"] = find_ev_bets(bet_data, pin_data_root)
     return {"status": "success", "message": "BetBCK odds analyzed.", "data": bet_data }
 
 def process_pod_alert(alert_data):
@@ -330,15 +324,15 @@ def process_pod_alert(alert_data):
         search_term = alert_data.get('search_term', '').lower()
         
         if not event_id or not search_term:
-            print(f"[MainLogic] Invalid alert data: {alert_data}")
+            logger.warning("[MainLogic] Invalid alert data: %s", alert_data)
             return
             
-        print(f"[MainLogic] Processing alert for Event ID: {event_id}")
+        logger.info("[MainLogic] Processing alert for Event ID: %s", event_id)
         
         # Get event details from Pinnacle
         pinnacle_data = fetch_pinnacle_event(event_id)
         if not pinnacle_data:
-            print(f"[MainLogic] Failed to fetch Pinnacle data for event {event_id}")
+            logger.warning("[MainLogic] Failed to fetch Pinnacle data for event %s", event_id)
             return
             
         # Extract team names and league from Pinnacle data
@@ -348,11 +342,11 @@ def process_pod_alert(alert_data):
         start_time = pinnacle_data.get('starts', '')
         
         # Search BetBCK
-        print(f"[MainLogic] Searching BetBCK for '{search_term}'")
+        logger.info("[MainLogic] Searching BetBCK for '%s'", search_term)
         betbck_data = search_betbck(search_term)
         
         if not betbck_data:
-            print(f"[MainLogic] No BetBCK data found for '{search_term}'")
+            logger.warning("[MainLogic] No BetBCK data found for '%s'", search_term)
             return
             
         # Create event data
@@ -368,11 +362,10 @@ def process_pod_alert(alert_data):
         
         # Add to active events
         active_events[event_id] = event_data
-        print(f"[MainLogic] Added event {event_id} to active events")
+        logger.info("[MainLogic] Added event %s to active events", event_id)
         
         # Save to file
         save_active_events()
         
     except Exception as e:
-        print(f"[MainLogic] Error processing POD alert: {str(e)}")
-        traceback.print_exc()
\ No newline at end of file
+        logger.exception("[MainLogic] Error processing POD alert: %s", str(e))
\ No newline at end of file
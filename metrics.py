@@ -0,0 +1,179 @@
+"""
+In-process latency histograms and counters, exposed by the server at /metrics.
+
+    from metrics import stage_timer, count
+
+    with stage_timer("betbck_login"):
+        ...
+    count("podbot_swordfish_fetches_total", result="ok")
+
+Metrics are per process. With several server processes each /metrics response
+covers the process that answered it.
+"""
+import bisect
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+# Upper bounds in seconds; wide enough to cover a sub-millisecond parse and a 15s BetBCK search.
+DEFAULT_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                           1.0, 2.5, 5.0, 10.0, 20.0, 60.0)
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+def _format_labels(label_key, extra=()):
+    pairs = list(label_key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{str(v)}"' for k, v in pairs) + "}"
+
+class Histogram:
+    def __init__(self, name, help_text, buckets=DEFAULT_LATENCY_BUCKETS):
+        self.name, self.help_text, self.buckets = name, help_text, tuple(buckets)
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, value, **labels):
+        key = _label_key(labels)
+        idx = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][idx] += 1
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {key: (list(counts), total, n) for key, (counts, total, n) in self._series.items()}
+
+    def quantile(self, q, **labels):
+        """Estimates a quantile from the bucket counts, interpolating linearly inside the bucket."""
+        series = self.snapshot().get(_label_key(labels))
+        if not series or not series[2]:
+            return None
+        counts, _, n = series
+        target, running = q * n, 0
+        for i, c in enumerate(counts):
+            if c and running + c >= target:
+                if i == len(self.buckets):
+                    return float("inf")
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (target - running) / c
+            running += c
+        return float("inf")
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total, n) in sorted(self.snapshot().items()):
+            running = 0
+            for bound, c in zip(self.buckets, counts):
+                running += c
+                lines.append(f"{self.name}_bucket{_format_labels(key, [('le', bound)])} {running}")
+            lines.append(f"{self.name}_bucket{_format_labels(key, [('le', '+Inf')])} {n}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {total:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {n}")
+        return lines
+
+    def summary(self):
+        out = {}
+        for key, (counts, total, n) in self.snapshot().items():
+            labels = dict(key)
+            out[",".join(f"{k}={v}" for k, v in key) or "all"] = {
+                "count": n,
+                "mean_ms": round(total / n * 1000, 3) if n else None,
+                "p50_ms": _ms(self.quantile(0.5, **labels)),
+                "p95_ms": _ms(self.quantile(0.95, **labels)),
+                "p99_ms": _ms(self.quantile(0.99, **labels)),
+            }
+        return out
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name, self.help_text = name, help_text
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(_label_key(labels), 0)
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"] + \
+               [f"{self.name}{_format_labels(key)} {value}" for key, value in items]
+
+    def summary(self):
+        with self._lock:
+            return {",".join(f"{k}={v}" for k, v in key) or "all": value for key, value in self._values.items()}
+
+def _ms(seconds):
+    if seconds is None:
+        return None
+    return "inf" if seconds == float("inf") else round(seconds * 1000, 3)
+
+_registry_lock = threading.Lock()
+_registry = {}
+
+def histogram(name, help_text="", buckets=DEFAULT_LATENCY_BUCKETS):
+    with _registry_lock:
+        metric = _registry.get(name)
+        if metric is None:
+            metric = _registry[name] = Histogram(name, help_text, buckets)
+        return metric
+
+def counter(name, help_text=""):
+    with _registry_lock:
+        metric = _registry.get(name)
+        if metric is None:
+            metric = _registry[name] = Counter(name, help_text)
+        return metric
+
+STAGE_SECONDS = histogram("podbot_stage_duration_seconds", "Latency of each pipeline stage.")
+
+@contextmanager
+def stage_timer(stage, **labels):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STAGE_SECONDS.observe(time.perf_counter() - start, stage=stage, **labels)
+
+def timed_stage(stage):
+    """Decorator form of stage_timer."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage_timer(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def observe_stage(stage, seconds, **labels):
+    STAGE_SECONDS.observe(seconds, stage=stage, **labels)
+
+def count(name, amount=1, **labels):
+    counter(name).inc(amount, **labels)
+
+def render_prometheus():
+    with _registry_lock:
+        metrics = list(_registry.values())
+    lines = []
+    for metric in sorted(metrics, key=lambda m: m.name):
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+def render_summary():
+    """Human-readable view: count/mean/p50/p95/p99 per histogram series, values per counter."""
+    with _registry_lock:
+        metrics = list(_registry.values())
+    return {metric.name: metric.summary() for metric in sorted(metrics, key=lambda m: m.name)}
@@ -0,0 +1,55 @@
+"""
+Odds inside PODBot are decimal odds held as floats: Pinnacle prices and NVPs as Swordfish sends
+them, and sportsbook prices parsed once where they are scraped (sportsbooks.market_record).
+NVP, EV, state and the change detector all work on those numbers. American strings are made
+only at the response boundary (dashboard_payload) and in log lines.
+
+EV values are fractions (0.0321 is +3.21%).
+"""
+import re
+
+_AMERICAN_RE = re.compile(r"^[+-]?\d+(?:\.\d+)?$")
+_EVEN_MONEY = {"ev", "even", "evs"}
+
+def american_to_decimal(american_odds):
+    """Decimal odds for American odds given as a number or a string like "+105" / "-110" / "EVEN". None if unparseable."""
+    if american_odds is None or isinstance(american_odds, bool):
+        return None
+    if isinstance(american_odds, str):
+        text = american_odds.strip()
+        if text.lower() in _EVEN_MONEY:
+            return 2.0
+        if not _AMERICAN_RE.match(text):
+            return None
+        american_odds = float(text)
+    elif not isinstance(american_odds, (int, float)):
+        return None
+    if american_odds > 0:
+        return american_odds / 100.0 + 1.0
+    if american_odds < 0:
+        return 100.0 / -american_odds + 1.0
+    return None
+
+def decimal_to_american(decimal_odds):
+    """American odds string ("+105", "-110") for decimal odds, or None for missing or invalid odds."""
+    if decimal_odds is None or isinstance(decimal_odds, bool) or not isinstance(decimal_odds, (float, int)):
+        return None
+    if decimal_odds <= 1.0001:
+        return None
+    if decimal_odds >= 2.0:
+        return f"+{int(round((decimal_odds - 1) * 100))}"
+    return f"{int(round(-100 / (decimal_odds - 1)))}"
+
+def implied_probability(decimal_odds):
+    return 1.0 / decimal_odds if decimal_odds else None
+
+def format_odds(decimal_odds, missing="N/A"):
+    """Display form of decimal odds. Strings (e.g. odds stored before they were numeric) pass through."""
+    if isinstance(decimal_odds, str):
+        return decimal_odds
+    return decimal_to_american(decimal_odds) or missing
+
+def format_ev(ev, missing="N/A"):
+    if isinstance(ev, str):
+        return ev
+    return f"{ev * 100:.2f}%" if ev is not None else missing
@@ -0,0 +1,151 @@
+"""
+Worker processes for the CPU-bound part of BetBCK scraping: building BeautifulSoup trees,
+normalizing team names and fuzzy matching. These hold the GIL, so while a large results page
+is parsed in a request thread the other request threads and the refresher stall.
+
+With PODBOT_PARSE_WORKERS=N (default 0, off) the server starts N worker processes and
+betbck_scraper sends them the page or game-table HTML plus the POD teams to match; only the
+parsed game record comes back. Game pins, metrics and logging of the outcome stay in the
+server process.
+
+    run(fn, *args)   fn(*args) on a worker, or in this process when the pool is off, full
+                     (more than PODBOT_PARSE_QUEUE tasks waiting) or broken
+
+Workers come from a forkserver, so they never inherit the server's threads or locks, and
+each one imports the parser and matches a sample table before taking work. A worker reloads
+config.json when the server's config has changed since the worker last read it.
+"""
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout, wait
+from concurrent.futures.process import BrokenProcessPool
+
+import podbot_config
+from metrics import counter, histogram
+from podbot_logging import get_logger
+
+logger = get_logger("parse_pool")
+
+PARSE_WORKERS = int(os.environ.get("PODBOT_PARSE_WORKERS", "0"))
+PARSE_QUEUE = int(os.environ.get("PODBOT_PARSE_QUEUE", "0")) or max(PARSE_WORKERS * 2, 1)
+PARSE_TIMEOUT_SECONDS = 10.0
+
+TASKS = counter("podbot_parse_pool_tasks_total", "Parse tasks by where they ran (worker, inline_off, inline_full, inline_error).")
+WAIT_SECONDS = histogram("podbot_parse_pool_task_seconds", "Wall time of parse tasks sent to a worker, including the round trip.")
+
+_WARM_HTML = ('<table class="table_container_betting Soccer"><tr><td class="tbl_betAmount_team1_main_name">'
+              '<div class="team1_name_up">Warm Up FC</div><div class="team2_name_down">Warm Down FC</div></td></tr></table>')
+
+# --- Worker side ---
+_worker_stamp = None  # config stamp this worker last tried to load
+
+def _warm_worker():
+    import betbck_scraper  # also imports utils and the normalization tables
+    podbot_config.current()
+    betbck_scraper._examine_wrapper(_WARM_HTML, 0, "Nobody", "Nowhere", "nobody", "nowhere", None)  # no match: no logging
+
+def _call(stamp, fn, args):
+    global _worker_stamp
+    if stamp != _worker_stamp:
+        _worker_stamp = stamp
+        if podbot_config.current().stamp != stamp:
+            podbot_config.reload()
+    return fn(*args)
+
+def _ping():
+    return os.getpid()
+
+# --- Server side ---
+class ParsePool:
+    """A warm process pool with a bounded number of waiting tasks; anything it cannot take runs inline."""
+
+    def __init__(self, workers=PARSE_WORKERS, max_queued=PARSE_QUEUE, timeout=PARSE_TIMEOUT_SECONDS):
+        self.workers, self.timeout = workers, timeout
+        self._slots = threading.BoundedSemaphore(workers + max_queued) if workers > 0 else None
+        self._executor = None
+        self._wanted = False  # between start() and stop(), so a restart after a crash does not outlive stop()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self):
+        return self._executor is not None
+
+    def start(self):
+        """Starts the workers and waits until each has imported the parser. Does nothing with 0 workers."""
+        with self._lock:
+            self._wanted = True
+            if self.workers <= 0 or self._executor is not None:
+                return
+            started = time.perf_counter()
+            context = multiprocessing.get_context("forkserver")
+            # Only thread-free libraries: anything importing podbot_logging starts a thread, and the
+            # default preload of __main__ would import the whole server into the forkserver.
+            context.set_forkserver_preload(["bs4", "fuzzywuzzy.fuzz"])
+            executor = ProcessPoolExecutor(self.workers, mp_context=context, initializer=_warm_worker)
+            # Idle workers are only forked when a task finds none, so one ping per worker starts them all now.
+            pids = {f.result() for f in [executor.submit(_ping) for _ in range(self.workers)]}
+            self._executor = executor
+        logger.info("[ParsePool] %s parse workers ready in %.2fs (pids %s).", self.workers, time.perf_counter() - started,
+                    ", ".join(map(str, sorted(pids))))
+
+    def stop(self, timeout=5):
+        with self._lock:
+            self._wanted = False
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+            logger.info("[ParsePool] Parse workers stopped.")
+
+    def run(self, fn, *args):
+        """fn(*args), on a worker when one can take it. fn must be a module-level function; args and result must pickle."""
+        executor = self._executor
+        if executor is None:
+            TASKS.inc(where="inline_off")
+            return fn(*args)
+        if not self._slots.acquire(blocking=False):
+            TASKS.inc(where="inline_full")
+            return fn(*args)
+        started = time.perf_counter()
+        try:
+            future = executor.submit(_call, podbot_config.current().stamp, fn, args)
+            done, _ = wait([future], timeout=self.timeout)
+            if not done:
+                future.cancel()
+                raise FutureTimeout(f"no result after {self.timeout}s")
+            result = future.result()
+        except (BrokenProcessPool, FutureTimeout) as e:
+            if isinstance(e, BrokenProcessPool):
+                self._restart_broken(executor)
+            logger.error("[ParsePool] %s failed on a worker, parsing in process: %s", fn.__name__, e)
+            TASKS.inc(where="inline_error")
+            return fn(*args)
+        except RuntimeError:
+            if self._executor is executor:
+                raise
+            TASKS.inc(where="inline_off")  # the pool was stopped between the check above and submit()
+            return fn(*args)
+        finally:
+            self._slots.release()
+        WAIT_SECONDS.observe(time.perf_counter() - started)
+        TASKS.inc(where="worker")
+        return result
+
+    def _restart_broken(self, executor):
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+        logger.error("[ParsePool] A parse worker died; restarting the pool.")
+        threading.Thread(target=self._restart, name="parse-pool-restart", daemon=True).start()
+
+    def _restart(self):
+        if self._wanted:
+            self.start()
+
+parse_pool = ParsePool()
+
+def run(fn, *args):
+    return parse_pool.run(fn, *args)
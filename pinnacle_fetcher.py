@@ -1,9 +1,62 @@
 import requests
 import json
+import os
+import threading
+import time
+from urllib.parse import quote
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
 
+from circuit_breaker import CircuitBreaker
+from metrics import counter, histogram, timed_stage
+from podbot_logging import get_logger
+from rate_limit import DeadlineExceeded, set_host_default, try_slot, wait_for_slot
+from traffic_capture import capture, capturing
+
+logger = get_logger("pinnacle")
+
+FETCHES = counter("podbot_swordfish_fetches_total", "Swordfish event fetches by result.")
+REQUEST_SECONDS = histogram("podbot_swordfish_request_seconds", "Latency of single Swordfish HTTP requests by attempt (primary or hedge).")
+HEDGES = counter("podbot_swordfish_hedges_total", "Hedge requests sent and which request answered first.")
+BULK_FETCHES = counter("podbot_swordfish_bulk_fetches_total", "League-level Swordfish fetches by result.")
+BULK_EVENTS = counter("podbot_swordfish_bulk_events_total", "Events asked for in league fetches, by whether the response covered them.")
+
+REQUEST_TIMEOUT_SECONDS = 10
+# Once the primary request has run longer than the p95 of the last HEDGE_WINDOW requests, an identical
+# hedge request is sent and whichever answers first is used; the other finishes unobserved in the background.
+HEDGE_WINDOW = 200
+HEDGE_MIN_SAMPLES = 20  # until then, hedge after HEDGE_DEFAULT_DELAY_SECONDS
+HEDGE_DEFAULT_DELAY_SECONDS = 2.0
+HEDGE_MIN_DELAY_SECONDS = 0.05
+# While the breaker is open, fetches return the last good response for the event if it is this recent.
+CACHE_MAX_AGE_SECONDS = 300
+
+breaker = CircuitBreaker("swordfish", failure_threshold=5, reset_timeout=30.0)
+_request_pool = ThreadPoolExecutor(max_workers=32, thread_name_prefix="swordfish")
+_recent_latencies = deque(maxlen=HEDGE_WINDOW)
+_recent_latencies_lock = threading.Lock()
+_last_good = {}  # event_id -> (time.time(), raw response bytes); callers mutate parsed data, so keep bytes
+_last_good_lock = threading.Lock()
+
 # THIS IS THE CORRECT API ENDPOINT BASED ON YOUR SCREENSHOT image_c24d2e.png
-SWORDFISH_API_BASE_URL = "https://swordfish-production.up.railway.app/events/"
+SWORDFISH_API_BASE_URL = os.environ.get("PODBOT_SWORDFISH_URL", "https://swordfish-production.up.railway.app/events/")
+# League-level endpoint, e.g. "https://host/events?league={league}". It must answer with a JSON array
+# (or {"data": [...]}) of events in the per-event response shape. Unset: every event is fetched on its own.
+SWORDFISH_BULK_URL = os.environ.get("PODBOT_SWORDFISH_BULK_URL", "")
+BULK_MIN_EVENTS = 2  # a league with one active event uses the per-event endpoint, which is hedged
+BULK_TIMEOUT_SECONDS = 15
+# After a 4xx from the bulk endpoint (it does not support the query), leagues go per event for this long.
+BULK_RETRY_SECONDS = 600
+_bulk_disabled_until = 0.0
+# The background refresher makes one per-event request per active event every 3 s, which the 5/s
+# default for other hosts caps at about 15 events a cycle. 20/s with bursts of 40 keeps the 3 s
+# cadence up to about 60 active events with room for alerts and hedges; beyond that cycles stretch
+# (refreshes wait behind alerts, and are dropped only once their event expires). Override with
+# PODBOT_RATE_LIMITS="<swordfish host>=rate:burst".
+SWORDFISH_RATE_LIMIT = (20.0, 40)
+set_host_default(SWORDFISH_API_BASE_URL, *SWORDFISH_RATE_LIMIT)
+set_host_default(SWORDFISH_BULK_URL, *SWORDFISH_RATE_LIMIT)
 
 # Mimic headers from your screenshot image_c24d2e.png
 # These seemed to work for you in the test script
@@ -20,37 +73,203 @@ REQUEST_HEADERS = {
     "Sec-Fetch-Site": "cross-site",
 }
 
+def hedge_delay():
+    """Seconds to give the primary request before hedging: the p95 of recent request latencies."""
+    with _recent_latencies_lock:
+        recent = sorted(_recent_latencies)
+    if len(recent) < HEDGE_MIN_SAMPLES:
+        return HEDGE_DEFAULT_DELAY_SECONDS
+    return max(recent[min(len(recent) - 1, int(len(recent) * 0.95))], HEDGE_MIN_DELAY_SECONDS)
+
+def _timed_get(url, attempt):
+    start = time.perf_counter()
+    try:
+        response = requests.get(url, headers=REQUEST_HEADERS, timeout=REQUEST_TIMEOUT_SECONDS)
+    finally:
+        elapsed = time.perf_counter() - start
+        REQUEST_SECONDS.observe(elapsed, attempt=attempt)
+    # Only answered requests feed the hedge delay, so a run of timeouts does not push it to 10s.
+    with _recent_latencies_lock:
+        _recent_latencies.append(elapsed)
+    return response
+
+def _hedged_get(url):
+    primary = _request_pool.submit(_timed_get, url, "primary")
+    done, _ = wait([primary], timeout=hedge_delay())
+    # No hedging on a half-open trial call, or when the host has no free rate-limit slot.
+    if done or breaker.state != "closed" or not try_slot(url):
+        return primary.result()
+    HEDGES.inc(result="sent")
+    pending = {primary, _request_pool.submit(_timed_get, url, "hedge")}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                HEDGES.inc(result="primary_won" if future is primary else "hedge_won")
+                return future.result()
+            error = future.exception()
+    raise error
+
+def _remember(event_id, raw):
+    now = time.time()
+    with _last_good_lock:
+        _last_good[str(event_id)] = (now, raw)
+        if len(_last_good) > 1000:
+            for key in [k for k, (ts, _) in _last_good.items() if now - ts > CACHE_MAX_AGE_SECONDS]:
+                del _last_good[key]
+
+def _cached_or_error(event_id, error_message):
+    with _last_good_lock:
+        cached = _last_good.get(str(event_id))
+    if cached and time.time() - cached[0] <= CACHE_MAX_AGE_SECONDS:
+        FETCHES.inc(result="cached")
+        return {"success": True, "data": json.loads(cached[1]), "event_id": event_id, "cached": True, "fetched_at": cached[0]}
+    FETCHES.inc(result="circuit_open")
+    return {"success": False, "error": error_message, "event_id": event_id}
+
+@timed_stage("swordfish_fetch")
 def fetch_live_pinnacle_event_odds(event_id):
     """
     Fetches all live lines for a given event_id from the Swordfish API that POD uses.
+    Slow requests are hedged. While the circuit breaker is open, this fails fast with the event's
+    last good data (marked "cached": True) when there is some, or an error result when there is not.
     """
     url = f"{SWORDFISH_API_BASE_URL}{event_id}"
-    print(f"[Pinnacle Fetcher] Attempting to fetch: {url}")
+    logger.debug("[Pinnacle Fetcher] Attempting to fetch: %s", url)
+    if not breaker.allow():
+        return _cached_or_error(event_id, "Swordfish circuit breaker is open.")
     try:
-        response = requests.get(url, headers=REQUEST_HEADERS, timeout=10)
+        wait_for_slot(url)
+        started = time.perf_counter()
+        response = _hedged_get(url)
+        if capturing():
+            capture("swordfish", event_id=str(event_id), status=response.status_code, body=response.text,
+                    ms=round((time.perf_counter() - started) * 1000, 1))
         response.raise_for_status()  # Raises an HTTPError for bad responses (4XX or 5XX)
         
-        print(f"[Pinnacle Fetcher] Status Code: {response.status_code} for {event_id}")
+        logger.debug("[Pinnacle Fetcher] Status Code: %s for %s", response.status_code, event_id)
         odds_data = response.json()
+        breaker.record_success()
+        _remember(event_id, response.content)
+        FETCHES.inc(result="ok")
         return {"success": True, "data": odds_data, "event_id": event_id}
 
+    except DeadlineExceeded as stale:
+        logger.warning("[Pinnacle Fetcher] Fetch for %s dropped: %s", event_id, stale)
+        FETCHES.inc(result="stale")
+        return {"success": False, "error": str(stale), "event_id": event_id}
     except requests.exceptions.HTTPError as http_err:
+        # A 4xx is about this request or event; only 5xx counts against Swordfish's health.
+        if response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
         error_message = f"HTTP error occurred: {http_err} - Response: {response.text[:200]}"
-        print(f"[Pinnacle Fetcher] {error_message}")
+        logger.error("[Pinnacle Fetcher] %s", error_message)
+        FETCHES.inc(result="http_error")
         return {"success": False, "error": error_message, "event_id": event_id}
     except requests.exceptions.RequestException as req_err:
         error_message = f"Request error occurred: {req_err}"
-        print(f"[Pinnacle Fetcher] {error_message}")
+        logger.error("[Pinnacle Fetcher] %s", error_message)
+        breaker.record_failure()
+        FETCHES.inc(result="request_error")
         return {"success": False, "error": error_message, "event_id": event_id}
     except json.JSONDecodeError as json_err:
         error_message = f"Failed to decode JSON: {json_err} - Response text: {response.text[:200]}"
-        print(f"[Pinnacle Fetcher] {error_message}")
+        logger.error("[Pinnacle Fetcher] %s", error_message)
+        breaker.record_failure()
+        FETCHES.inc(result="bad_json")
         return {"success": False, "error": error_message, "event_id": event_id}
     except Exception as e:
         error_message = f"An unexpected error occurred: {e}"
-        print(f"[Pinnacle Fetcher] {error_message}")
+        logger.error("[Pinnacle Fetcher] %s", error_message)
+        breaker.record_failure()
+        FETCHES.inc(result="error")
         return {"success": False, "error": error_message, "event_id": event_id}
 
+def bulk_enabled():
+    return bool(SWORDFISH_BULK_URL) and time.time() >= _bulk_disabled_until
+
+def _split_bulk_events(payload):
+    """{event_id str: per-event response} from a bulk response; items may be bare events or {"data": event}."""
+    if isinstance(payload, dict):
+        payload = payload.get("data", payload.get("events"))
+    if not isinstance(payload, list):
+        raise ValueError("expected a list of events")
+    events = {}
+    for item in payload:
+        event = item.get("data", item) if isinstance(item, dict) else None
+        if isinstance(event, dict) and event.get("event_id") is not None:
+            events[str(event["event_id"])] = {"data": event}
+    return events
+
+@timed_stage("swordfish_bulk_fetch")
+def fetch_live_pinnacle_league_odds(league_name, event_ids=None):
+    """
+    Fetches every event of a league in one request from SWORDFISH_BULK_URL. Returns {event_id: result},
+    with results shaped like fetch_live_pinnacle_event_odds() ("bulk": True), for the requested events
+    the response covered, or for every event in it when event_ids is None. Events left out, and every
+    event when the request fails or bulk fetching is off, are missing from the result; callers fetch
+    those with fetch_live_pinnacle_event_odds().
+    """
+    global _bulk_disabled_until
+    if event_ids is not None:
+        event_ids = [str(e) for e in event_ids]
+        if len(event_ids) < BULK_MIN_EVENTS:
+            return {}
+    if not (bulk_enabled() and league_name):
+        return {}
+    if not breaker.allow():
+        BULK_FETCHES.inc(result="circuit_open")
+        return {}
+    url = SWORDFISH_BULK_URL.format(league=quote(str(league_name), safe=""))
+    try:
+        wait_for_slot(url)
+        started = time.perf_counter()
+        try:
+            response = requests.get(url, headers=REQUEST_HEADERS, timeout=BULK_TIMEOUT_SECONDS)
+        finally:
+            REQUEST_SECONDS.observe(time.perf_counter() - started, attempt="bulk")
+        if 400 <= response.status_code < 500:
+            _bulk_disabled_until = time.time() + BULK_RETRY_SECONDS
+            breaker.record_success()
+            logger.warning("[Pinnacle Fetcher] Bulk fetch for league '%s' answered %s; fetching per event for %ss.",
+                           league_name, response.status_code, BULK_RETRY_SECONDS)
+            BULK_FETCHES.inc(result="unsupported")
+            return {}
+        response.raise_for_status()
+        events = _split_bulk_events(response.json())
+    except DeadlineExceeded as stale:
+        logger.warning("[Pinnacle Fetcher] Bulk fetch for league '%s' dropped: %s", league_name, stale)
+        BULK_FETCHES.inc(result="stale")
+        return {}
+    except (requests.exceptions.RequestException, ValueError) as e:
+        breaker.record_failure()
+        logger.error("[Pinnacle Fetcher] Bulk fetch for league '%s' failed, fetching per event: %s", league_name, e)
+        BULK_FETCHES.inc(result="error")
+        return {}
+    breaker.record_success()
+    BULK_FETCHES.inc(result="ok")
+    ms = round((time.perf_counter() - started) * 1000, 1)
+    results = {}
+    if event_ids is None:
+        event_ids = list(events)
+    for event_id in event_ids:
+        event = events.get(event_id)
+        if event is None:
+            continue
+        raw = json.dumps(event)
+        _remember(event_id, raw.encode())
+        if capturing():
+            # Captured as per-event answers, so replays serve them through the per-event endpoint.
+            capture("swordfish", event_id=event_id, status=200, body=raw, ms=ms)
+        results[event_id] = {"success": True, "data": event, "event_id": event_id, "bulk": True}
+    BULK_EVENTS.inc(len(results), result="covered")
+    BULK_EVENTS.inc(len(event_ids) - len(results), result="missing")
+    logger.debug("[Pinnacle Fetcher] Bulk fetch for league '%s' covered %s of %s events", league_name, len(results), len(event_ids))
+    return results
+
 if __name__ == '__main__':
     # Example Test
     test_event_id = "1609669590" # Nautico vs Sao Paulo (use a fresh one if this is old)
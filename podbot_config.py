@@ -0,0 +1,304 @@
+"""
+Typed PODBot configuration from config.json (or PODBOT_CONFIG_PATH), loaded on first use and hot-reloaded.
+
+    cfg = podbot_config.current()
+    cfg.betbck.search_action_url, cfg.sportsbooks.enabled, cfg.normalization.alias_to_canonical, cfg.sweep.leagues
+
+current() returns an immutable PodbotConfig; callers take it once per operation, so a reload in
+the middle of a scrape never mixes old and new settings. A file that fails validation raises
+ConfigError from load_config() (and from current() when nothing valid has been loaded yet)
+with every problem listed; nothing here exits the process.
+
+ConfigWatcher polls the file's mtime and size. A changed file is loaded, validated and its
+derived tables (alias lookups, wrapper class sets) are built on the watcher thread, and only
+then is the new object swapped in with a single assignment. An invalid file is logged and the
+running config stays in place.
+"""
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import cached_property
+from types import MappingProxyType
+
+from metrics import counter
+from podbot_logging import get_logger
+
+logger = get_logger("config")
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_POLL_SECONDS = 2.0
+
+DEFAULT_SEARCH_ACTION_URL = "https://betbck.com/Qubic/PlayerGameSelection.php"
+DEFAULT_GAME_WRAPPER_PRIMARY_CLASSES = (
+    "table_container_betting Soccer", "table_container_betting Baseball",
+    "table_container_betting Basketball", "table_container_betting Hockey",
+    "table_container_betting American Football", "table_container_betting Tennis",
+)
+DEFAULT_GAME_WRAPPER_FALLBACK_CLASSES = ("teams_betting_options_2", "teams_betting_options")
+# Used when config.json has no "normalization" section.
+DEFAULT_TEAM_ALIASES = {
+    "north korea": ["korea dpr", "dpr korea", "democratic people's republic of korea"],
+    "south korea": ["korea republic", "republic of korea"],
+    "ivory coast": ["cote d'ivoire"],
+    "czech republic": ["czechia"],
+    "united states": ["usa", "us", "united states of america"],
+    "iran": ["iran", "iran isl", "islamic republic of iran"],
+    "russia": ["russian federation"],
+}
+DEFAULT_SEARCH_TERMS = {
+    "south korea": "Korea", "faroe islands": "Faroe", "milwaukee brewers": "Brewers",
+    "philadelphia phillies": "Phillies", "los angeles angels": "Angels", "pittsburgh pirates": "Pirates",
+    "arizona diamondbacks": "Diamondbacks", "san diego padres": "Padres", "italy": "Italy",
+    "st. louis cardinals": "Cardinals", "china pr": "China", "bahrain": "Bahrain", "czechia": "Czech Republic",
+    "athletic club": "Athletic Club", "romania": "Romania", "cyprus": "Cyprus",
+}
+
+RELOADS = counter("podbot_config_reloads_total", "Config reloads by result.")
+
+class ConfigError(ValueError):
+    pass
+
+@dataclass(frozen=True)
+class BetbckConfig:
+    credentials: MappingProxyType
+    headers: MappingProxyType
+    login_page_url: str
+    login_action_url: str
+    main_page_url_after_login: str
+    search_action_url: str = DEFAULT_SEARCH_ACTION_URL
+    game_wrapper_primary_classes: tuple = DEFAULT_GAME_WRAPPER_PRIMARY_CLASSES
+    game_wrapper_fallback_classes: tuple = DEFAULT_GAME_WRAPPER_FALLBACK_CLASSES
+    stream_search_results: bool = True
+
+    @cached_property
+    def primary_class_set(self):
+        """Primary wrapper classes with whitespace collapsed, as the streaming parser compares them."""
+        return frozenset(" ".join(c.split()) for c in self.game_wrapper_primary_classes)
+
+@dataclass(frozen=True)
+class SportsbooksConfig:
+    enabled: tuple = None  # None: every registered book
+    timeouts: MappingProxyType = field(default_factory=lambda: MappingProxyType({}))
+
+@dataclass(frozen=True)
+class NormalizationConfig:
+    team_aliases: MappingProxyType  # canonical name -> tuple of aliases
+    search_terms: MappingProxyType  # cleaned POD team name (lowercase) -> BetBCK search keyword
+
+    @cached_property
+    def alias_to_canonical(self):
+        lookup = {}
+        for canonical, aliases in self.team_aliases.items():
+            lookup.setdefault(canonical, canonical)
+            for alias in aliases:
+                lookup.setdefault(alias, canonical)  # first listed wins, as the old linear scan did
+        return MappingProxyType(lookup)
+
+@dataclass(frozen=True)
+class SweepConfig:
+    enabled: bool = False
+    interval_seconds: float = 60.0
+    budget_seconds: float = 20.0  # a cycle stops starting new work once this much time has passed
+    min_ev: float = 0.02  # fraction; a game whose best market reaches it is added to the active events
+    leagues: MappingProxyType = field(default_factory=lambda: MappingProxyType({}))  # Pinnacle league name -> BetBCK search keywords
+
+@dataclass(frozen=True)
+class PodbotConfig:
+    path: str
+    stamp: tuple  # (mtime_ns, size) of the file this was loaded from
+    betbck: BetbckConfig
+    sportsbooks: SportsbooksConfig
+    normalization: NormalizationConfig
+    sweep: SweepConfig
+    raw: MappingProxyType
+
+    def warm(self):
+        """Builds the derived tables now, so the first request after a (re)load does not pay for them."""
+        self.betbck.primary_class_set
+        self.normalization.alias_to_canonical
+        return self
+
+def config_path():
+    return os.environ.get("PODBOT_CONFIG_PATH") or os.path.join(SCRIPT_DIR, "config.json")
+
+def _strings(value, name, errors):
+    if not isinstance(value, (list, tuple)) or not all(isinstance(v, str) for v in value):
+        errors.append(f"{name} must be a list of strings")
+        return ()
+    return tuple(value)
+
+def _section(raw, name, errors):
+    value = raw.get(name, {})
+    if not isinstance(value, dict):
+        errors.append(f"{name} must be an object")
+        return {}
+    return value
+
+def _betbck(raw, errors):
+    section = _section(raw, "betbck", errors)
+    values = {}
+    for key in ("login_page_url", "login_action_url", "main_page_url_after_login", "search_action_url"):
+        value = section.get(key, DEFAULT_SEARCH_ACTION_URL if key == "search_action_url" else None)
+        if not isinstance(value, str) or not value:
+            errors.append(f"betbck.{key} is missing")
+        values[key] = value
+    for key in ("credentials", "headers"):
+        value = section.get(key, {} if key == "headers" else None)
+        if not isinstance(value, dict) or (key == "credentials" and not value):
+            errors.append(f"betbck.{key} must be a non-empty object" if key == "credentials" else f"betbck.{key} must be an object")
+            value = {}
+        values[key] = MappingProxyType(dict(value))
+    values["game_wrapper_primary_classes"] = _strings(section.get("game_wrapper_primary_classes", DEFAULT_GAME_WRAPPER_PRIMARY_CLASSES),
+                                                      "betbck.game_wrapper_primary_classes", errors)
+    values["game_wrapper_fallback_classes"] = _strings(section.get("game_wrapper_fallback_classes", DEFAULT_GAME_WRAPPER_FALLBACK_CLASSES),
+                                                       "betbck.game_wrapper_fallback_classes", errors)
+    values["stream_search_results"] = section.get("stream_search_results", True)
+    if not isinstance(values["stream_search_results"], bool):
+        errors.append("betbck.stream_search_results must be true or false")
+    return BetbckConfig(**values)
+
+def _sportsbooks(raw, errors):
+    section = _section(raw, "sportsbooks", errors)
+    enabled = section.get("enabled")
+    if enabled is not None:
+        enabled = _strings(enabled, "sportsbooks.enabled", errors)
+    timeouts = section.get("timeouts", {})
+    if not isinstance(timeouts, dict) or not all(isinstance(v, (int, float)) and v > 0 for v in timeouts.values()):
+        errors.append("sportsbooks.timeouts must map book names to positive seconds")
+        timeouts = {}
+    return SportsbooksConfig(enabled, MappingProxyType({k: float(v) for k, v in timeouts.items()}))
+
+def _normalization(raw, errors):
+    section = _section(raw, "normalization", errors)
+    aliases = section.get("team_aliases", DEFAULT_TEAM_ALIASES)
+    if not isinstance(aliases, dict):
+        errors.append("normalization.team_aliases must be an object")
+        aliases = {}
+    aliases = {k.lower().strip(): tuple(a.lower().strip() for a in _strings(v, f"normalization.team_aliases.{k}", errors))
+               for k, v in aliases.items()}
+    terms = section.get("search_terms", DEFAULT_SEARCH_TERMS)
+    if not isinstance(terms, dict) or not all(isinstance(v, str) and v for v in terms.values()):
+        errors.append("normalization.search_terms must map team names to non-empty search keywords")
+        terms = {}
+    return NormalizationConfig(MappingProxyType(aliases), MappingProxyType({k.lower().strip(): v for k, v in terms.items()}))
+
+def _sweep(raw, errors):
+    section = _section(raw, "sweep", errors)
+    defaults = SweepConfig()
+    enabled = section.get("enabled", defaults.enabled)
+    if not isinstance(enabled, bool):
+        errors.append("sweep.enabled must be true or false")
+    numbers = {}
+    for key in ("interval_seconds", "budget_seconds", "min_ev"):
+        value = section.get(key, getattr(defaults, key))
+        if not isinstance(value, (int, float)) or isinstance(value, bool) or value <= 0:
+            errors.append(f"sweep.{key} must be a positive number")
+            value = getattr(defaults, key)
+        numbers[key] = float(value)
+    if numbers["budget_seconds"] > numbers["interval_seconds"]:
+        errors.append("sweep.budget_seconds must not exceed sweep.interval_seconds")
+    leagues = section.get("leagues", {})
+    if not isinstance(leagues, dict):
+        errors.append("sweep.leagues must map Pinnacle league names to lists of BetBCK search keywords")
+        leagues = {}
+    leagues = {name: _strings(terms, f"sweep.leagues.{name}", errors) for name, terms in leagues.items()}
+    return SweepConfig(enabled is True, leagues=MappingProxyType(leagues), **numbers)
+
+def load_config(path=None):
+    """Reads and validates a config file. Raises ConfigError listing every problem found."""
+    path = path or config_path()
+    try:
+        stat = os.stat(path)
+        with open(path, encoding="utf-8") as f:
+            raw = json.load(f)
+    except OSError as e:
+        raise ConfigError(f"Cannot read {path}: {e}") from e
+    except ValueError as e:
+        raise ConfigError(f"{path} is not valid JSON: {e}") from e
+    if not isinstance(raw, dict):
+        raise ConfigError(f"{path} must contain a JSON object")
+    errors = []
+    config = PodbotConfig(path, (stat.st_mtime_ns, stat.st_size), _betbck(raw, errors), _sportsbooks(raw, errors),
+                          _normalization(raw, errors), _sweep(raw, errors), MappingProxyType(raw))
+    if errors:
+        raise ConfigError(f"{path}: " + "; ".join(errors))
+    return config.warm()
+
+_current = None
+_lock = threading.Lock()
+
+def current():
+    """The active config, loaded on first use. Raises ConfigError if no valid config has been loaded yet."""
+    config = _current
+    if config is None:
+        with _lock:
+            if _current is None:
+                _install(load_config())
+            config = _current
+    return config
+
+def _install(config):
+    global _current
+    _current = config
+
+def reload(path=None):
+    """Loads the file again and swaps it in if it is valid. Returns (ok, message); the old config stays on failure."""
+    started = time.perf_counter()
+    with _lock:
+        try:
+            config = load_config(path)
+        except ConfigError as e:
+            RELOADS.inc(result="invalid")
+            logger.error("[Config] Keeping the running config; reload failed: %s", e)
+            return False, str(e)
+        _install(config)
+    RELOADS.inc(result="ok")
+    message = f"Reloaded {config.path} in {(time.perf_counter() - started) * 1000:.1f} ms"
+    logger.info("[Config] %s", message)
+    return True, message
+
+class ConfigWatcher:
+    """Reloads the config whenever its file changes, checked every `interval` seconds on a daemon thread."""
+
+    def __init__(self, interval=CONFIG_POLL_SECONDS):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+        self._failed_stamp = None
+
+    def check(self):
+        """Reloads if the file changed since the running config (or the last failed attempt) was read."""
+        path = config_path()
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        running = _current
+        if (running is not None and running.path == path and running.stamp == stamp) or stamp == self._failed_stamp:
+            return False
+        ok, _ = reload(path)
+        self._failed_stamp = None if ok else stamp
+        return ok
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.exception("[Config] Watcher error: %s", e)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return self._thread
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
@@ -0,0 +1,144 @@
+"""
+Shared logging setup for all PODBot modules.
+
+Every module gets its logger from get_logger("<subsystem>") (logger name "podbot.<subsystem>").
+Messages use %-style arguments so nothing is formatted unless the record is actually emitted,
+and records are handed to a background thread through a queue, so a slow console never
+blocks a request or the refresher.
+
+Environment:
+    PODBOT_LOG_LEVEL    default level for all subsystems (INFO)
+    PODBOT_LOG_LEVELS   per-subsystem overrides, e.g. "parser=DEBUG,norm=WARNING,server=INFO"
+    PODBOT_LOG_FORMAT   "text" (default) or "json" (one JSON object per line)
+
+High-frequency messages can be sampled by passing extra=sample_every(N): only every Nth
+record with the same logger and message template is emitted, tagged with how many were skipped.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+
+ROOT_LOGGER_NAME = "podbot"
+
+_STANDARD_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "sample_every", "sampled_skipped"}
+_configure_lock = threading.Lock()
+_listener = None
+
+class SamplingFilter(logging.Filter):
+    """Lets through one in `sample_every` records per (logger, message template); others are counted and dropped."""
+
+    def __init__(self):
+        super().__init__()
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        every = getattr(record, "sample_every", None)
+        if not every or every <= 1:
+            return True
+        key = (record.name, record.msg)
+        with self._lock:
+            seen = self._counts.get(key, 0)
+            self._counts[key] = seen + 1
+        if seen % every:
+            return False
+        record.sampled_skipped = every - 1 if seen else 0
+        return True
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    # The stock QueueHandler formats the message in the calling thread; keep the raw
+    # msg/args instead so formatting happens on the listener thread.
+    def prepare(self, record):
+        return record
+
+def _extra_fields(record):
+    return {k: v for k, v in vars(record).items() if k not in _STANDARD_RECORD_ATTRS and not k.startswith("_")}
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    def format(self, record):
+        line = super().format(record)
+        fields = _extra_fields(record)
+        if getattr(record, "sampled_skipped", 0):
+            fields["sampled_skipped"] = record.sampled_skipped
+        if fields:
+            line += " | " + " ".join(f"{k}={v}" for k, v in fields.items())
+        return line
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "subsystem": record.name[len(ROOT_LOGGER_NAME) + 1:] if record.name.startswith(ROOT_LOGGER_NAME + ".") else record.name,
+            "thread": record.threadName,
+            "msg": record.getMessage(),
+        }
+        entry.update(_extra_fields(record))
+        if getattr(record, "sampled_skipped", 0):
+            entry["sampled_skipped"] = record.sampled_skipped
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+def sample_every(n):
+    """`extra` dict for logging calls that should only emit every n-th occurrence."""
+    return {"sample_every": n}
+
+def _parse_levels(spec):
+    levels = {}
+    for part in (spec or "").split(","):
+        if "=" not in part:
+            continue
+        name, level = part.split("=", 1)
+        name = name.strip()
+        if not name.startswith(ROOT_LOGGER_NAME):
+            name = f"{ROOT_LOGGER_NAME}.{name}"
+        levels[name] = level.strip().upper()
+    return levels
+
+def configure_logging(level=None, levels=None, fmt=None, stream=None):
+    """Installs the queue handler on the 'podbot' logger. Safe to call more than once; later calls only adjust levels."""
+    global _listener
+    with _configure_lock:
+        root = logging.getLogger(ROOT_LOGGER_NAME)
+        root.setLevel((level or os.environ.get("PODBOT_LOG_LEVEL", "INFO")).upper())
+        for name, lvl in {**_parse_levels(os.environ.get("PODBOT_LOG_LEVELS")), **(levels or {})}.items():
+            logging.getLogger(name if name.startswith(ROOT_LOGGER_NAME) else f"{ROOT_LOGGER_NAME}.{name}").setLevel(lvl)
+        if _listener is not None:
+            return
+        fmt = (fmt or os.environ.get("PODBOT_LOG_FORMAT", "text")).lower()
+        output = logging.StreamHandler(stream or sys.stdout)
+        output.setFormatter(JsonFormatter() if fmt == "json" else TextFormatter())
+        log_queue = queue.SimpleQueue()
+        queue_handler = _DeferredQueueHandler(log_queue)
+        queue_handler.addFilter(SamplingFilter())
+        root.addHandler(queue_handler)
+        root.propagate = False
+        _listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+        _listener.start()
+        atexit.register(flush_logging)
+
+def flush_logging():
+    """Stops the listener after draining queued records (used at shutdown)."""
+    global _listener
+    with _configure_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+            root = logging.getLogger(ROOT_LOGGER_NAME)
+            for handler in list(root.handlers):
+                if isinstance(handler, _DeferredQueueHandler):
+                    root.removeHandler(handler)
+
+def get_logger(subsystem):
+    if _listener is None:
+        configure_logging()
+    return logging.getLogger(f"{ROOT_LOGGER_NAME}.{subsystem}")
@@ -0,0 +1,373 @@
+"""
+Append-only record of every priced market, for backtesting EV thresholds.
+
+Each time an event's markets are priced (a new alert, a background Pinnacle refresh, a BetBCK
+re-check) the EV rows are recorded as
+
+    (ts, event, period, market, line, side, book, pin_odds, nvp, book_odds, ev)
+
+Odds are decimal and ev a fraction (see odds.py); a missing price is NaN.
+
+Rows are stored column by column in daily segments (UTC dates):
+
+    price_history/2025-06-01/<host>-<pid>/ts.bin, event.bin, ..., strings.jsonl
+
+Each column file is a flat array of fixed-size native values (COLUMNS), so a reader can mmap it
+and index it without parsing. The string columns hold codes into strings.jsonl, one JSON string
+per line. Every process writes its own part directory, so gunicorn workers never share a file.
+A part's files are only appended to; strings are written before the rows that use them, and
+readers stop at the shortest column, so a crash mid-write loses at most the last batch.
+
+record() only queues the rows. A writer thread appends them in batches every FLUSH_SECONDS, and
+rows are dropped (and counted) rather than blocking when the queue is full.
+
+PriceHistory is the query side: segments() gives mmapped columns for ad-hoc scans, and
+ev_windows() finds each +EV window and its closing-line value. `python price_history.py --help`
+prints a summary from the command line.
+"""
+import argparse
+import bisect
+import json
+import math
+import mmap
+import os
+import queue
+import socket
+import threading
+import time
+from array import array
+from datetime import datetime, timedelta, timezone
+
+from metrics import counter, histogram
+from podbot_logging import get_logger
+
+logger = get_logger("history")
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_HISTORY_DIR = os.path.join(SCRIPT_DIR, "price_history")
+FLUSH_SECONDS = 2.0
+MAX_PENDING_BATCHES = 10000
+
+# (name, array typecode). String columns are uint32 codes into the part's strings.jsonl.
+COLUMNS = (("ts", "d"), ("event", "I"), ("period", "I"), ("market", "I"), ("line", "I"), ("side", "I"), ("book", "I"),
+           ("pin_odds", "f"), ("nvp", "f"), ("book_odds", "f"), ("ev", "f"))
+STRING_COLUMNS = ("event", "period", "market", "line", "side", "book")
+STRINGS_FILE = "strings.jsonl"
+
+ROWS = counter("podbot_price_history_rows_total", "Priced market rows handed to the price history, by result.")
+FLUSH_SECONDS_HIST = histogram("podbot_price_history_flush_seconds", "Time to append one batch of price history rows.")
+
+def _day(ts):
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%d")
+
+def _float(value):
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else math.nan
+
+class _PartWriter:
+    """Appends to one day's part directory for this process."""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.codes = {}
+        strings_path = os.path.join(path, STRINGS_FILE)
+        if os.path.exists(strings_path):
+            with open(strings_path, "rb") as f:
+                data = f.read()
+            complete = data[:data.rfind(b"\n") + 1]
+            if len(complete) < len(data):  # a string cut off by a crash
+                os.truncate(strings_path, len(complete))
+            for line in complete.decode("utf-8").splitlines():
+                self.codes.setdefault(json.loads(line), len(self.codes))
+        self._trim_columns()
+        self._strings = open(strings_path, "a", encoding="utf-8")
+        self._columns = {name: open(os.path.join(path, f"{name}.bin"), "ab") for name, _ in COLUMNS}
+
+    def _trim_columns(self):
+        """A part reopened after a crash (same host and pid) drops the rows not every column got, so new rows line up."""
+        paths = [(os.path.join(self.path, f"{name}.bin"), array(typecode).itemsize) for name, typecode in COLUMNS]
+        if not all(os.path.exists(path) for path, _ in paths):
+            return
+        rows = min(os.path.getsize(path) // itemsize for path, itemsize in paths)
+        for path, itemsize in paths:
+            if os.path.getsize(path) > rows * itemsize:
+                os.truncate(path, rows * itemsize)
+
+    def _code(self, value, new_strings):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.codes)
+            new_strings.append(value)
+        return code
+
+    def append(self, rows):
+        """`rows` are tuples in COLUMNS order, strings uncoded."""
+        new_strings = []
+        columns = []
+        for (name, typecode), values in zip(COLUMNS, zip(*rows)):
+            if name in STRING_COLUMNS:
+                values = [self._code(v, new_strings) for v in values]
+            columns.append((name, array(typecode, values)))
+        if new_strings:
+            self._strings.write("".join(json.dumps(s) + "\n" for s in new_strings))
+            self._strings.flush()
+        for name, values in columns:
+            values.tofile(self._columns[name])
+            self._columns[name].flush()
+
+    def close(self):
+        self._strings.close()
+        for f in self._columns.values():
+            f.close()
+
+class PriceRecorder:
+    """Queues EV rows from the hot path and appends them to the day's segment on a writer thread."""
+
+    def __init__(self, root, flush_seconds=FLUSH_SECONDS, max_pending=MAX_PENDING_BATCHES):
+        self.root = root
+        self.flush_seconds = flush_seconds
+        self.part_name = f"{socket.gethostname()}-{os.getpid()}"
+        self._queue = queue.Queue(max_pending)
+        self._writers = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def record(self, event_id, rows, ts=None, period="num_0"):
+        """Queues potential_bets_analyzed rows (see main_logic.ev_rows_for_markets) priced at `ts` (default now)."""
+        if not self.root or not rows:
+            return
+        try:
+            self._queue.put_nowait((time.time() if ts is None else ts, str(event_id), period, rows))
+        except queue.Full:
+            ROWS.inc(len(rows), result="dropped")
+
+    def _rows(self, batches):
+        for ts, event_id, period, rows in batches:
+            for row in rows:
+                yield (ts, event_id, period, row.get("market") or "", str(row.get("line", "")), row.get("side") or row.get("sel") or "",
+                       row.get("book") or "betbck", _float(row.get("pin_odds")), _float(row.get("pin_nvp")),
+                       _float(row.get("bck_odds")), _float(row.get("ev")))
+
+    def _write(self, batches):
+        start = time.perf_counter()
+        by_day = {}
+        for row in self._rows(batches):
+            by_day.setdefault(_day(row[0]), []).append(row)
+        for day, rows in by_day.items():
+            writer = self._writers.get(day)
+            if writer is None:
+                # Rotation: a new day gets a new part; earlier days' files are closed once their rows stop arriving.
+                for old_day in [d for d in self._writers if d < day]:
+                    self._writers.pop(old_day).close()
+                writer = self._writers[day] = _PartWriter(os.path.join(self.root, day, self.part_name))
+            writer.append(rows)
+            ROWS.inc(len(rows), result="written")
+        FLUSH_SECONDS_HIST.observe(time.perf_counter() - start)
+
+    def _drain(self):
+        batches = []
+        while True:
+            try:
+                batches.append(self._queue.get_nowait())
+            except queue.Empty:
+                return batches
+
+    def flush(self):
+        batches = self._drain()
+        if batches:
+            try:
+                self._write(batches)
+            except OSError as e:
+                ROWS.inc(sum(len(b[3]) for b in batches), result="dropped")
+                logger.error("[PriceHistory] Could not append %d batches under %s: %s", len(batches), self.root, e)
+
+    def _run(self):
+        while not self._stop.wait(self.flush_seconds):
+            self.flush()
+        self.flush()
+
+    def start(self):
+        if not self.root:
+            return None
+        if self._thread and self._thread.is_alive():
+            return self._thread
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="price-history", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout=5):
+        """Stops the writer after it appends whatever is still queued."""
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+        for writer in self._writers.values():
+            writer.close()
+        self._writers.clear()
+
+def create_price_recorder(root=None):
+    """Recorder under PODBOT_PRICE_HISTORY_DIR (default ./price_history). An empty value disables recording."""
+    return PriceRecorder(os.environ.get("PODBOT_PRICE_HISTORY_DIR", DEFAULT_HISTORY_DIR) if root is None else root)
+
+class Segment:
+    """One part of one day, read through mmap. column() returns memoryviews over the mapped files."""
+
+    def __init__(self, path):
+        self.path = path
+        self.day = os.path.basename(os.path.dirname(path))
+        with open(os.path.join(path, STRINGS_FILE), encoding="utf-8") as f:
+            self.strings = [json.loads(line) for line in f if line.endswith("\n")]
+        self._maps = {}
+        self._views = {}
+        sizes = [os.path.getsize(os.path.join(path, f"{name}.bin")) // array(typecode).itemsize for name, typecode in COLUMNS]
+        self.rows = min(sizes)
+
+    def column(self, name):
+        view = self._views.get(name)
+        if view is None:
+            typecode = dict(COLUMNS)[name]
+            if self.rows == 0:
+                view = memoryview(array(typecode))
+            else:
+                with open(os.path.join(self.path, f"{name}.bin"), "rb") as f:
+                    self._maps[name] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                # Slice before the cast: a crash can leave a column ending in part of a value.
+                view = memoryview(self._maps[name])[:self.rows * array(typecode).itemsize].cast(typecode)
+            self._views[name] = view
+        return view
+
+    def code(self, value):
+        """Code of a string column value in this segment, or None if it never occurs here."""
+        try:
+            return self.strings.index(value)
+        except ValueError:
+            return None
+
+    def close(self):
+        for view in self._views.values():
+            view.release()
+        for m in self._maps.values():
+            m.close()
+        self._views.clear()
+        self._maps.clear()
+
+class PriceHistory:
+    def __init__(self, root=None):
+        self.root = root or os.environ.get("PODBOT_PRICE_HISTORY_DIR") or DEFAULT_HISTORY_DIR
+
+    def days(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(d for d in os.listdir(self.root) if len(d) == 10 and os.path.isdir(os.path.join(self.root, d)))
+
+    def segments(self, start=None, end=None):
+        """Yields the Segments of the days from `start` to `end` (timestamps, inclusive), closing each after use."""
+        days = self.days()
+        lo = bisect.bisect_left(days, _day(start)) if start is not None else 0
+        hi = bisect.bisect_right(days, _day(end)) if end is not None else len(days)
+        for day in days[lo:hi]:
+            day_dir = os.path.join(self.root, day)
+            for part in sorted(os.listdir(day_dir)):
+                if not os.path.exists(os.path.join(day_dir, part, STRINGS_FILE)):
+                    continue
+                segment = Segment(os.path.join(day_dir, part))
+                try:
+                    yield segment
+                finally:
+                    segment.close()
+
+    def market_series(self, start=None, end=None, event_id=None, book=None):
+        """
+        {(event, period, market, line, side, book): [(ts, pin_odds, nvp, book_odds, ev), ...]} in time order,
+        for rows between `start` and `end` (timestamps), optionally for one event and/or book.
+        """
+        series = {}
+        for seg in self.segments(start, end):
+            cols = [seg.column(name) for name, _ in COLUMNS]
+            ts_col = cols[0]
+            event_code = seg.code(str(event_id)) if event_id is not None else None
+            book_code = seg.code(book) if book is not None else None
+            if (event_id is not None and event_code is None) or (book is not None and book_code is None):
+                continue
+            groups = {}
+            for i, key in enumerate(zip(*cols[1:7])):
+                if (event_code is not None and key[0] != event_code) or (book_code is not None and key[5] != book_code):
+                    continue
+                groups.setdefault(key, []).append(i)
+            strings = seg.strings
+            pin_odds, nvp, book_odds, ev = cols[7:]
+            for key, indexes in groups.items():
+                points = [(ts_col[i], pin_odds[i], nvp[i], book_odds[i], ev[i]) for i in indexes
+                          if (start is None or ts_col[i] >= start) and (end is None or ts_col[i] <= end)]
+                if points:
+                    series.setdefault(tuple(strings[c] for c in key), []).extend(points)
+        for points in series.values():
+            points.sort()
+        return series
+
+    def ev_windows(self, min_ev=0.0, max_gap_seconds=60.0, start=None, end=None, event_id=None, book=None):
+        """
+        Each stretch of consecutive observations of a market with EV >= min_ev, as dicts with the market key fields,
+        start/end timestamps, duration, peak EV, the book odds and EV at the start, the market's closing NVP (its
+        last recorded NVP) and clv: entry book odds against that closing NVP (book_odds / closing_nvp - 1).
+        A window ends at the first observation below min_ev, or at its last +EV observation when the market
+        stops being observed or has a gap longer than max_gap_seconds.
+        """
+        windows = []
+        for key, points in self.market_series(start, end, event_id, book).items():
+            closing_nvp = next((p[2] for p in reversed(points) if not math.isnan(p[2])), math.nan)
+            window = None
+            for ts, _, _, book_odds, ev in points:
+                if window is not None and ts - window["last_seen"] > max_gap_seconds:
+                    windows.append(window)
+                    window = None
+                if ev >= min_ev:  # False for NaN
+                    if window is None:
+                        window = dict(zip(("event", "period", "market", "line", "side", "book"), key), start=ts,
+                                      entry_odds=book_odds, entry_ev=ev, peak_ev=ev, observations=0, closing_nvp=closing_nvp)
+                    window["peak_ev"] = max(window["peak_ev"], ev)
+                    window["observations"] += 1
+                    window["last_seen"] = ts
+                elif window is not None:
+                    window["last_seen"] = ts
+                    windows.append(window)
+                    window = None
+            if window is not None:
+                windows.append(window)
+        for window in windows:
+            window["end"] = window.pop("last_seen")
+            window["duration"] = window["end"] - window["start"]
+            window["clv"] = window["entry_odds"] / window["closing_nvp"] - 1 if window["closing_nvp"] > 0 else math.nan
+        return windows
+
+def _parse_day(text, end=False):
+    day = datetime.strptime(text, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    return (day + timedelta(days=1)).timestamp() - 1e-6 if end else day.timestamp()
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarizes recorded +EV windows and their closing-line value.")
+    parser.add_argument("--dir", help="History directory (default PODBOT_PRICE_HISTORY_DIR or ./price_history).")
+    parser.add_argument("--start", help="First UTC day, YYYY-MM-DD.")
+    parser.add_argument("--end", help="Last UTC day, YYYY-MM-DD.")
+    parser.add_argument("--event", help="Only this event ID.")
+    parser.add_argument("--book", help="Only this book.")
+    parser.add_argument("--min-ev", type=float, default=0.02, help="EV threshold as a fraction (default 0.02).")
+    parser.add_argument("--max-gap", type=float, default=60.0, help="Seconds without an observation that end a window.")
+    args = parser.parse_args()
+    history = PriceHistory(args.dir)
+    started = time.perf_counter()
+    rows = sum(seg.rows for seg in history.segments(args.start and _parse_day(args.start), args.end and _parse_day(args.end, True)))
+    windows = history.ev_windows(args.min_ev, args.max_gap, args.start and _parse_day(args.start),
+                                 args.end and _parse_day(args.end, True), args.event, args.book)
+    elapsed = time.perf_counter() - started
+    print(f"{rows} rows, {len(windows)} windows with EV >= {args.min_ev:.2%} ({elapsed:.2f}s)")
+    if not windows:
+        return
+    durations = sorted(w["duration"] for w in windows)
+    clvs = [w["clv"] for w in windows if not math.isnan(w["clv"])]
+    print(f"window duration p50 {durations[len(durations) // 2]:.0f}s  p90 {durations[int(len(durations) * 0.9)]:.0f}s  max {durations[-1]:.0f}s")
+    if clvs:
+        print(f"CLV mean {sum(clvs) / len(clvs):+.2%}  beat the close {sum(c > 0 for c in clvs) / len(clvs):.0%} of {len(clvs)} windows")
+
+if __name__ == "__main__":
+    main()
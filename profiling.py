@@ -0,0 +1,117 @@
+"""
+On-demand profiling for the running server (served by the /admin/profile routes in server.py).
+
+Nothing here runs until it is asked for: the CPU sampler runs inside the admin request
+that asked for a profile and only for its duration, and tracemalloc is started by the
+first memory snapshot and stopped again by MemoryTracker.stop().
+
+CPU profiles are stack samples of every thread (request threads, the background
+refresher, the logging listener) in the collapsed format read by flamegraph.pl,
+speedscope and similar tools: one "thread;outer;...;inner count" line per distinct stack.
+"""
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+MAX_PROFILE_SECONDS = 120
+
+# Innermost Python frames of threads that are blocked rather than running.
+_IDLE_LEAF_PREFIXES = ("wait (threading.py", "select (selectors.py", "poll (wasyncore.py", "loop (wasyncore.py",
+                       "dequeue (handlers.py", "readinto (socket.py", "accept (socket.py", "_worker (thread.py",
+                       "serve_forever (socketserver.py")
+
+class ProfilerBusy(RuntimeError):
+    pass
+
+_cpu_lock = threading.Lock()
+
+def _frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+def sample_cpu(seconds, interval=0.005, include_idle=False):
+    """
+    Samples the stack of every other thread each `interval` seconds for `seconds` seconds.
+    Returns a Counter of collapsed stack strings. Threads parked in a wait are dropped
+    unless include_idle is set, so the output shows where CPU actually goes.
+    """
+    seconds = min(float(seconds), MAX_PROFILE_SECONDS)
+    if not _cpu_lock.acquire(blocking=False):
+        raise ProfilerBusy("A CPU profile is already running.")
+    try:
+        caller = threading.get_ident()
+        stacks = Counter()
+        labels = {}  # code object -> label; building labels is the expensive part of a sample
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == caller:
+                    continue
+                parts = []
+                while frame is not None:
+                    code = frame.f_code
+                    label = labels.get(code)
+                    if label is None:
+                        label = labels[code] = _frame_label(code)
+                    parts.append(label)
+                    frame = frame.f_back
+                if not include_idle and parts and parts[0].startswith(_IDLE_LEAF_PREFIXES):
+                    continue
+                parts.append(names.get(ident, f"thread-{ident}"))
+                stacks[";".join(reversed(parts))] += 1
+            time.sleep(interval)
+        return stacks
+    finally:
+        _cpu_lock.release()
+
+def render_collapsed(stacks):
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+class MemoryTracker:
+    """Named tracemalloc snapshots and diffs between them."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshots = {}
+
+    @property
+    def tracing(self):
+        return tracemalloc.is_tracing()
+
+    def snapshot(self, name=None, frames=10):
+        """Starts tracing on first use and stores a snapshot under `name` (default: a timestamp)."""
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(frames)
+            name = name or time.strftime("%H%M%S")
+            snap = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            ))
+            self._snapshots[name] = (time.time(), snap)
+            current, peak = tracemalloc.get_traced_memory()
+            return {"name": name, "traced_bytes": current, "peak_bytes": peak, "snapshots": sorted(self._snapshots)}
+
+    def diff(self, older, newer, key_type="lineno", limit=25):
+        with self._lock:
+            if older not in self._snapshots or newer not in self._snapshots:
+                raise KeyError(f"Unknown snapshot. Have: {sorted(self._snapshots)}")
+            (t_old, s_old), (t_new, s_new) = self._snapshots[older], self._snapshots[newer]
+        stats = s_new.compare_to(s_old, key_type)
+        return {
+            "from": older, "to": newer, "seconds_apart": round(t_new - t_old, 1),
+            "total_growth_bytes": sum(s.size_diff for s in stats),
+            "top": [{"where": str(s.traceback[0]) if key_type != "traceback" else s.traceback.format(),
+                     "size_diff_bytes": s.size_diff, "size_bytes": s.size,
+                     "count_diff": s.count_diff, "count": s.count} for s in stats[:limit]],
+        }
+
+    def stop(self):
+        """Drops all snapshots and stops tracing, removing tracemalloc's overhead."""
+        with self._lock:
+            self._snapshots.clear()
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
@@ -0,0 +1,182 @@
+"""
+Outbound request limiting: one token bucket per upstream host, shared by every thread in the process.
+
+Callers that start upstream work declare what it is for:
+
+    with outbound_job(PRIORITY_ALERT, deadline=time.time() + ALERT_DEADLINE_SECONDS):
+        ...  # BetBCK login/search and Swordfish fetches made here
+
+and the request sites call wait_for_slot(url) before each request. When a host is out of tokens,
+waiters are served lowest priority class first (new alerts before background refreshes), in
+arrival order within a class. A job whose deadline passes while it waits, or before it asks,
+gets DeadlineExceeded instead of a token, so stale work stops at its next request.
+
+The job travels in a ContextVar, so asyncio.to_thread carries it into worker threads; plain
+executors need contextvars.copy_context().run.
+
+Limits are "rate:burst" (requests per second, bucket size) per host, from PODBOT_RATE_LIMITS, e.g.
+"betbck.com=2:4,*=5:10". "*" sets the default for hosts not listed and a rate of 0 disables the limit.
+A URL with an explicit port has its own bucket and takes a "host:port" entry before a "host" one, so
+local stand-ins on one address are limited like the separate hosts they imitate. A module can give
+its own upstream a different default with set_host_default(); PODBOT_RATE_LIMITS entries naming that
+host still win.
+"""
+import contextvars
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from metrics import counter, histogram
+from podbot_logging import get_logger
+
+logger = get_logger("ratelimit")
+
+PRIORITY_ALERT = 0
+PRIORITY_RECHECK = 1  # BetBCK re-checks queued by change_detector
+PRIORITY_REFRESH = 2
+PRIORITY_SWEEP = 3  # board_sweep's scan of the whole BetBCK board
+PRIORITY_NAMES = {PRIORITY_ALERT: "alert", PRIORITY_RECHECK: "recheck", PRIORITY_REFRESH: "refresh", PRIORITY_SWEEP: "sweep"}
+
+# An alert is worth acting on for about this long; after that its BetBCK line has likely moved anyway.
+ALERT_DEADLINE_SECONDS = 45
+DEFAULT_LIMIT = (5.0, 10)
+
+WAIT_SECONDS = histogram("podbot_outbound_wait_seconds", "Time spent waiting for an outbound request token.")
+DROPPED = counter("podbot_outbound_dropped_total", "Outbound requests dropped because their job's deadline passed.")
+
+class DeadlineExceeded(Exception):
+    pass
+
+_current_job = contextvars.ContextVar("podbot_outbound_job", default=(PRIORITY_REFRESH, None))
+
+@contextmanager
+def outbound_job(priority, deadline=None):
+    """Tags upstream requests made inside the block with a priority class and an absolute (time.time()) deadline."""
+    token = _current_job.set((priority, deadline))
+    try:
+        yield
+    finally:
+        _current_job.reset(token)
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate, self.burst = float(rate), max(1.0, float(burst))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+        self._waiters = []  # heap of (priority, seq)
+        self._seq = itertools.count()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self):
+        """Takes a token only if one is free now and nobody is queued for it."""
+        if self.rate <= 0:
+            return True
+        with self._cond:
+            self._refill(time.monotonic())
+            if self._waiters or self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def acquire(self, priority, timeout=None):
+        """Takes one token, waiting behind higher-priority and earlier waiters. Returns False if `timeout` runs out first."""
+        if self.rate <= 0:
+            return True
+        ticket = (priority, next(self._seq))
+        give_up = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            heapq.heappush(self._waiters, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if self._waiters[0] == ticket and self._tokens >= 1:
+                        self._tokens -= 1
+                        return True
+                    if give_up is not None and now >= give_up:
+                        return False
+                    wait = max((1 - self._tokens) / self.rate, 0.001) if self._waiters[0] == ticket else None
+                    if give_up is not None:
+                        wait = give_up - now if wait is None else min(wait, give_up - now)
+                    self._cond.wait(wait)
+            finally:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+
+def _host_key(url):
+    """(bucket key, host): "host:port" when the URL names a port, else just the host."""
+    parts = urlsplit(url)
+    host = (parts.hostname or url).lower()
+    return (f"{host}:{parts.port}" if parts.port else host), host
+
+def _parse_limits(spec):
+    limits = {}
+    for part in (spec or "").split(","):
+        host, _, value = part.strip().partition("=")
+        if not value:
+            continue
+        rate, _, burst = value.partition(":")
+        try:
+            limits[host.strip().lower()] = (float(rate), int(burst or max(1, float(rate))))
+        except ValueError:
+            logger.warning("[RateLimit] Ignoring bad PODBOT_RATE_LIMITS entry %r", part)
+    return limits
+
+class HostRateLimiter:
+    def __init__(self, limits=None):
+        self.limits = dict(limits or {})
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, key, host=None):
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                rate, burst = self.limits.get(key) or self.limits.get(host or key) or self.limits.get("*", DEFAULT_LIMIT)
+                bucket = self._buckets[key] = TokenBucket(rate, burst)
+            return bucket
+
+    def acquire(self, url):
+        """Waits for a request slot to `url`'s host under the current job. Raises DeadlineExceeded for stale jobs."""
+        key, host = _host_key(url)
+        priority, deadline = _current_job.get()
+        priority_name = PRIORITY_NAMES.get(priority, priority)
+        started = time.time()
+        timeout = None if deadline is None else deadline - started
+        if (timeout is not None and timeout <= 0) or not self.bucket(key, host).acquire(priority, timeout):
+            DROPPED.inc(host=key, priority=priority_name)
+            raise DeadlineExceeded(f"Deadline passed {time.time() - deadline:.1f}s ago; dropped {priority_name} request to {key}.")
+        WAIT_SECONDS.observe(time.time() - started, host=key, priority=priority_name)
+
+    def try_acquire(self, url):
+        return self.bucket(*_host_key(url)).try_acquire()
+
+    def set_default(self, key, host, rate, burst):
+        """Limit for `key` ("host" or "host:port") unless PODBOT_RATE_LIMITS configures that key or its host."""
+        with self._lock:
+            if key not in self.limits and host not in self.limits:
+                self.limits[key] = (float(rate), int(burst))
+                self._buckets.pop(key, None)
+
+limiter = HostRateLimiter(_parse_limits(os.environ.get("PODBOT_RATE_LIMITS")))
+
+def set_host_default(url, rate, burst):
+    """Default limit for `url`'s host, used unless PODBOT_RATE_LIMITS names the host."""
+    if url:
+        limiter.set_default(*_host_key(url), rate, burst)
+
+def wait_for_slot(url):
+    limiter.acquire(url)
+
+def try_slot(url):
+    """For optional extra requests (hedges): True if a slot is free right now, without waiting or queueing."""
+    return limiter.try_acquire(url)
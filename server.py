@@ -1,179 +1,506 @@
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, Response, g, request, jsonify, render_template
 from flask_cors import CORS
+import asyncio
+import contextvars
+import hashlib
+import hmac
+import os
+import socket
+import uuid
 import time
 import threading
-import traceback
 import math
 import logging
-from typing import Dict, Set, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 
+from board_sweep import BoardSweep
+from change_detector import NvpChangeDetector, RecheckQueue
+from dashboard_payload import compact_payload, compress, dumps, negotiate_encoding, parse_fields, verbose_payload
+from metrics import counter, histogram, render_prometheus, render_summary, stage_timer
+from odds import format_ev, format_odds
+from parse_pool import parse_pool
+from price_history import create_price_recorder
+import podbot_config
+from podbot_config import ConfigWatcher
+from podbot_logging import get_logger, sample_every
+from profiling import MemoryTracker, ProfilerBusy, render_collapsed, sample_cpu
+from rate_limit import ALERT_DEADLINE_SECONDS, PRIORITY_ALERT, PRIORITY_RECHECK, PRIORITY_REFRESH, outbound_job
+from state_store import StateManager, create_state_manager
+from traffic_capture import capture
 from utils import process_event_odds_for_display
-from pinnacle_fetcher import fetch_live_pinnacle_event_odds
-from main_logic import process_alert_and_scrape_betbck, clean_pod_team_name_for_search, american_to_decimal
+from pinnacle_fetcher import bulk_enabled, fetch_live_pinnacle_event_odds, fetch_live_pinnacle_league_odds
+from main_logic import process_alert_and_scrape_betbck, clean_pod_team_name_for_search, calculate_ev, determine_betbck_search_term, find_ev_bets, is_prop_alert
+from betbck_scraper import fetch_search_results_html, prefetch_search_for_game
 
-# Configure logging
+# Third-party loggers (werkzeug, waitress) keep the plain root handler; PODBot's own
+# subsystems log through podbot_logging's queue handler (see PODBOT_LOG_LEVELS).
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
-logger = logging.getLogger(__name__)
+logger = get_logger("server")
 
-class StateManager:
-    def __init__(self):
-        self._active_events_lock = threading.Lock()
-        self._dismissed_events_lock = threading.Lock()
-        self._active_events: Dict[str, Dict[str, Any]] = {}
-        self._dismissed_event_ids: Set[str] = set()
-        self.EVENT_DATA_EXPIRY_SECONDS = 300
-        self.BACKGROUND_REFRESH_INTERVAL_SECONDS = 3
+state_manager = create_state_manager()
+# Replays (benchmarks/replay_capture.py) run the server on an accelerated clock: background refreshes
+# come and events expire this many times sooner.
+CLOCK_SPEED = float(os.environ.get("PODBOT_CLOCK_SPEED", "1"))
+state_manager.BACKGROUND_REFRESH_INTERVAL_SECONDS /= CLOCK_SPEED
+state_manager.EVENT_DATA_EXPIRY_SECONDS /= CLOCK_SPEED
+BATCH_MAX_WORKERS = 8
+# Admin routes (/admin/...) are only served when this is set; clients send it in X-Admin-Token.
+ADMIN_TOKEN = os.environ.get("PODBOT_ADMIN_TOKEN")
+memory_tracker = MemoryTracker()
 
-    def get_active_events(self) -> Dict[str, Dict[str, Any]]:
-        with self._active_events_lock:
-            return self._active_events.copy()
+# Leases for work only one process should do when several share a state backend.
+BACKGROUND_LEASE_NAME = "background-tasks"
+SWEEP_LEASE_NAME = "board-sweep"
+_PROCESS_TOKEN = uuid.uuid4().hex[:8]
 
-    def add_active_event(self, event_id: str, event_data: Dict[str, Any]) -> None:
-        with self._active_events_lock:
-            self._active_events[event_id] = event_data
+def _process_id():
+    # Includes the pid so forked workers (which inherit the token) stay distinct.
+    return f"{socket.gethostname()}:{os.getpid()}:{_PROCESS_TOKEN}"
 
-    def remove_active_event(self, event_id: str) -> None:
-        with self._active_events_lock:
-            self._active_events.pop(event_id, None)
+app = Flask(__name__)
+CORS(app)
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0
 
-    def is_event_dismissed(self, event_id: str) -> bool:
-        with self._dismissed_events_lock:
-            return event_id in self._dismissed_event_ids
+HTTP_REQUEST_SECONDS = histogram("podbot_http_request_duration_seconds", "Flask request latency by endpoint.")
+HTTP_REQUESTS = counter("podbot_http_requests_total", "Flask requests by endpoint and status.")
+REFRESH_CYCLE_SECONDS = histogram("podbot_refresher_cycle_seconds", "Duration of one background refresh pass over all active events.")
+DASHBOARD_PAYLOAD_BYTES = histogram("podbot_dashboard_payload_bytes", "Size of /get_active_events_data responses as sent.",
+                                    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304))
+ALERT_TO_DASHBOARD_SECONDS = histogram("podbot_alert_to_dashboard_seconds",
+                                       "Time from an alert arriving to its event first being served to the dashboard.")
+# Events already counted in ALERT_TO_DASHBOARD_SECONDS by this process; pruned as events leave the store.
+_displayed_event_ids = set()
+_displayed_event_ids_lock = threading.Lock()
 
-    def add_dismissed_event(self, event_id: str) -> None:
-        with self._dismissed_events_lock:
-            self._dismissed_event_ids.add(event_id)
+@app.before_request
+def _start_request_timer():
+    g.request_start = time.perf_counter()
 
-    def remove_dismissed_event(self, event_id: str) -> None:
-        with self._dismissed_events_lock:
-            self._dismissed_event_ids.discard(event_id)
+@app.after_request
+def _record_request_timing(response):
+    start = g.get("request_start")
+    if start is not None:
+        elapsed = time.perf_counter() - start
+        endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+        HTTP_REQUEST_SECONDS.observe(elapsed, endpoint=endpoint, method=request.method)
+        HTTP_REQUESTS.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+        response.headers["Server-Timing"] = ", ".join([f"app;dur={elapsed * 1000:.2f}"] + g.get("server_timing", []))
+    return response
 
-    def update_event_data(self, event_id: str, update_data: Dict[str, Any]) -> None:
-        with self._active_events_lock:
-            if event_id in self._active_events:
-                self._active_events[event_id].update(update_data)
+# Bumped after every write to event state so /event/<id> long-polls wake up. Writes made by other
+# processes (shared SQLite backend) are not signalled; waiters recheck every EVENT_POLL_RECHECK_SECONDS.
+_event_change = threading.Condition()
+_event_change_generation = 0
+EVENT_POLL_RECHECK_SECONDS = 1.0
+EVENT_POLL_MAX_TIMEOUT_SECONDS = 55
+# Each waiting long-poll holds a worker thread (waitress defaults to 16), so only this many wait at once;
+# the rest get 503 and retry, leaving threads for /pod_alert and the dashboard.
+EVENT_POLL_MAX_WAITERS = int(os.environ.get("PODBOT_MAX_LONG_POLLS", "4"))
+_event_poll_slots = threading.BoundedSemaphore(EVENT_POLL_MAX_WAITERS)
 
-state_manager = StateManager()
+def _notify_event_change():
+    global _event_change_generation
+    with _event_change:
+        _event_change_generation += 1
+        _event_change.notify_all()
 
-app = Flask(__name__)
-CORS(app)
-app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0
+RECHECK_DEADLINE_SECONDS = 20
+
+def _recheck_betbck(event_id):
+    """Re-scrapes BetBCK for an active event after the change detector saw its Pinnacle NVP move. Returns True on success."""
+    entry = state_manager.get_active_events().get(event_id)
+    if not entry or state_manager.is_event_dismissed(event_id):
+        return False
+    with outbound_job(PRIORITY_RECHECK, deadline=time.time() + RECHECK_DEADLINE_SECONDS):
+        betbck_result = process_alert_and_scrape_betbck(event_id, dict(entry.get("original_alert_details", {})),
+                                                        entry.get("pinnacle_data_processed"))
+    if not (betbck_result and betbck_result.get("status") == "success"):
+        logger.warning("[ChangeDetector] Re-check for Event ID %s failed: %s", event_id, (betbck_result or {}).get("message"))
+        return False
+    state_manager.update_event_data(event_id, {"betbck_data": betbck_result, "betbck_last_update": time.time()})
+    price_recorder.record(event_id, betbck_result["data"].get("potential_bets_analyzed"))
+    _notify_event_change()
+    logger.info("[ChangeDetector] Refreshed BetBCK odds for Event ID %s", event_id)
+    return True
+
+nvp_detector = NvpChangeDetector()
+betbck_rechecks = RecheckQueue(_recheck_betbck)
+price_recorder = create_price_recorder()
+config_watcher = ConfigWatcher()
+
+def _ingest_swept_game(event_id, payload, pinnacle_api_result, wrapper_html):
+    """board_sweep hit: ingested like a POD alert, with the swept Pinnacle event and the game's BetBCK table."""
+    capture("sweep_hit", payload=payload)
+    body, status = _ingest_pod_alert(payload, pinnacle_api_result=pinnacle_api_result, search_results_html=wrapper_html)
+    return status == 200 and body.get("status") == "success"
+
+def _is_known_event(event_id):
+    return event_id in state_manager.get_active_events() or state_manager.is_event_dismissed(event_id)
+
+def _sweep_leader():
+    # The lease outlives a cycle, so one process keeps sweeping until it stops or misses a few intervals.
+    ttl = podbot_config.current().sweep.interval_seconds * 3
+    return state_manager.try_acquire_leadership(SWEEP_LEASE_NAME, _process_id(), ttl)
+
+board_sweep = BoardSweep(_ingest_swept_game, skip_event=_is_known_event, leader=_sweep_leader)
+
+_background_stop = threading.Event()
+_background_threads = []
+_background_lock = threading.Lock()
+
+def _prefetch_league_odds(active_events, current_time):
+    """
+    One Swordfish request per league for this refresh cycle (pinnacle_fetcher.SWORDFISH_BULK_URL).
+    Returns {event_id: result} for the events the league responses covered; the rest are fetched per event.
+    """
+    if not bulk_enabled():
+        return {}
+    leagues = {}
+    for event_id, event_data in active_events.items():
+        expires_at = event_data.get("alert_arrival_timestamp", 0) + state_manager.EVENT_DATA_EXPIRY_SECONDS
+        if expires_at < current_time or state_manager.is_event_dismissed(event_id):
+            continue
+        pinnacle_data = (event_data.get("pinnacle_data_processed") or {}).get("data") or {}
+        league = pinnacle_data.get("league_name") or event_data.get("league_name")
+        if league:
+            ids, deadline = leagues.get(league, ([], 0))
+            leagues[league] = (ids + [event_id], max(deadline, expires_at))
+    prefetched = {}
+    for league, (event_ids, deadline) in leagues.items():
+        if _background_stop.is_set():
+            break
+        with outbound_job(PRIORITY_REFRESH, deadline=deadline):
+            prefetched.update(fetch_live_pinnacle_league_odds(league, event_ids))
+    return prefetched
 
 def background_event_refresher():
-    while True:
+    while not _background_stop.is_set():
         try:
-            time.sleep(state_manager.BACKGROUND_REFRESH_INTERVAL_SECONDS)
+            if _background_stop.wait(state_manager.BACKGROUND_REFRESH_INTERVAL_SECONDS):
+                break
+            # With a shared state backend several processes run this loop; only the lease holder
+            # refreshes, so upstream traffic does not multiply with the number of processes.
+            lease_ttl = state_manager.BACKGROUND_REFRESH_INTERVAL_SECONDS * 5
+            if not state_manager.try_acquire_leadership(BACKGROUND_LEASE_NAME, _process_id(), lease_ttl):
+                continue
+            cycle_start = time.perf_counter()
             current_time = time.time()
             active_events = state_manager.get_active_events()
+            prefetched = _prefetch_league_odds(active_events, current_time)
             
             for event_id, event_data in list(active_events.items()):
+                if _background_stop.is_set():
+                    break
                 if state_manager.is_event_dismissed(event_id):
                     state_manager.remove_active_event(event_id)
-                    logger.info(f"[BackgroundRefresher] Removed dismissed Event ID: {event_id}")
+                    _notify_event_change()
+                    logger.info("[BackgroundRefresher] Removed dismissed Event ID: %s", event_id)
                     continue
                     
                 if (current_time - event_data.get("alert_arrival_timestamp", 0)) > state_manager.EVENT_DATA_EXPIRY_SECONDS:
                     state_manager.remove_active_event(event_id)
                     state_manager.remove_dismissed_event(event_id)
-                    logger.info(f"[BackgroundRefresher] Removed expired Event ID: {event_id}")
+                    _notify_event_change()
+                    logger.info("[BackgroundRefresher] Removed expired Event ID: %s", event_id)
                     continue
                     
                 try:
-                    pinnacle_api_result = fetch_live_pinnacle_event_odds(event_id)
+                    # Refreshes yield to new alerts for upstream slots and are dropped once the event would expire.
+                    expires_at = event_data.get("alert_arrival_timestamp", 0) + state_manager.EVENT_DATA_EXPIRY_SECONDS
+                    pinnacle_api_result = prefetched.get(event_id)
+                    if pinnacle_api_result is None:
+                        with outbound_job(PRIORITY_REFRESH, deadline=expires_at):
+                            pinnacle_api_result = fetch_live_pinnacle_event_odds(event_id)
+                    if pinnacle_api_result.get("cached"):
+                        continue  # Swordfish breaker is open; the stored odds are already the newest we have
                     live_pinnacle_odds_processed = process_event_odds_for_display(pinnacle_api_result.get("data"))
                     if not live_pinnacle_odds_processed.get("data"):
-                        logger.info(f"[BackgroundRefresher] No data for Event ID: {event_id}, skipping update")
+                        logger.info("[BackgroundRefresher] No data for Event ID: %s, skipping update", event_id)
                         continue
+
+                    betbck_result = event_data.get("betbck_data") or {}
+                    if betbck_result.get("status") == "success" and betbck_result.get("data"):
+                        ev_rows = find_ev_bets(betbck_result["data"], live_pinnacle_odds_processed["data"])
+                        price_recorder.record(event_id, ev_rows, current_time)
+                        moves = nvp_detector.observe(event_id, live_pinnacle_odds_processed["data"], betbck_result["data"], rows=ev_rows)
+                        if moves:
+                            betbck_rechecks.submit(event_id, "; ".join(
+                                f"{m['market']} {m['sel']} {m['line']} NVP {format_odds(m['old_nvp'])} -> {format_odds(m['new_nvp'])} (EV {format_ev(m['ev'])})".replace("  ", " ")
+                                for m in moves))
                         
                     state_manager.update_event_data(event_id, {
                         "last_pinnacle_data_update_timestamp": current_time,
                         "pinnacle_data_processed": live_pinnacle_odds_processed
                     })
-                    logger.info(f"[BackgroundRefresher] Updated Pinnacle odds for Event ID: {event_id}")
+                    _notify_event_change()
+                    logger.debug("[BackgroundRefresher] Updated Pinnacle odds for Event ID: %s", event_id)
                 except Exception as e:
-                    logger.error(f"[BackgroundRefresher] Failed to update Event ID: {event_id}, Error: {e}")
-                    traceback.print_exc()
+                    logger.exception("[BackgroundRefresher] Failed to update Event ID: %s, Error: %s", event_id, e)
+            nvp_detector.retain(active_events.keys())
+            REFRESH_CYCLE_SECONDS.observe(time.perf_counter() - cycle_start)
         except Exception as e:
-            logger.error(f"[BackgroundRefresher] Critical Error: {e}")
-            traceback.print_exc()
+            logger.exception("[BackgroundRefresher] Critical Error: %s", e)
+    state_manager.release_leadership(BACKGROUND_LEASE_NAME, _process_id())
+    logger.info("[BackgroundRefresher] Stopped.")
+
+def start_background_tasks():
+    """Starts the background refresher once per process. Safe to call from several server hooks."""
+    with _background_lock:
+        if any(t.is_alive() for t in _background_threads):
+            return
+        _background_stop.clear()
+        _background_threads.clear()
+        refresher = threading.Thread(target=background_event_refresher, name="background-event-refresher", daemon=True)
+        refresher.start()
+        _background_threads.append(refresher)
+        _background_threads.append(betbck_rechecks.start())
+        recorder_thread = price_recorder.start()
+        if recorder_thread:
+            _background_threads.append(recorder_thread)
+        _background_threads.append(config_watcher.start())
+        _background_threads.append(board_sweep.start())
+        parse_pool.start()
+        logger.info("[Server] Background tasks started.")
+
+def stop_background_tasks(timeout=10):
+    """Signals the background tasks to stop and waits up to `timeout` seconds for them to finish."""
+    with _background_lock:
+        _background_stop.set()
+        if not _background_threads:
+            return
+        betbck_rechecks.stop(timeout)
+        price_recorder.stop(timeout)
+        config_watcher.stop(timeout)
+        board_sweep.stop(timeout)
+        state_manager.release_leadership(SWEEP_LEASE_NAME, _process_id())
+        parse_pool.stop(timeout)
+        for t in _background_threads:
+            t.join(timeout)
+        _background_threads.clear()
+        logger.info("[Server] Background tasks stopped.")
+
+def _is_recent_duplicate(event_id_str, active_events, now):
+    if event_id_str in active_events:
+        last_processed = active_events[event_id_str].get("last_pinnacle_data_update_timestamp", 0)
+        return (now - last_processed) < 15
+    return False
+
+def _ingest_pod_alert(payload, pinnacle_api_result=None, search_results_html=None, game_parser=None):
+    """
+    Runs one POD alert through Pinnacle fetch, BetBCK scrape and state storage.
+    Returns (response_body, http_status). Callers that already fetched the Pinnacle
+    event or the BetBCK search page (see /pod_alert_batch), or streamed the search into a
+    game_parser (see /pod_alert), pass them in to avoid repeating the work.
+    """
+    event_id_str = str(payload.get("eventId"))
+    if not event_id_str:
+        return {"status": "error", "message": "Missing eventId"}, 400
+
+    now = time.time()
+    logger.info("[Server-PodAlert] Received alert for Event ID: %s (%s)", event_id_str, payload.get('homeTeam','?'))
+
+    active_events = state_manager.get_active_events()
+    if _is_recent_duplicate(event_id_str, active_events, now):
+        logger.info("[Server-PodAlert] Ignoring duplicate alert for Event ID: %s", event_id_str)
+        return {"status": "success", "message": f"Alert for {event_id_str} recently processed."}, 200
+
+    if pinnacle_api_result is None:
+        pinnacle_api_result = fetch_live_pinnacle_event_odds(event_id_str)
+    live_pinnacle_odds_processed = process_event_odds_for_display(pinnacle_api_result.get("data"))
+    league_name = live_pinnacle_odds_processed.get("league_name", payload.get("leagueName", "Unknown League"))
+    start_time = live_pinnacle_odds_processed.get("starts", payload.get("startTime", "N/A"))
+
+    pod_home_clean = clean_pod_team_name_for_search(payload.get("homeTeam", ""))
+    pod_away_clean = clean_pod_team_name_for_search(payload.get("awayTeam", ""))
+
+    betbck_last_update = None
+    if event_id_str not in active_events:
+        logger.info("[Server-PodAlert] New event %s. Initiating scrape.", event_id_str)
+        betbck_result = process_alert_and_scrape_betbck(event_id_str, payload, live_pinnacle_odds_processed,
+                                                        search_results_html=search_results_html, game_parser=game_parser)
+
+        if not (betbck_result and betbck_result.get("status") == "success"):
+            fail_reason = betbck_result.get("message", "Scraper returned None")
+            logger.error("[Server-PodAlert] Scrape failed. Dropping alert. Reason: %s", fail_reason)
+            return {"status": "error", "message": f"Scrape failed: {fail_reason}"}, 200
+
+        logger.info("[Server-PodAlert] Scrape successful. Storing event %s for display.", event_id_str)
+        betbck_last_update = now
+        event_data = {
+            "alert_arrival_timestamp": now,
+            "last_pinnacle_data_update_timestamp": now,
+            "pinnacle_data_processed": live_pinnacle_odds_processed,
+            "original_alert_details": payload,
+            "betbck_data": betbck_result,
+            "league_name": league_name,
+            "start_time": start_time,
+            "old_odds": payload.get("oldOdds", "N/A"),
+            "new_odds": payload.get("newOdds", "N/A"),
+            "no_vig": payload.get("noVigPriceFromAlert", "N/A"),
+            "cleaned_home_team": pod_home_clean,
+            "cleaned_away_team": pod_away_clean,
+            "betbck_last_update": betbck_last_update
+        }
+        state_manager.add_active_event(event_id_str, event_data)
+        price_recorder.record(event_id_str, betbck_result["data"].get("potential_bets_analyzed"), now)
+    else:
+        logger.info("[Server-PodAlert] Updating existing event %s with fresh Pinnacle data.", event_id_str)
+        state_manager.update_event_data(event_id_str, {
+            "last_pinnacle_data_update_timestamp": now,
+            "pinnacle_data_processed": live_pinnacle_odds_processed
+        })
+    _notify_event_change()
+
+    return {"status": "success", "message": f"Alert for {event_id_str} processed."}, 200
 
 @app.route('/pod_alert', methods=['POST'])
-def handle_pod_alert():
+async def handle_pod_alert():
     try:
         payload = request.json
+        capture("alert", payload=payload)
         event_id_str = str(payload.get("eventId"))
-        if not event_id_str:
-            return jsonify({"status": "error", "message": "Missing eventId"}), 400
+        pinnacle_api_result, search_results_html, game_parser = None, None, None
+        active_events = state_manager.get_active_events()
+        # asyncio.to_thread copies the context, so the worker threads' upstream requests carry this job.
+        with outbound_job(PRIORITY_ALERT, deadline=time.time() + ALERT_DEADLINE_SECONDS):
+            if event_id_str not in active_events and not is_prop_alert(payload.get("homeTeam", ""), payload.get("awayTeam", "")):
+                # New event: the Pinnacle fetch and the BetBCK login/search are independent, so run them concurrently.
+                # The search streams into a parser that stops reading at the game when stream_search_results is on.
+                home, away = payload.get("homeTeam", ""), payload.get("awayTeam", "")
+                search_term = determine_betbck_search_term(home, away)
+                pinnacle_api_result, (search_results_html, game_parser) = await asyncio.gather(
+                    asyncio.to_thread(fetch_live_pinnacle_event_odds, event_id_str),
+                    asyncio.to_thread(prefetch_search_for_game, search_term, home, away, event_id_str),
+                )
+            body, status_code = await asyncio.to_thread(_ingest_pod_alert, payload, pinnacle_api_result, search_results_html, game_parser)
+        return jsonify(body), status_code
 
-        now = time.time()
-        logger.info(f"\n[Server-PodAlert] Received alert for Event ID: {event_id_str} ({payload.get('homeTeam','?')})")
+    except Exception as e:
+        logger.exception("[Server-PodAlert] CRITICAL Error in /pod_alert: %s", e)
+        return jsonify({"status": "error", "message": f"Internal server error: {str(e)}"}), 500
 
+def _process_alert_group(group_key, payloads, pinnacle_futures):
+    """Processes alerts sharing a league and BetBCK search keyword with a single BetBCK search."""
+    league_name, search_term = group_key
+    active_events = state_manager.get_active_events()
+    needs_scrape = [p for p in payloads if str(p.get("eventId")) not in active_events
+                    and not is_prop_alert(p.get("homeTeam", ""), p.get("awayTeam", ""))]
+    search_results_html, game_parsers = None, {}
+    if len(needs_scrape) == 1:
+        # One new game: its search can stream and stop at the game, like a single /pod_alert.
+        only = needs_scrape[0]
+        search_results_html, game_parser = prefetch_search_for_game(search_term, only.get("homeTeam", ""), only.get("awayTeam", ""),
+                                                                    str(only.get("eventId")))
+        game_parsers[str(only.get("eventId"))] = game_parser
+    elif needs_scrape:
+        logger.info("[Server-PodAlertBatch] Shared BetBCK search '%s' for %s new event(s) in '%s'", search_term, len(needs_scrape), league_name)
+        # An empty page makes the scrape fail per alert instead of re-searching once per alert.
+        search_results_html = fetch_search_results_html(search_term) or ""
+    results = {}
+    for payload in payloads:
+        event_id_str = str(payload.get("eventId"))
+        try:
+            pinnacle_future = pinnacle_futures.get(event_id_str)
+            pinnacle_api_result = pinnacle_future.result() if pinnacle_future else None
+            body, _ = _ingest_pod_alert(payload, pinnacle_api_result=pinnacle_api_result, search_results_html=search_results_html,
+                                        game_parser=game_parsers.get(event_id_str))
+        except Exception as e:
+            logger.exception("[Server-PodAlertBatch] Error processing Event ID %s: %s", event_id_str, e)
+            body = {"status": "error", "message": f"Internal server error: {str(e)}"}
+        results[event_id_str] = body
+    return results
+
+@app.route('/pod_alert_batch', methods=['POST'])
+def handle_pod_alert_batch():
+    """
+    Accepts a JSON array of POD alerts (or {"alerts": [...]}). Alerts are deduped by eventId
+    (the last one wins), grouped by league and BetBCK search keyword so each group logs in and
+    searches once, and the groups are processed in parallel. Returns one result per input alert.
+    """
+    try:
+        payload = request.json
+        alerts = payload.get("alerts") if isinstance(payload, dict) else payload
+        if not isinstance(alerts, list):
+            return jsonify({"status": "error", "message": "Expected a JSON array of alerts."}), 400
+        capture("alert_batch", alerts=alerts)
+
+        latest_by_event = {}
+        for alert in alerts:
+            if isinstance(alert, dict) and alert.get("eventId") is not None:
+                latest_by_event[str(alert.get("eventId"))] = alert
+        logger.info("[Server-PodAlertBatch] Received %s alerts, %s unique events.", len(alerts), len(latest_by_event))
+
+        now = time.time()
         active_events = state_manager.get_active_events()
-        if event_id_str in active_events:
-            last_processed = active_events[event_id_str].get("last_pinnacle_data_update_timestamp", 0)
-            if (now - last_processed) < 15:
-                logger.info(f"[Server-PodAlert] Ignoring duplicate alert for Event ID: {event_id_str}")
-                return jsonify({"status": "success", "message": f"Alert for {event_id_str} recently processed."}), 200
+        results_by_event = {}
+        groups = {}
+        for event_id_str, alert in latest_by_event.items():
+            if _is_recent_duplicate(event_id_str, active_events, now):
+                results_by_event[event_id_str] = {"status": "success", "message": f"Alert for {event_id_str} recently processed."}
+                continue
+            search_term = determine_betbck_search_term(alert.get("homeTeam", ""), alert.get("awayTeam", ""))
+            group_key = (str(alert.get("leagueName", "")).strip().lower(), search_term.lower())
+            groups.setdefault(group_key, []).append(alert)
 
-        pinnacle_api_result = fetch_live_pinnacle_event_odds(event_id_str)
-        live_pinnacle_odds_processed = process_event_odds_for_display(pinnacle_api_result.get("data"))
-        league_name = live_pinnacle_odds_processed.get("league_name", payload.get("leagueName", "Unknown League"))
-        start_time = live_pinnacle_odds_processed.get("starts", payload.get("startTime", "N/A"))
-
-        pod_home_clean = clean_pod_team_name_for_search(payload.get("homeTeam", ""))
-        pod_away_clean = clean_pod_team_name_for_search(payload.get("awayTeam", ""))
-
-        betbck_last_update = None
-        if event_id_str not in active_events:
-            logger.info(f"[Server-PodAlert] New event {event_id_str}. Initiating scrape.")
-            betbck_result = process_alert_and_scrape_betbck(event_id_str, payload, live_pinnacle_odds_processed)
-
-            if not (betbck_result and betbck_result.get("status") == "success"):
-                fail_reason = betbck_result.get("message", "Scraper returned None")
-                logger.error(f"[Server-PodAlert] Scrape failed. Dropping alert. Reason: {fail_reason}")
-                return jsonify({"status": "error", "message": f"Scrape failed: {fail_reason}"}), 200
-
-            logger.info(f"[Server-PodAlert] Scrape successful. Storing event {event_id_str} for display.")
-            betbck_last_update = now
-            event_data = {
-                "alert_arrival_timestamp": now,
-                "last_pinnacle_data_update_timestamp": now,
-                "pinnacle_data_processed": live_pinnacle_odds_processed,
-                "original_alert_details": payload,
-                "betbck_data": betbck_result,
-                "league_name": league_name,
-                "start_time": start_time,
-                "old_odds": payload.get("oldOdds", "N/A"),
-                "new_odds": payload.get("newOdds", "N/A"),
-                "no_vig": payload.get("noVigPriceFromAlert", "N/A"),
-                "cleaned_home_team": pod_home_clean,
-                "cleaned_away_team": pod_away_clean,
-                "betbck_last_update": betbck_last_update
-            }
-            state_manager.add_active_event(event_id_str, event_data)
-        else:
-            logger.info(f"[Server-PodAlert] Updating existing event {event_id_str} with fresh Pinnacle data.")
-            state_manager.update_event_data(event_id_str, {
-                "last_pinnacle_data_update_timestamp": now,
-                "pinnacle_data_processed": live_pinnacle_odds_processed
-            })
-
-        return jsonify({"status": "success", "message": f"Alert for {event_id_str} processed."}), 200
+        if groups:
+            with outbound_job(PRIORITY_ALERT, deadline=now + ALERT_DEADLINE_SECONDS), \
+                 ThreadPoolExecutor(max_workers=BATCH_MAX_WORKERS) as fetch_pool, \
+                 ThreadPoolExecutor(max_workers=BATCH_MAX_WORKERS) as group_pool:
+                # Each task runs in a copy of this context so its upstream requests carry the alert job.
+                submit = lambda pool, fn, *args: pool.submit(contextvars.copy_context().run, fn, *args)
+                pinnacle_futures = {str(a.get("eventId")): submit(fetch_pool, fetch_live_pinnacle_event_odds, str(a.get("eventId")))
+                                    for group_alerts in groups.values() for a in group_alerts}
+                group_futures = [submit(group_pool, _process_alert_group, key, group_alerts, pinnacle_futures)
+                                 for key, group_alerts in groups.items()]
+                for future in group_futures:
+                    results_by_event.update(future.result())
+
+        results = []
+        seen = set()
+        for alert in alerts:
+            event_id = alert.get("eventId") if isinstance(alert, dict) else None
+            if event_id is None:
+                results.append({"eventId": None, "status": "error", "message": "Missing eventId"})
+                continue
+            event_id_str = str(event_id)
+            result = {"eventId": event_id_str, **results_by_event.get(event_id_str, {"status": "error", "message": "Not processed."})}
+            if event_id_str in seen or alert is not latest_by_event[event_id_str]:
+                result = {"eventId": event_id_str, "status": "duplicate", "message": f"Superseded by another alert for {event_id_str} in this batch."}
+            seen.add(event_id_str)
+            results.append(result)
+        return jsonify({"status": "success", "received": len(alerts), "unique_events": len(latest_by_event),
+                        "groups": len(groups), "results": results}), 200
 
     except Exception as e:
-        logger.error(f"[Server-PodAlert] CRITICAL Error in /pod_alert: {e}")
-        traceback.print_exc()
+        logger.exception("[Server-PodAlertBatch] CRITICAL Error in /pod_alert_batch: %s", e)
         return jsonify({"status": "error", "message": f"Internal server error: {str(e)}"}), 500
 
-@app.route('/get_active_events_data', methods=['GET'])
-def get_active_events_data():
+def _record_first_display(data_to_send, now):
+    with _displayed_event_ids_lock:
+        for eid, event in data_to_send.items():
+            if eid not in _displayed_event_ids and event.get("alert_arrival_timestamp"):
+                ALERT_TO_DASHBOARD_SECONDS.observe(max(0.0, now - event["alert_arrival_timestamp"]))
+                _displayed_event_ids.add(eid)
+        _displayed_event_ids.intersection_update(data_to_send)
+
+def _add_server_timing(name, seconds):
+    g.setdefault("server_timing", []).append(f"{name};dur={seconds * 1000:.2f}")
+
+def _build_dashboard_events(only_event_id=None):
+    """
+    Returns {event_id: raw display record} for every unexpired event (or just `only_event_id`);
+    see dashboard_payload for the wire formats.
+    """
     current_time_sec = time.time()
     data_to_send = {}
-    for eid, entry in state_manager.get_active_events().items():
+    active_items = state_manager.get_active_events().items()
+    if only_event_id is not None:
+        active_items = [(eid, entry) for eid, entry in active_items if eid == only_event_id]
+    for eid, entry in active_items:
         if (current_time_sec - entry.get("alert_arrival_timestamp", 0)) > state_manager.EVENT_DATA_EXPIRY_SECONDS:
             continue
         bet_data = entry["betbck_data"].get("data", {})
@@ -204,30 +531,24 @@ def get_active_events_data():
         # Initialize markets and re-analyze with latest pinnacle data
         markets = []
         if bet_data.get("potential_bets_analyzed"):
-            # Reanalyze with latest pinnacle data to ensure values are up-to-date
+            # Re-price each analyzed market against the latest Pinnacle NVPs. Odds stay decimal and EV a
+            # fraction here; dashboard_payload formats them for the response.
+            pin_full_game = pinnacle_data.get("periods", {}).get("num_0", {})
             for bet in bet_data["potential_bets_analyzed"]:
                 market_type = bet.get("market")
                 selection = bet.get("sel", bet.get("selection"))
                 line = bet.get("line", "")
-                betbck_odds = bet.get("bck_odds", "N/A")
-                
-                # Re-fetch the current Pinnacle NVP based on market type
-                latest_nvp = bet.get("pin_nvp", "N/A")
-                
-                # Look for updated Pinnacle NVP in the latest data
-                pin_periods = pinnacle_data.get("periods", {})
-                pin_full_game = pin_periods.get("num_0", {})
-                
-                # Try to find and update NVP based on market type
+                betbck_odds = bet.get("bck_odds")
+                latest_nvp = bet.get("pin_nvp")
                 try:
                     if market_type == "ML":
                         pin_ml = pin_full_game.get("money_line", {})
                         if selection == "Home" or selection == bet_data.get("pod_home_team"):
-                            latest_nvp = pin_ml.get("nvp_american_home", latest_nvp)
+                            latest_nvp = pin_ml.get("nvp_home", latest_nvp)
                         elif selection == "Away" or selection == bet_data.get("pod_away_team"):
-                            latest_nvp = pin_ml.get("nvp_american_away", latest_nvp)
+                            latest_nvp = pin_ml.get("nvp_away", latest_nvp)
                         elif selection == "Draw":
-                            latest_nvp = pin_ml.get("nvp_american_draw", latest_nvp)
+                            latest_nvp = pin_ml.get("nvp_draw", latest_nvp)
                     elif market_type == "Spread":
                         pin_spreads = pin_full_game.get("spreads", {})
                         # Determine if this is home or away
@@ -235,64 +556,214 @@ def get_active_events_data():
                         target_hdp = float(line) if is_home else -float(line)
                         for hdp_key, spread_data in pin_spreads.items():
                             if abs(spread_data.get("hdp", 0) - target_hdp) < 0.01:
-                                latest_nvp = spread_data.get("nvp_american_home" if is_home else "nvp_american_away", latest_nvp)
+                                latest_nvp = spread_data.get("nvp_home" if is_home else "nvp_away", latest_nvp)
                                 break
                     elif market_type == "Total":
                         pin_totals = pin_full_game.get("totals", {})
-                        target_points = line
-                        if target_points in pin_totals:
-                            latest_nvp = pin_totals[target_points].get(
-                                "nvp_american_over" if selection == "Over" else "nvp_american_under", 
-                                latest_nvp
-                            )
-                    
-                    # Recalculate EV with latest NVP
-                    if latest_nvp != "N/A" and betbck_odds != "N/A":
-                        bet_decimal = american_to_decimal(betbck_odds)
-                        true_decimal = american_to_decimal(latest_nvp)
-                        from main_logic import calculate_ev
-                        ev = calculate_ev(bet_decimal, true_decimal)
-                        ev_display = f"{ev*100:.2f}%" if ev is not None else bet.get("ev", "N/A")
-                    else:
-                        ev_display = bet.get("ev", "N/A")
-                        
-                    print(f"[GetActiveEvents] Market {market_type} {selection} {line}: Updated NVP from {bet.get('pin_nvp')} to {latest_nvp}")
+                        if line in pin_totals:
+                            latest_nvp = pin_totals[line].get("nvp_over" if selection == "Over" else "nvp_under", latest_nvp)
+                    ev = calculate_ev(betbck_odds, latest_nvp)
+                    if ev is None:
+                        ev = bet.get("ev")
+                    logger.debug("[GetActiveEvents] Market %s %s %s: Updated NVP from %s to %s", market_type, selection, line, bet.get('pin_nvp'), latest_nvp, extra=sample_every(50))
                 except Exception as e:
-                    print(f"[GetActiveEvents] Error updating market {market_type} {selection}: {e}")
-                    ev_display = bet.get("ev", "N/A")
-                    latest_nvp = bet.get("pin_nvp", "N/A")
+                    logger.warning("[GetActiveEvents] Error updating market %s %s: %s", market_type, selection, e)
+                    ev = bet.get("ev")
+                    latest_nvp = bet.get("pin_nvp")
                 
-                # Map keys to expected frontend format
                 markets.append({
                     "market": market_type,
                     "selection": selection,
                     "line": line,
                     "pinnacle_nvp": latest_nvp,
                     "betbck_odds": betbck_odds,
-                    "ev": ev_display
+                    "ev": ev
                 })
         data_to_send[eid] = {
-            "title": f"{home_team} vs {away_team}",
-            "meta_info": f"{league_name} | Starts: {start_time}",
+            "home": home_team,
+            "away": away_team,
+            "league": league_name,
+            "starts": start_time,
             "last_update": entry.get("last_pinnacle_data_update_timestamp", "N/A"),
             "betbck_last_update": entry.get("betbck_last_update", None),
             "alert_description": entry['original_alert_details'].get("betDescription", "POD Alert Processed"),
-            "alert_meta": f"(Alert: {entry['old_odds']} → {entry['new_odds']}, NVP: {entry['no_vig']})",
-            "betbck_status": f"Data Fetched: {home_team} vs {away_team}" if entry["betbck_data"].get("status") == "success" else entry["betbck_data"].get("message", "Odds check pending..."),
+            "old_odds": entry['old_odds'],
+            "new_odds": entry['new_odds'],
+            "no_vig": entry['no_vig'],
+            # None means "Data Fetched: <title>"; otherwise the scrape error to show.
+            "betbck_status": None if entry["betbck_data"].get("status") == "success" else entry["betbck_data"].get("message", "Odds check pending..."),
             "markets": markets,
             "alert_arrival_timestamp": entry.get("alert_arrival_timestamp", None)
         }
-    expired_ids = set(state_manager.get_active_events().keys()) - set(data_to_send.keys())
-    for eid in expired_ids:
-        state_manager.remove_active_event(eid)
-    print(f"[GetActiveEvents] Returning {len(data_to_send)} active events")
-    return jsonify(data_to_send)
+    if only_event_id is None:
+        expired_ids = set(state_manager.get_active_events().keys()) - set(data_to_send.keys())
+        for eid in expired_ids:
+            state_manager.remove_active_event(eid)
+        if expired_ids:
+            _notify_event_change()
+    return data_to_send
+
+def _event_version(record):
+    # Content hash of what a popup shows; the refresh timestamp alone does not count as a change.
+    return hashlib.blake2b(dumps({k: v for k, v in record.items() if k != "last_update"}), digest_size=8).hexdigest()
+
+def _current_event(event_id):
+    """Returns (verbose event, version) or (None, None) if the event is gone."""
+    record = _build_dashboard_events(only_event_id=event_id).get(event_id)
+    if record is None:
+        return None, None
+    return verbose_payload({event_id: record})[event_id], _event_version(record)
+
+@app.route('/event/<event_id>', methods=['GET'])
+def get_event(event_id):
+    """
+    One event in the verbose dashboard shape plus its version. With ?since=<version> the request
+    is held until the event changes (200), it disappears (404) or ?timeout= seconds pass (204).
+    """
+    since = request.args.get("since")
+    try:
+        timeout = float(request.args.get("timeout", 25))
+    except ValueError:
+        timeout = math.nan
+    if not math.isfinite(timeout):
+        return jsonify({"status": "error", "message": "timeout must be a number"}), 400
+    deadline = time.monotonic() + min(max(timeout, 0.0), EVENT_POLL_MAX_TIMEOUT_SECONDS)
+    waiting = False
+    try:
+        while True:
+            with _event_change:
+                generation = _event_change_generation
+            event, version = _current_event(event_id)
+            if event is None:
+                return jsonify({"status": "error", "message": f"Event {event_id} is not active."}), 404
+            if not since or version != since:
+                return jsonify({"event_id": event_id, "version": version, "event": event})
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return Response(status=204)
+            if not waiting:
+                if not _event_poll_slots.acquire(blocking=False):
+                    return jsonify({"status": "error", "message": "Too many long-polls waiting; retry shortly."}), 503, {"Retry-After": "1"}
+                waiting = True
+            with _event_change:
+                _event_change.wait_for(lambda: _event_change_generation != generation,
+                                       timeout=min(remaining, EVENT_POLL_RECHECK_SECONDS))
+    finally:
+        if waiting:
+            _event_poll_slots.release()
+
+@app.route('/get_active_events_data', methods=['GET'])
+def get_active_events_data():
+    """Active events for the dashboard. ?format=compact, ?fields=a,b and Accept-Encoding are described in dashboard_payload."""
+    try:
+        fields = parse_fields(request.args.get("fields"))
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    payload_format = "compact" if request.args.get("format") == "compact" else "verbose"
+
+    with stage_timer("dashboard_render"):
+        events = _build_dashboard_events()
+    _record_first_display(events, time.time())
+
+    start = time.perf_counter()
+    with stage_timer("dashboard_serialize"):
+        payload = compact_payload(events, fields) if payload_format == "compact" else verbose_payload(events, fields)
+        body = dumps(payload)
+    _add_server_timing("ser", time.perf_counter() - start)
+    raw_size = len(body)
+
+    encoding = negotiate_encoding(request.headers.get("Accept-Encoding", ""), raw_size)
+    if encoding:
+        start = time.perf_counter()
+        with stage_timer("dashboard_compress"):
+            body = compress(body, encoding)
+        _add_server_timing("cmp", time.perf_counter() - start)
+    DASHBOARD_PAYLOAD_BYTES.observe(len(body), format=payload_format, encoding=encoding or "identity")
+
+    response = Response(body, mimetype="application/json")
+    response.headers["Vary"] = "Accept-Encoding"
+    response.headers["X-Uncompressed-Length"] = str(raw_size)
+    if encoding:
+        response.headers["Content-Encoding"] = encoding
+    logger.debug("[GetActiveEvents] Returning %s active events (%s, %d -> %d bytes)", len(events), payload_format, raw_size, len(body))
+    return response
 
 @app.route('/')
 @app.route('/odds_table')
 def odds_table_page_route():
     return render_template('realtime.html')
 
+@app.route('/metrics')
+def metrics_route():
+    """Prometheus text exposition; ?format=json gives p50/p95/p99 per stage for quick reading."""
+    if request.args.get("format") == "json":
+        return jsonify(render_summary())
+    return Response(render_prometheus(), mimetype="text/plain; version=0.0.4")
+
+def _admin_denied():
+    if not ADMIN_TOKEN:
+        return jsonify({"status": "error", "message": "Not found"}), 404
+    if not hmac.compare_digest(request.headers.get("X-Admin-Token", ""), ADMIN_TOKEN):
+        return jsonify({"status": "error", "message": "Forbidden"}), 403
+    return None
+
+@app.route('/admin/profile/cpu', methods=['GET'])
+def admin_profile_cpu():
+    """Samples every thread for ?seconds=N (default 10) and returns collapsed stacks for a flamegraph."""
+    denied = _admin_denied()
+    if denied:
+        return denied
+    try:
+        seconds = float(request.args.get("seconds", 10))
+        interval = float(request.args.get("interval_ms", 5)) / 1000.0
+    except ValueError:
+        return jsonify({"status": "error", "message": "seconds and interval_ms must be numbers"}), 400
+    logger.info("[Admin] CPU profile requested for %.1fs", seconds)
+    try:
+        stacks = sample_cpu(seconds, interval, include_idle=request.args.get("idle") == "1")
+    except ProfilerBusy as e:
+        return jsonify({"status": "error", "message": str(e)}), 409
+    filename = f"podbot-cpu-{time.strftime('%Y%m%d-%H%M%S')}.collapsed"
+    return Response(render_collapsed(stacks), mimetype="text/plain",
+                    headers={"Content-Disposition": f"attachment; filename={filename}"})
+
+@app.route('/admin/profile/memory/snapshot', methods=['POST'])
+def admin_memory_snapshot():
+    denied = _admin_denied()
+    if denied:
+        return denied
+    return jsonify(memory_tracker.snapshot(request.args.get("name"), int(request.args.get("frames", 10))))
+
+@app.route('/admin/profile/memory/diff', methods=['GET'])
+def admin_memory_diff():
+    denied = _admin_denied()
+    if denied:
+        return denied
+    group = request.args.get("group", "lineno")
+    if group not in ("lineno", "filename", "traceback"):
+        return jsonify({"status": "error", "message": "group must be lineno, filename or traceback"}), 400
+    try:
+        return jsonify(memory_tracker.diff(request.args.get("from"), request.args.get("to"), group, int(request.args.get("limit", 25))))
+    except KeyError as e:
+        return jsonify({"status": "error", "message": e.args[0]}), 404
+
+@app.route('/admin/profile/memory/stop', methods=['POST'])
+def admin_memory_stop():
+    denied = _admin_denied()
+    if denied:
+        return denied
+    memory_tracker.stop()
+    return jsonify({"status": "success", "message": "tracemalloc stopped and snapshots dropped."})
+
+@app.route('/admin/config/reload', methods=['POST'])
+def admin_config_reload():
+    """Reloads config.json now instead of waiting for the watcher; an invalid file is rejected with 422."""
+    denied = _admin_denied()
+    if denied:
+        return denied
+    ok, message = podbot_config.reload()
+    return jsonify({"status": "success" if ok else "error", "message": message}), 200 if ok else 422
+
 @app.route('/dismiss_event', methods=['POST'])
 def dismiss_event():
     data = request.json
@@ -300,10 +771,12 @@ def dismiss_event():
     if event_id:
         state_manager.add_dismissed_event(event_id)
         state_manager.remove_active_event(event_id)
+        _notify_event_change()
         return jsonify({'status': 'success', 'message': f'Event {event_id} dismissed.'})
     return jsonify({'status': 'error', 'message': 'No eventId provided.'}), 400
 
 if __name__ == '__main__':
+    # Development server. For production use `python wsgi.py` (see README).
     logger.info("Starting Python Flask server for PODBot...")
-    threading.Thread(target=background_event_refresher, daemon=True).start()
+    start_background_tasks()
     app.run(host='0.0.0.0', port=5001, debug=True, use_reloader=False, threaded=True)
\ No newline at end of file
@@ -0,0 +1,109 @@
+"""
+Sportsbook adapters and the per-alert fan-out across them.
+
+Each book implements SportsbookAdapter.quote() and returns its prices for one POD game as
+normalized market records:
+
+    {"book": "betbck", "market": "ML" | "Spread" | "Total", "side": "home" | "away" | "draw" | "over" | "under",
+     "line": "-1.5" | "2.5" | "" (moneylines), "odds": 2.05}
+
+Odds are decimal floats (see odds.py); market_record() parses a book's American odds strings once.
+
+Lines are as the book prints them and are from the side's own perspective (an away spread of
+"+1.5" is Pinnacle hdp -1.5). The EV engine (main_logic.ev_rows_for_markets) prices these
+records against Pinnacle without knowing which book they came from.
+
+quote_all_books() queries every enabled book at once and gives each its own timeout, so an
+alert waits for the slowest book that answers in time rather than for the sum of all books.
+Books are enabled in config.json:
+
+    "sportsbooks": {"enabled": ["betbck"], "timeouts": {"betbck": 30}}
+
+Without that section every registered book is enabled with DEFAULT_BOOK_TIMEOUT_SECONDS.
+"""
+import contextvars
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from metrics import counter, histogram
+from odds import american_to_decimal
+from podbot_config import current as current_config
+from podbot_logging import get_logger
+
+logger = get_logger("books")
+
+DEFAULT_BOOK_TIMEOUT_SECONDS = 30
+
+BOOK_SECONDS = histogram("podbot_book_quote_seconds", "Time for one sportsbook to quote an alert, by book and status.")
+BOOK_QUOTES = counter("podbot_book_quotes_total", "Sportsbook quotes by book and status.")
+
+class SportsbookAdapter:
+    """One sportsbook. Subclasses set `name` and implement quote()."""
+    name = None
+
+    def quote(self, event_id, alert, pinnacle_processed, **options):
+        """
+        Returns {"status": "success", "markets": [records], "data": book-specific raw data} for the alert's
+        game, or {"status": <error status>, "message": ...}. May raise; the fan-out records that as an error.
+        """
+        raise NotImplementedError
+
+_adapters = {}
+
+def register_adapter(adapter):
+    _adapters[adapter.name] = adapter
+    return adapter
+
+def registered_books():
+    return list(_adapters)
+
+def market_record(book, market, side, line, odds):
+    """`odds` is decimal odds, or American odds as scraped text ("+105"), which is parsed here."""
+    if isinstance(odds, str):
+        odds = american_to_decimal(odds)
+    return {"book": book, "market": market, "side": side, "line": "" if line is None else str(line), "odds": odds}
+
+def enabled_books():
+    enabled = current_config().sportsbooks.enabled
+    return [name for name in (enabled if enabled is not None else _adapters) if name in _adapters]
+
+def book_timeout(name):
+    return current_config().sportsbooks.timeouts.get(name, DEFAULT_BOOK_TIMEOUT_SECONDS)
+
+# Sized for several alerts in flight across a few books; a timed-out quote keeps its worker until it returns.
+_pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="book-quote")
+
+def _timed_quote(adapter, event_id, alert, pinnacle_processed, options):
+    start = time.perf_counter()
+    try:
+        result = adapter.quote(event_id, alert, pinnacle_processed, **options) or {"status": "error", "message": "No result."}
+    except Exception as e:
+        logger.exception("[Sportsbooks] %s quote for Event ID %s raised: %s", adapter.name, event_id, e)
+        result = {"status": "error", "message": str(e)}
+    BOOK_SECONDS.observe(time.perf_counter() - start, book=adapter.name, status=result.get("status"))
+    return result
+
+def quote_all_books(event_id, alert, pinnacle_processed, books=None, book_options=None):
+    """
+    Quotes the alert's game at every book in `books` (default: enabled_books()) concurrently.
+    `book_options` maps a book name to extra keyword arguments for its adapter. Returns
+    {book: result}, where a book that misses its timeout gets {"status": "timeout"}.
+    """
+    books = enabled_books() if books is None else [b for b in books if b in _adapters]
+    book_options = book_options or {}
+    # Each quote runs in a copy of the caller's context so the rate limiter sees the caller's job.
+    futures = {name: _pool.submit(contextvars.copy_context().run, _timed_quote, _adapters[name], event_id, alert,
+                                  pinnacle_processed, book_options.get(name, {}))
+               for name in books}
+    started = time.monotonic()
+    results = {}
+    for name, future in futures.items():
+        remaining = book_timeout(name) - (time.monotonic() - started)
+        done, _ = wait([future], timeout=max(0.0, remaining))
+        if done:
+            results[name] = future.result()
+        else:
+            logger.warning("[Sportsbooks] %s did not quote Event ID %s within %.0fs.", name, event_id, book_timeout(name))
+            results[name] = {"status": "timeout", "message": f"{name} did not answer within {book_timeout(name):.0f}s."}
+        BOOK_QUOTES.inc(book=name, status=results[name].get("status"))
+    return results
@@ -0,0 +1,190 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Set, Any, Optional
+
+from event_model import compact_event, plain
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SQLITE_STATE_PATH = os.path.join(SCRIPT_DIR, "podbot_state.db")
+
+class StateManager:
+    """Process-local event state, kept compact (see event_model). Fast, but only usable with a single server process."""
+    SHARED_ACROSS_PROCESSES = False
+
+    def __init__(self):
+        self._active_events_lock = threading.Lock()
+        self._dismissed_events_lock = threading.Lock()
+        self._active_events: Dict[str, Dict[str, Any]] = {}
+        self._dismissed_event_ids: Set[str] = set()
+        self.EVENT_DATA_EXPIRY_SECONDS = 300
+        self.BACKGROUND_REFRESH_INTERVAL_SECONDS = 3
+
+    def get_active_events(self) -> Dict[str, Dict[str, Any]]:
+        with self._active_events_lock:
+            return self._active_events.copy()
+
+    def add_active_event(self, event_id: str, event_data: Dict[str, Any]) -> None:
+        event_data = compact_event(event_data)
+        with self._active_events_lock:
+            self._active_events[event_id] = event_data
+
+    def remove_active_event(self, event_id: str) -> None:
+        with self._active_events_lock:
+            self._active_events.pop(event_id, None)
+
+    def is_event_dismissed(self, event_id: str) -> bool:
+        with self._dismissed_events_lock:
+            return event_id in self._dismissed_event_ids
+
+    def add_dismissed_event(self, event_id: str) -> None:
+        with self._dismissed_events_lock:
+            self._dismissed_event_ids.add(event_id)
+
+    def remove_dismissed_event(self, event_id: str) -> None:
+        with self._dismissed_events_lock:
+            self._dismissed_event_ids.discard(event_id)
+
+    def update_event_data(self, event_id: str, update_data: Dict[str, Any]) -> None:
+        update_data = compact_event(update_data)
+        with self._active_events_lock:
+            if event_id in self._active_events:
+                self._active_events[event_id].update(update_data)
+
+    def try_acquire_leadership(self, lease_name: str, holder_id: str, ttl_seconds: float) -> bool:
+        # A single process is always the leader.
+        return True
+
+    def release_leadership(self, lease_name: str, holder_id: str) -> None:
+        pass
+
+class SQLiteStateManager:
+    """
+    Event state shared by every server process on the box through one SQLite file in WAL mode.
+    Readers never block the writer, so dashboard polls in one process do not stall alert
+    ingestion in another. Event dicts are stored as JSON; a global version counter lets
+    get_active_events() reuse its last decoded (and compacted) snapshot while nothing has changed.
+    Leader election uses a lease row that the holder renews every refresh cycle.
+    """
+    SHARED_ACROSS_PROCESSES = True
+
+    def __init__(self, path: str = DEFAULT_SQLITE_STATE_PATH):
+        self.path = path
+        self.EVENT_DATA_EXPIRY_SECONDS = 300
+        self.BACKGROUND_REFRESH_INTERVAL_SECONDS = 3
+        self._local = threading.local()
+        self._snapshot_lock = threading.Lock()
+        self._snapshot_version = -1
+        self._snapshot: Dict[str, Dict[str, Any]] = {}
+        conn = self._conn()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS events (event_id TEXT PRIMARY KEY, data TEXT NOT NULL, version INTEGER NOT NULL DEFAULT 0);
+            CREATE TABLE IF NOT EXISTS dismissed (event_id TEXT PRIMARY KEY);
+            CREATE TABLE IF NOT EXISTS leases (name TEXT PRIMARY KEY, holder TEXT NOT NULL, expires_at REAL NOT NULL);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+            INSERT OR IGNORE INTO meta (key, value) VALUES ('version', 0);
+        """)
+
+    def _conn(self) -> sqlite3.Connection:
+        # One connection per thread, and never reuse a connection inherited across fork().
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _write(self, fn):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            result = fn(conn)
+            conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+            conn.execute("COMMIT")
+            return result
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def get_active_events(self) -> Dict[str, Dict[str, Any]]:
+        conn = self._conn()
+        conn.execute("BEGIN")
+        try:
+            version = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+            with self._snapshot_lock:
+                if version == self._snapshot_version:
+                    return self._snapshot.copy()
+            rows = conn.execute("SELECT event_id, data FROM events").fetchall()
+        finally:
+            conn.execute("COMMIT")
+        snapshot = {event_id: compact_event(json.loads(data)) for event_id, data in rows}
+        with self._snapshot_lock:
+            if version > self._snapshot_version:
+                self._snapshot_version, self._snapshot = version, snapshot
+        return snapshot.copy()
+
+    def add_active_event(self, event_id: str, event_data: Dict[str, Any]) -> None:
+        data = json.dumps(event_data, default=plain)
+        self._write(lambda conn: conn.execute(
+            "INSERT INTO events (event_id, data, version) VALUES (?, ?, 1) "
+            "ON CONFLICT(event_id) DO UPDATE SET data = excluded.data, version = events.version + 1",
+            (event_id, data)))
+
+    def remove_active_event(self, event_id: str) -> None:
+        self._write(lambda conn: conn.execute("DELETE FROM events WHERE event_id = ?", (event_id,)))
+
+    def is_event_dismissed(self, event_id: str) -> bool:
+        return self._conn().execute("SELECT 1 FROM dismissed WHERE event_id = ?", (event_id,)).fetchone() is not None
+
+    def add_dismissed_event(self, event_id: str) -> None:
+        self._write(lambda conn: conn.execute("INSERT OR IGNORE INTO dismissed (event_id) VALUES (?)", (event_id,)))
+
+    def remove_dismissed_event(self, event_id: str) -> None:
+        self._write(lambda conn: conn.execute("DELETE FROM dismissed WHERE event_id = ?", (event_id,)))
+
+    def update_event_data(self, event_id: str, update_data: Dict[str, Any]) -> None:
+        def _update(conn):
+            row = conn.execute("SELECT data FROM events WHERE event_id = ?", (event_id,)).fetchone()
+            if row is None:
+                return
+            event_data = json.loads(row[0])
+            event_data.update(update_data)
+            conn.execute("UPDATE events SET data = ?, version = version + 1 WHERE event_id = ?", (json.dumps(event_data, default=plain), event_id))
+        self._write(_update)
+
+    def try_acquire_leadership(self, lease_name: str, holder_id: str, ttl_seconds: float) -> bool:
+        """Takes or renews the named lease. Returns True if `holder_id` holds it afterwards."""
+        conn = self._conn()
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT holder, expires_at FROM leases WHERE name = ?", (lease_name,)).fetchone()
+            acquired = row is None or row[0] == holder_id or row[1] < now
+            if acquired:
+                conn.execute("INSERT INTO leases (name, holder, expires_at) VALUES (?, ?, ?) "
+                             "ON CONFLICT(name) DO UPDATE SET holder = excluded.holder, expires_at = excluded.expires_at",
+                             (lease_name, holder_id, now + ttl_seconds))
+            conn.execute("COMMIT")
+            return acquired
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def release_leadership(self, lease_name: str, holder_id: str) -> None:
+        conn = self._conn()
+        conn.execute("DELETE FROM leases WHERE name = ? AND holder = ?", (lease_name, holder_id))
+
+def create_state_manager(backend: Optional[str] = None, path: Optional[str] = None):
+    """
+    Builds the configured state backend. PODBOT_STATE_BACKEND selects 'memory' (default)
+    or 'sqlite'; PODBOT_STATE_PATH overrides the SQLite file location.
+    """
+    backend = (backend or os.environ.get("PODBOT_STATE_BACKEND", "memory")).lower()
+    if backend == "memory":
+        return StateManager()
+    if backend == "sqlite":
+        return SQLiteStateManager(path or os.environ.get("PODBOT_STATE_PATH", DEFAULT_SQLITE_STATE_PATH))
+    raise ValueError(f"Unknown state backend '{backend}'. Expected 'memory' or 'sqlite'.")
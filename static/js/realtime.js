@@ -81,6 +81,34 @@ document.addEventListener('DOMContentLoaded', () => {
     function americanToDecimal(oddsAm) { if (oddsAm===null || oddsAm===undefined || typeof oddsAm === 'string' && (oddsAm.trim()==='N/A'||oddsAm.trim()==='')) return null; const o=parseFloat(oddsAm); if(isNaN(o)) return null; if (o>0) return (o/100)+1; if (o<0) return (100/Math.abs(o))+1; return null; }
     function getPinnacleMarketSnapshotKey(pName, mType, sel, hdpOrPts = '') { return `${pName}-${mType}-${sel}-${String(hdpOrPts||'').replace(/\./g,'p')}`.replace(/\s+/g,'_').toLowerCase(); }
 
+    // Expands the ?format=compact payload (see dashboard_payload.py) into the verbose per-event shape.
+    function expandCompactPayload(payload) {
+        if (!payload || payload.format !== 'compact-1') return payload;
+        const columns = payload.market_columns;
+        const expanded = {};
+        for (const [eventId, ev] of Object.entries(payload.events || {})) {
+            const entry = {};
+            if ('home' in ev) entry.title = `${ev.home} vs ${ev.away}`;
+            if ('league' in ev) entry.meta_info = `${ev.league} | Starts: ${ev.starts}`;
+            if ('alert' in ev) entry.alert_meta = `(Alert: ${ev.alert[0]} → ${ev.alert[1]}, NVP: ${ev.alert[2]})`;
+            if ('betbck_status' in ev) entry.betbck_status = ev.betbck_status === null ? `Data Fetched: ${ev.home} vs ${ev.away}` : ev.betbck_status;
+            for (const key of ['last_update', 'betbck_last_update', 'alert_description', 'alert_arrival_timestamp']) {
+                if (key in ev) entry[key] = ev[key];
+            }
+            if (ev.markets) {
+                const rowCount = ev.markets[0] ? ev.markets[0].length : 0;
+                entry.markets = [];
+                for (let i = 0; i < rowCount; i++) {
+                    const market = {};
+                    columns.forEach((col, c) => { market[col] = ev.markets[c][i]; });
+                    entry.markets.push(market);
+                }
+            }
+            expanded[eventId] = entry;
+        }
+        return expanded;
+    }
+
     function formatTimestamp(ts) { if (!ts && ts !== 0) return 'N/A'; try { return new Date(ts).toLocaleString(); } catch (e) { return 'Invalid Date'; } }
     function formatLastUpdate(ts) { if (!ts && ts !== 0) return 'N/A'; try { return new Date(ts * 1000).toLocaleString(); } catch (e) { return 'Invalid Date'; } }
 
@@ -118,19 +146,81 @@ document.addEventListener('DOMContentLoaded', () => {
         return false;
     }
 
-    function createTableForEvent(eventId, eventEntryFromServer) {
-        // Calculate times
-        const now = Date.now();
+    // Keyed rendering: every card (by event id) and market row (by market|selection|line) is created once and kept
+    // in cardViews. Each poll diffs against the values last written and queues only what changed; the queued DOM
+    // writes are applied together in one animation frame, so a quiet poll touches nothing but the relative times.
+    const MARKET_CELL_COUNT = 6;
+    const cardViews = new Map();
+    const pendingWrites = new Map(); // element -> [text, title]; later writes to the same element replace earlier ones
+    const pendingRowOrders = new Set(); // card views whose rows were added, removed or re-sorted
+    let pendingCardOrder = null;
+    let renderFrameRequested = false;
+
+    function scheduleRender() {
+        if (renderFrameRequested) return;
+        renderFrameRequested = true;
+        requestAnimationFrame(flushRender);
+    }
+
+    function queueText(view, slot, el, text, title) {
+        text = text == null ? '' : String(text);
+        const previous = view.written[slot];
+        if (previous && previous[0] === text && previous[1] === title) return;
+        view.written[slot] = [text, title];
+        pendingWrites.set(el, [text, title]);
+        scheduleRender();
+    }
+
+    function createCardView(eventId) {
+        const root = document.createElement('div');
+        root.className = 'event-container';
+        root.id = `event-container-${eventId}`;
+        root.innerHTML = `<header class='event-header'><div class='event-header-info'><h2 class='event-title'></h2><p class='event-meta-info'></p><p class='event-last-update' style='font-size:0.95em;color:#9ca3af;'>Odds Updated: <span></span></p><p class='event-alert-time' style='font-size:0.9em;color:#9ca3af;'>Alert: <span></span></p></div><div class='event-header-actions'><button class='btn-dismiss' title='Dismiss this alert'>&times;</button></div></header>`
+            + `<div class='alert-info-banner'><strong class='alert-description'></strong> <span class='alert-meta'></span></div>`
+            + `<div class='markets-table-container'><table aria-label='Odds Table'><thead><tr><th>Market</th><th>Selection</th><th>Line</th><th class='col-odds'>Pinnacle NVP</th><th class='col-odds'>BetBCK Odds</th><th class='col-ev'>EV %</th></tr></thead><tbody></tbody></table></div>`;
+        const view = {
+            root, tbody: root.querySelector('tbody'), rows: new Map(), rowOrder: [], showEmpty: false, emptyRow: null, written: {},
+            title: root.querySelector('.event-title'), meta: root.querySelector('.event-meta-info'),
+            oddsUpdated: root.querySelector('.event-last-update span'), alertTime: root.querySelector('.event-alert-time span'),
+            description: root.querySelector('.alert-description'), alertMeta: root.querySelector('.alert-meta'),
+        };
+        root.querySelector('.btn-dismiss').onclick = () => {
+            removeCard(eventId);
+            dismissedEventIds.add(eventId);
+            if (autoDismissTimeouts[eventId]) { clearTimeout(autoDismissTimeouts[eventId]); delete autoDismissTimeouts[eventId]; }
+            if (betbckRefreshTimeouts[eventId]) { clearTimeout(betbckRefreshTimeouts[eventId]); delete betbckRefreshTimeouts[eventId]; }
+            updateStatusCount();
+            console.log(`[Alert Removed] Event ${eventId} manually dismissed.`);
+        };
+        cardViews.set(eventId, view);
+        return view;
+    }
+
+    function removeCard(eventId) {
+        const view = cardViews.get(eventId);
+        if (view) { view.root.remove(); cardViews.delete(eventId); pendingRowOrders.delete(view); }
+        displayedEventIdsOnPage.delete(eventId);
+    }
+
+    function updateCardView(view, eventId, eventEntryFromServer) {
         const alertTs = eventEntryFromServer.alert_arrival_timestamp ? eventEntryFromServer.alert_arrival_timestamp * 1000 : null;
         const oddsUpdateTs = eventEntryFromServer.last_update ? eventEntryFromServer.last_update * 1000 : null;
-        // Format event start time (local)
-        let startTime = parseStartTime(eventEntryFromServer.meta_info || '');
-        let tableHtml = `<header class='event-header'><div class='event-header-info'><h2 class='event-title'>${eventEntryFromServer.title || ''}</h2><p class='event-meta-info'>${startTime}</p><p class='event-last-update' style='font-size:0.95em;color:#9ca3af;'>Odds Updated: <span title='${formatLocalDateTime(oddsUpdateTs)}'>${timeSince(oddsUpdateTs)}</span></p><p class='event-alert-time' style='font-size:0.9em;color:#9ca3af;'>Alert: <span title='${formatLocalDateTime(alertTs)}'>${timeSince(alertTs)}</span></p></div><div class='event-header-actions'><button class='btn-dismiss' title='Dismiss this alert'>&times;</button></div></header>`;
-        tableHtml += `<div class='alert-info-banner'><strong class='alert-description'>${eventEntryFromServer.alert_description || ''}</strong> <span class='alert-meta'>${eventEntryFromServer.alert_meta || ''}</span></div>`;
-        tableHtml += `<div class='markets-table-container'><table aria-label='Odds Table'><thead><tr><th>Market</th><th>Selection</th><th>Line</th><th class='col-odds'>Pinnacle NVP</th><th class='col-odds'>BetBCK Odds</th><th class='col-ev'>EV %</th></tr></thead><tbody>`;
-        if (eventEntryFromServer.markets && Array.isArray(eventEntryFromServer.markets)) {
+        queueText(view, 'title', view.title, eventEntryFromServer.title);
+        queueText(view, 'meta', view.meta, parseStartTime(eventEntryFromServer.meta_info || ''));
+        queueText(view, 'oddsUpdated', view.oddsUpdated, timeSince(oddsUpdateTs), formatLocalDateTime(oddsUpdateTs));
+        queueText(view, 'alertTime', view.alertTime, timeSince(alertTs), formatLocalDateTime(alertTs));
+        queueText(view, 'description', view.description, eventEntryFromServer.alert_description);
+        queueText(view, 'alertMeta', view.alertMeta, eventEntryFromServer.alert_meta);
+        updateMarketRows(view, eventId, eventEntryFromServer);
+    }
+
+    function updateMarketRows(view, eventId, eventEntryFromServer) {
+        const markets = Array.isArray(eventEntryFromServer.markets) ? eventEntryFromServer.markets : null;
+        const order = [];
+        const seen = new Set();
+        if (markets) {
             // Sort markets by EV descending
-            const sortedMarkets = [...eventEntryFromServer.markets].sort((a, b) => {
+            const sortedMarkets = [...markets].sort((a, b) => {
                 const evA = parseFloat(a.ev);
                 const evB = parseFloat(b.ev);
                 if (isNaN(evA) && isNaN(evB)) return 0;
@@ -147,24 +237,79 @@ document.addEventListener('DOMContentLoaded', () => {
                     console.log(`[NVP Change] ${eventEntryFromServer.title} | ${market.market} | ${selection} | ${market.line}: ${previousNVPs[nvpKey]} -> ${market.pinnacle_nvp}`);
                 }
                 previousNVPs[nvpKey] = market.pinnacle_nvp;
-                tableHtml += `<tr><td>${market.market || ''}</td><td>${selection || ''}</td><td>${market.line || ''}</td><td>${market.pinnacle_nvp || ''}</td><td>${market.betbck_odds || ''}</td><td>${market.ev || ''}</td></tr>`;
+                let key = `${market.market}|${selection}|${market.line}`;
+                while (seen.has(key)) key += '+';
+                seen.add(key);
+                let row = view.rows.get(key);
+                if (!row) {
+                    const tr = document.createElement('tr');
+                    row = { tr, cells: Array.from({ length: MARKET_CELL_COUNT }, () => tr.appendChild(document.createElement('td'))) };
+                    view.rows.set(key, row);
+                }
+                [market.market, selection, market.line, market.pinnacle_nvp, market.betbck_odds, market.ev]
+                    .forEach((value, i) => queueText(view, `${key}#${i}`, row.cells[i], value || ''));
+                order.push(key);
             });
-        } else {
-            tableHtml += `<tr><td colspan='6'>No market data available.</td></tr>`;
         }
-        tableHtml += `</tbody></table></div>`;
-        return tableHtml;
+        for (const key of Array.from(view.rows.keys())) {
+            if (seen.has(key)) continue;
+            view.rows.delete(key);
+            for (let i = 0; i < MARKET_CELL_COUNT; i++) delete view.written[`${key}#${i}`];
+        }
+        if (view.showEmpty !== !markets || order.length !== view.rowOrder.length || order.some((key, i) => view.rowOrder[i] !== key)) {
+            view.showEmpty = !markets;
+            view.rowOrder = order;
+            pendingRowOrders.add(view);
+            scheduleRender();
+        }
+    }
+
+    function placeChildren(parent, wanted, existing) {
+        // Removes `existing` children that are not wanted, then moves only the nodes that are out of place.
+        const wantedSet = new Set(wanted);
+        existing.forEach(node => { if (!wantedSet.has(node)) node.remove(); });
+        let current = existing.filter(node => wantedSet.has(node));
+        wanted.forEach((node, i) => {
+            if (current[i] === node) return;
+            parent.insertBefore(node, current[i] || (current.length ? current[current.length - 1].nextSibling : null));
+            current = current.filter(n => n !== node);
+            current.splice(i, 0, node);
+        });
     }
 
-    function setupAutoDismiss(eventId, eventDiv, alertTs) {
+    function flushRender() {
+        renderFrameRequested = false;
+        pendingWrites.forEach(([text, title], el) => {
+            el.textContent = text;
+            if (title !== undefined) el.title = title;
+        });
+        pendingWrites.clear();
+        pendingRowOrders.forEach(view => {
+            if (view.showEmpty && !view.emptyRow) {
+                view.emptyRow = document.createElement('tr');
+                view.emptyRow.innerHTML = `<td colspan='6'>No market data available.</td>`;
+            }
+            const wanted = view.showEmpty ? [view.emptyRow] : view.rowOrder.map(key => view.rows.get(key).tr);
+            placeChildren(view.tbody, wanted, Array.from(view.tbody.children));
+        });
+        pendingRowOrders.clear();
+        if (pendingCardOrder) {
+            const wanted = pendingCardOrder.filter(eventId => cardViews.has(eventId)).map(eventId => cardViews.get(eventId).root);
+            placeChildren(oddsDisplayArea, wanted, Array.from(oddsDisplayArea.querySelectorAll(':scope > .event-container')));
+            pendingCardOrder = null;
+        }
+        if(mainLoadingMessage){const noEvents=cardViews.size===0; mainLoadingMessage.style.display=noEvents?'block':'none'; if(noEvents)mainLoadingMessage.textContent="No active alerts. Waiting...";}
+        updateStatusCount();
+    }
+
+    function setupAutoDismiss(eventId, alertTs) {
         if (autoDismissTimeouts[eventId]) return; // Only set once
         const now = Date.now();
         const msSinceAlert = now - (alertTs || now);
         const msLeft = Math.max(AUTO_DISMISS_MINUTES * 60 * 1000 - msSinceAlert, 0);
         autoDismissTimeouts[eventId] = setTimeout(() => {
-            if (eventDiv && eventDiv.parentNode) {
-                eventDiv.remove();
-                displayedEventIdsOnPage.delete(eventId);
+            if (cardViews.has(eventId)) {
+                removeCard(eventId);
                 dismissedEventIds.add(eventId);
                 delete autoDismissTimeouts[eventId];
                 updateStatusCount();
@@ -173,7 +318,7 @@ document.addEventListener('DOMContentLoaded', () => {
         }, msLeft);
     }
 
-    function setupBetbckRefresh(eventId, eventEntry, eventDiv) {
+    function setupBetbckRefresh(eventId, eventEntry) {
         if (betbckRefreshTimeouts[eventId]) clearTimeout(betbckRefreshTimeouts[eventId]);
         // Only refresh if there is a positive EV market
         const hasPositiveEV = (eventEntry.markets || []).some(m => parseFloat(m.ev) >= POSITIVE_EV_THRESHOLD);
@@ -193,61 +338,32 @@ document.addEventListener('DOMContentLoaded', () => {
 
     async function fetchAndRefreshAllActiveEvents() {
         try {
-            const response = await fetch(`/get_active_events_data`);
+            const response = await fetch(`/get_active_events_data?format=compact`);
             if (!response.ok) { setStatus('disconnected', 'Connection error'); if (mainLoadingMessage) mainLoadingMessage.textContent = `Error fetching`; return; }
-            const allEventsDataFromServer = await response.json();
+            const allEventsDataFromServer = expandCompactPayload(await response.json());
             const sortedEventEntries = Object.entries(allEventsDataFromServer)
                 .sort(([,a_entry],[,b_entry]) => (b_entry.alert_arrival_timestamp||0) - (a_entry.alert_arrival_timestamp||0))
                 .slice(0, MAX_EVENTS_TO_DISPLAY);
-            // Remove dismissed events from DOM
-            Array.from(oddsDisplayArea.children).forEach(childDiv => {
-                const childId = childDiv.id.replace('event-container-','');
-                if (dismissedEventIds.has(childId)) { childDiv.remove(); displayedEventIdsOnPage.delete(childId); }
-            });
-            if(mainLoadingMessage){const noEvents=document.querySelectorAll('.event-container').length===0; mainLoadingMessage.style.display=noEvents?'block':'none'; if(noEvents)mainLoadingMessage.textContent="No active alerts. Waiting...";}
-            const divsToRenderInOrder = [];
+            // Remove dismissed events
+            Array.from(cardViews.keys()).forEach(eventId => { if (dismissedEventIds.has(eventId)) removeCard(eventId); });
+            const cardOrder = [];
             for (const [eventId, eventEntry] of sortedEventEntries) {
                 if (shouldHideEvent(eventEntry)) continue;
                 if (dismissedEventIds.has(eventId)) continue;
-                let eventDiv = document.getElementById(`event-container-${eventId}`);
-                let needsFullRender = !eventDiv;
-                if (!eventDiv) {
-                    eventDiv = document.createElement('div'); eventDiv.className = 'event-container'; eventDiv.id = `event-container-${eventId}`;
-                }
-                eventDiv.innerHTML = createTableForEvent(eventId, eventEntry);
-                divsToRenderInOrder.push(eventDiv);
-                if (!displayedEventIdsOnPage.has(eventId)) { displayedEventIdsOnPage.add(eventId); }
+                updateCardView(cardViews.get(eventId) || createCardView(eventId), eventId, eventEntry);
+                cardOrder.push(eventId);
+                displayedEventIdsOnPage.add(eventId);
                 // Setup auto-dismiss and BetBCK refresh
-                setupAutoDismiss(eventId, eventDiv, eventEntry.alert_arrival_timestamp ? eventEntry.alert_arrival_timestamp * 1000 : null);
-                setupBetbckRefresh(eventId, eventEntry, eventDiv);
-            }
-            // Smart re-ordering: only re-append if order changed or new divs added
-            let currentDomOrder = Array.from(oddsDisplayArea.children);
-            let domNeedsReorder = divsToRenderInOrder.length !== currentDomOrder.length;
-            if (!domNeedsReorder) {
-                for(let i=0; i < divsToRenderInOrder.length; i++) { if (!currentDomOrder[i] || currentDomOrder[i].id !== divsToRenderInOrder[i].id) { domNeedsReorder = true; break; } }
-            }
-            if (domNeedsReorder) {
-                oddsDisplayArea.innerHTML = '';
-                divsToRenderInOrder.forEach(div => oddsDisplayArea.appendChild(div));
+                setupAutoDismiss(eventId, eventEntry.alert_arrival_timestamp ? eventEntry.alert_arrival_timestamp * 1000 : null);
+                setupBetbckRefresh(eventId, eventEntry);
             }
-            // Setup dismiss button
-            divsToRenderInOrder.forEach(eventDiv => {
-                const btn = eventDiv.querySelector('.btn-dismiss');
-                if (btn) {
-                    btn.onclick = () => {
-                        const eventId = eventDiv.id.replace('event-container-','');
-                        eventDiv.remove();
-                        displayedEventIdsOnPage.delete(eventId);
-                        dismissedEventIds.add(eventId);
-                        if (autoDismissTimeouts[eventId]) { clearTimeout(autoDismissTimeouts[eventId]); delete autoDismissTimeouts[eventId]; }
-                        if (betbckRefreshTimeouts[eventId]) { clearTimeout(betbckRefreshTimeouts[eventId]); delete betbckRefreshTimeouts[eventId]; }
-                        updateStatusCount();
-                        console.log(`[Alert Removed] Event ${eventId} manually dismissed.`);
-                    };
-                }
+            // Cards that fell out of the list are detached in the next frame
+            const shown = new Set(cardOrder);
+            Array.from(cardViews.keys()).forEach(eventId => {
+                if (!shown.has(eventId)) { cardViews.delete(eventId); displayedEventIdsOnPage.delete(eventId); }
             });
-            updateStatusCount();
+            pendingCardOrder = cardOrder;
+            scheduleRender();
         } catch (error) { setStatus('disconnected', 'Connection error'); console.error("[Realtime.js] Error refreshing:", error); if(mainLoadingMessage) mainLoadingMessage.textContent = `Error: ${error.message}`; }
     }
 
@@ -255,6 +371,63 @@ document.addEventListener('DOMContentLoaded', () => {
     fetchAndRefreshAllActiveEvents();
     setInterval(fetchAndRefreshAllActiveEvents, REFRESH_INTERVAL_MS);
 
+    // One /event/<id> long-poll per event for this browser. Popups run in this window, so listeners here share
+    // it directly; other dashboard tabs share it through a BroadcastChannel, with a Web Lock electing the poller.
+    const EVENT_LONG_POLL_TIMEOUT_S = 25;
+    const eventSubscriptions = {};
+
+    function subscribeToEvent(eventId, listener) {
+        let sub = eventSubscriptions[eventId];
+        if (!sub) {
+            sub = eventSubscriptions[eventId] = { listeners: new Set(), last: null, abort: new AbortController(), channel: null };
+            const deliver = (message) => {
+                sub.last = message;
+                sub.listeners.forEach(fn => fn(message.event));
+            };
+            if ('BroadcastChannel' in window) {
+                sub.channel = new BroadcastChannel(`podbot-event-${eventId}`);
+                sub.channel.onmessage = (e) => deliver(e.data);
+            }
+            const poll = async () => {
+                let version = sub.last ? sub.last.version : '';
+                while (!sub.abort.signal.aborted) {
+                    try {
+                        const response = await fetch(`/event/${encodeURIComponent(eventId)}?since=${version}&timeout=${EVENT_LONG_POLL_TIMEOUT_S}`,
+                                                     { signal: sub.abort.signal });
+                        if (response.status === 204) continue;
+                        const message = response.status === 404 ? { version: null, event: null } : await response.json();
+                        if (!response.ok && response.status !== 404) throw new Error(`HTTP ${response.status}`);
+                        deliver(message);
+                        if (sub.channel) sub.channel.postMessage(message);
+                        if (message.event === null) return;
+                        version = message.version;
+                    } catch (e) {
+                        if (sub.abort.signal.aborted) return;
+                        await new Promise(resolve => setTimeout(resolve, REFRESH_INTERVAL_MS));
+                    }
+                }
+            };
+            if (navigator.locks && sub.channel) {
+                // Followers get the current state once, then wait for broadcasts; the lock holder polls.
+                fetch(`/event/${encodeURIComponent(eventId)}`).then(r => r.ok ? r.json() : { version: null, event: null })
+                    .then(message => { if (!sub.last) deliver(message); }).catch(() => {});
+                navigator.locks.request(`podbot-event-${eventId}`, { signal: sub.abort.signal }, poll).catch(() => {});
+            } else {
+                poll();
+            }
+        }
+        sub.listeners.add(listener);
+        if (sub.last) listener(sub.last.event);
+        return () => {
+            sub.listeners.delete(listener);
+            if (sub.listeners.size === 0) {
+                sub.abort.abort();
+                if (sub.channel) sub.channel.close();
+                delete eventSubscriptions[eventId];
+            }
+        };
+    }
+
     function showPositiveEvPopup(eventData, marketDetails) {
         const { eventId, homeTeam, awayTeam, periodName } = eventData;
         const { selectionName, lineDisplay, marketType, bckDisplay, pinNvpDisplay, evDisplay } = marketDetails;
@@ -286,68 +459,66 @@ document.addEventListener('DOMContentLoaded', () => {
 
         let lastOdds = { bck: bckDisplay, pin: pinNvpDisplay };
 
-        function updatePopup() {
-            fetch(`/get_active_events_data`, { mode: 'cors' })
-                .then(response => response.json())
-                .then(data => {
-                    const event = data[eventId];
-                    let market = null;
-                    if (event) {
-                        market = event.markets.find(m => m.market === marketType && m.selection === selectionName && m.line === lineDisplay);
-                    }
-                    let oddsWarning = '';
-                    let bckOdds = market ? market.betbck_odds : lastOdds.bck;
-                    let pinOdds = market ? market.pinnacle_nvp : lastOdds.pin;
-                    let evVal = market ? market.ev : evDisplay;
-                    // Confirm odds
-                    if (market) {
-                        if (parseFloat(bckOdds) <= parseFloat(pinOdds)) {
-                            oddsWarning = '<div style="color:#ef4444; font-weight:bold;">Warning: BetBCK odds are no longer better than Pinnacle NVP!</div>';
-                        }
-                        lastOdds = { bck: bckOdds, pin: pinOdds };
-                    }
-                    popup.document.body.innerHTML = `
-                        <style>
-                            body { font-family: system-ui, sans-serif; background-color: #1f2937; color: #f9fafb; padding: 20px; }
-                            h3 { color: #3b82f6; }
-                            p { margin: 8px 0; line-height: 1.5; }
-                            strong { color: #9ca3af; }
-                            .ev-value { color: #22c55e; font-weight: bold; font-size: 1.2em; }
-                            .bet-btn { background: #3b82f6; color: #fff; border: none; border-radius: 6px; padding: 0.5em 1.2em; font-size: 1.1em; cursor: pointer; margin-top: 10px; }
-                            .bet-btn:disabled { background: #888; cursor: not-allowed; }
-                            .odds-warning { color: #ef4444; font-weight: bold; }
-                            .bet-amount-input { width: 80px; font-size: 1.1em; margin-left: 8px; }
-                        </style>
-                        <h3>Positive EV Opportunity!</h3>
-                        <p><strong>Event:</strong> ${homeTeam} vs ${awayTeam}</p>
-                        <p><strong>Period:</strong> ${periodName}</p>
-                        <hr>
-                        <p><strong>Market:</strong> ${marketType}</p>
-                        <p><strong>Selection:</strong> ${selectionName} ${lineDisplay}</p>
-                        <p><strong>BetBCK Odds:</strong> <span id='bck-odds'>${bckOdds || 'N/A'}</span></p>
-                        <p><strong>Pinnacle NVP:</strong> <span id='pin-odds'>${pinOdds || 'N/A'}</span></p>
-                        <p class="ev-value">EV: ${evVal || 'N/A'}</p>
-                        ${oddsWarning}
-                        <div style='margin-top:16px;'>
-                            <label for='bet-amount'><strong>Bet Amount:</strong></label>
-                            <input id='bet-amount' class='bet-amount-input' type='number' min='1' placeholder='Amount'>
-                            <button id='betbck-btn' class='bet-btn'>Bet on BetBCK</button>
-                        </div>
-                        <div style='margin-top:10px; color:#9ca3af; font-size:0.95em;'>BetBCK integration coming soon: This will inject your bet directly to the BetBCK page.</div>
-                    `;
-                    // Add button handler
-                    popup.document.getElementById('betbck-btn').onclick = function() {
-                        const amount = popup.document.getElementById('bet-amount').value;
-                        window.open('https://betbck.com/', '_blank');
-                        alert('In the future, this will inject your bet directly to BetBCK!\nAmount: ' + amount);
-                    };
-                })
-                .catch(() => popup.close());
+        function updatePopup(event) {
+            if (popup.closed) return;
+            if (event === null) { popup.close(); return; }
+            let market = null;
+            if (event) {
+                market = event.markets.find(m => m.market === marketType && m.selection === selectionName && m.line === lineDisplay);
+            }
+            let oddsWarning = '';
+            let bckOdds = market ? market.betbck_odds : lastOdds.bck;
+            let pinOdds = market ? market.pinnacle_nvp : lastOdds.pin;
+            let evVal = market ? market.ev : evDisplay;
+            // Confirm odds
+            if (market) {
+                if (parseFloat(bckOdds) <= parseFloat(pinOdds)) {
+                    oddsWarning = '<div style="color:#ef4444; font-weight:bold;">Warning: BetBCK odds are no longer better than Pinnacle NVP!</div>';
+                }
+                lastOdds = { bck: bckOdds, pin: pinOdds };
+            }
+            popup.document.body.innerHTML = `
+                <style>
+                    body { font-family: system-ui, sans-serif; background-color: #1f2937; color: #f9fafb; padding: 20px; }
+                    h3 { color: #3b82f6; }
+                    p { margin: 8px 0; line-height: 1.5; }
+                    strong { color: #9ca3af; }
+                    .ev-value { color: #22c55e; font-weight: bold; font-size: 1.2em; }
+                    .bet-btn { background: #3b82f6; color: #fff; border: none; border-radius: 6px; padding: 0.5em 1.2em; font-size: 1.1em; cursor: pointer; margin-top: 10px; }
+                    .bet-btn:disabled { background: #888; cursor: not-allowed; }
+                    .odds-warning { color: #ef4444; font-weight: bold; }
+                    .bet-amount-input { width: 80px; font-size: 1.1em; margin-left: 8px; }
+                </style>
+                <h3>Positive EV Opportunity!</h3>
+                <p><strong>Event:</strong> ${homeTeam} vs ${awayTeam}</p>
+                <p><strong>Period:</strong> ${periodName}</p>
+                <hr>
+                <p><strong>Market:</strong> ${marketType}</p>
+                <p><strong>Selection:</strong> ${selectionName} ${lineDisplay}</p>
+                <p><strong>BetBCK Odds:</strong> <span id='bck-odds'>${bckOdds || 'N/A'}</span></p>
+                <p><strong>Pinnacle NVP:</strong> <span id='pin-odds'>${pinOdds || 'N/A'}</span></p>
+                <p class="ev-value">EV: ${evVal || 'N/A'}</p>
+                ${oddsWarning}
+                <div style='margin-top:16px;'>
+                    <label for='bet-amount'><strong>Bet Amount:</strong></label>
+                    <input id='bet-amount' class='bet-amount-input' type='number' min='1' placeholder='Amount'>
+                    <button id='betbck-btn' class='bet-btn'>Bet on BetBCK</button>
+                </div>
+                <div style='margin-top:10px; color:#9ca3af; font-size:0.95em;'>BetBCK integration coming soon: This will inject your bet directly to the BetBCK page.</div>
+            `;
+            // Add button handler
+            popup.document.getElementById('betbck-btn').onclick = function() {
+                const amount = popup.document.getElementById('bet-amount').value;
+                window.open('https://betbck.com/', '_blank');
+                alert('In the future, this will inject your bet directly to BetBCK!\nAmount: ' + amount);
+            };
         }
 
         popup.document.title = `+EV Alert: ${selectionName}`;
-        updatePopup();
-        setInterval(updatePopup, REFRESH_INTERVAL_MS);
+        const unsubscribe = subscribeToEvent(eventId, updatePopup);
+        const closeWatch = setInterval(() => {
+            if (popup.closed) { clearInterval(closeWatch); unsubscribe(); }
+        }, 1000);
     }
 
     function cleanTeamName(name, eventTitle) {
@@ -0,0 +1,65 @@
+"""
+Traffic capture for replays (benchmarks/replay_capture.py). Off unless PODBOT_CAPTURE_DIR is set.
+
+With it set, each process appends what it receives to <dir>/capture-<host>-<pid>.jsonl, one
+JSON object per line with the wall-clock time "t" and a "kind":
+
+    {"t": ..., "kind": "alert", "payload": {...}}                   a /pod_alert payload
+    {"t": ..., "kind": "alert_batch", "alerts": [...]}              a /pod_alert_batch body
+    {"t": ..., "kind": "sweep_hit", "payload": {...}}               an alert board_sweep raised itself
+    {"t": ..., "kind": "swordfish", "event_id": "...", "status": 200, "body": "...", "ms": 84.2}
+    {"t": ..., "kind": "betbck_search", "keyword": "...", "html": "...", "complete": true, "ms": 412.0}
+
+A streamed BetBCK search is captured as far as the scraper read it ("complete": false when it
+stopped at the game). Sweep hits are not inbound traffic, so replays do not send them; a replayed
+server that sweeps finds them again. Captures hold raw BetBCK pages and odds; treat them like the HTML logs.
+"""
+import json
+import os
+import socket
+import threading
+import time
+
+from podbot_logging import get_logger
+
+logger = get_logger("capture")
+
+CAPTURE_DIR = os.environ.get("PODBOT_CAPTURE_DIR")
+KINDS = ("alert", "alert_batch", "sweep_hit", "swordfish", "betbck_search")
+
+_file = None
+_lock = threading.Lock()
+
+def capturing():
+    return bool(CAPTURE_DIR)
+
+def capture(kind, **fields):
+    """Appends one record. Does nothing unless capturing; never raises into the request path."""
+    global _file
+    if not CAPTURE_DIR:
+        return
+    with _lock:
+        try:
+            line = json.dumps({"t": time.time(), "kind": kind, **fields}) + "\n"
+            if _file is None:
+                os.makedirs(CAPTURE_DIR, exist_ok=True)
+                path = os.path.join(CAPTURE_DIR, f"capture-{socket.gethostname()}-{os.getpid()}.jsonl")
+                _file = open(path, "a", encoding="utf-8")
+                logger.info("[Capture] Capturing traffic to %s", path)
+            _file.write(line)
+            _file.flush()
+        except (OSError, TypeError, ValueError) as e:  # unwritable directory, or a payload JSON cannot encode
+            logger.error("[Capture] Could not write %s record: %s", kind, e)
+
+def load_capture(path):
+    """Every record in a capture file, or in all capture-*.jsonl files of a directory, in time order."""
+    paths = [path] if os.path.isfile(path) else sorted(
+        os.path.join(path, name) for name in os.listdir(path) if name.startswith("capture-") and name.endswith(".jsonl"))
+    records = []
+    for p in paths:
+        with open(p, encoding="utf-8") as f:
+            for line in f:
+                if line.endswith("\n"):  # a torn last line from a killed process is skipped
+                    records.append(json.loads(line))
+    records.sort(key=lambda r: r["t"])
+    return records
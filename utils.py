@@ -1,10 +1,17 @@
 import math
 import re
 
+from metrics import timed_stage
+from odds import american_to_decimal, decimal_to_american  # noqa: F401 (re-exported; odds.py is canonical)
+from podbot_logging import get_logger, sample_every
+
+logger = get_logger("utils")
+norm_logger = get_logger("norm")
+
 def normalize_team_name_for_matching(name):
     original_name_for_debug = name
     if name is None or not name:
-        print(f"[Utils] WARNING: normalize_team_name_for_matching received None or empty input: '{original_name_for_debug}'")
+        norm_logger.warning("[Utils] normalize_team_name_for_matching received None or empty input: '%s'", original_name_for_debug)
         return ""
 
     # Remove common phrases indicating a prop/future
@@ -64,7 +71,7 @@ def normalize_team_name_for_matching(name):
     norm_name = re.sub(r'^[^\w]+|[^\w]+$', '', normalized)
     norm_name = re.sub(r'[^\w\s\.\-\+]', '', norm_name)
     final_normalized_name = " ".join(norm_name.split()).strip()
-    print(f"[NORM_DEBUG] Original: '{original_name_for_debug}' ---> Normalized: '{final_normalized_name}'")
+    norm_logger.debug("[NORM_DEBUG] Original: '%s' ---> Normalized: '%s'", original_name_for_debug, final_normalized_name, extra=sample_every(50))
     return final_normalized_name if final_normalized_name else (original_name_for_debug.lower().strip() if original_name_for_debug else "")
 
 def get_cleaned_team_name_from_div(team_div_soup):
@@ -97,22 +104,6 @@ def get_cleaned_team_name_from_div(team_div_soup):
     raw_name_text = re.sub(r'\s*\((hits\+runs\+errors|h\+r\+e|hre)\)$', '', raw_name_text, flags=re.IGNORECASE).strip()
     return " ".join(raw_name_text.split()) if raw_name_text else ""
 
-def american_to_decimal(american_odds_str):
-    if american_odds_str is None: return None
-    try:
-        if isinstance(american_odds_str, str) and not re.match(r"^[+-]?\d+$", american_odds_str.strip()): return None
-        odds = float(str(american_odds_str).strip())
-        if odds > 0: return (odds / 100.0) + 1.0
-        if odds < 0: return (100.0 / abs(odds)) + 1.0
-        return None 
-    except ValueError: return None
-
-def decimal_to_american(decimal_odds):
-    if decimal_odds is None or not isinstance(decimal_odds, (float, int)): return None
-    if decimal_odds <= 1.0001: return None 
-    if decimal_odds >= 2.0: return f"+{int(round((decimal_odds - 1) * 100))}"
-    return f"{int(round(-100 / (decimal_odds - 1)))}"
-
 def adjust_power_probabilities(probabilities, tolerance=1e-4, max_iterations=100):
     k = 1.0 
     valid_probs_for_power = [p for p in probabilities if p is not None and p > 0]
@@ -179,10 +170,11 @@ def calculate_nvp_for_market(odds_list):
           final_nvp_list[original_idx] = nvps_for_valid[i]
     return final_nvp_list
 
+@timed_stage("nvp_compute")
 def process_event_odds_for_display(pinnacle_event_json_data):
     """
-    Adds NVP (No Vig Price) and American Odds to Pinnacle odds data.
-    Modifies the input dictionary in place.
+    Adds NVP (No Vig Price) decimal odds (nvp_home, nvp_over, ...) to Pinnacle odds data.
+    Modifies the input dictionary in place. Odds stay numeric; see odds.py.
     """
     if not pinnacle_event_json_data or 'data' not in pinnacle_event_json_data:
         return pinnacle_event_json_data
@@ -198,7 +190,7 @@ def process_event_odds_for_display(pinnacle_event_json_data):
         # Remove the 'history' key from each period
         if 'history' in period_data:
             del period_data['history']
-            print(f"[DEBUG] History removed for period: {period_key}")
+            logger.debug("[DEBUG] History removed for period: %s", period_key, extra=sample_every(50))
 
         # Moneyline
         if period_data.get("money_line") and isinstance(period_data["money_line"], dict):
@@ -210,12 +202,6 @@ def process_event_odds_for_display(pinnacle_event_json_data):
                 ml["nvp_home"] = nvps_dec[0]
                 ml["nvp_draw"] = nvps_dec[1]
                 ml["nvp_away"] = nvps_dec[2]
-            ml["american_home"] = decimal_to_american(ml.get("home"))
-            ml["american_draw"] = decimal_to_american(ml.get("draw"))
-            ml["american_away"] = decimal_to_american(ml.get("away"))
-            ml["nvp_american_home"] = decimal_to_american(ml.get("nvp_home"))
-            ml["nvp_american_draw"] = decimal_to_american(ml.get("nvp_draw"))
-            ml["nvp_american_away"] = decimal_to_american(ml.get("nvp_away"))
 
         # Spreads
         if period_data.get("spreads") and isinstance(period_data["spreads"], dict):
@@ -225,10 +211,6 @@ def process_event_odds_for_display(pinnacle_event_json_data):
                     nvps_dec = calculate_nvp_for_market(odds_dec)
                     if len(nvps_dec) == 2:
                         spread_details["nvp_home"], spread_details["nvp_away"] = nvps_dec[0], nvps_dec[1]
-                    spread_details["american_home"] = decimal_to_american(spread_details.get("home"))
-                    spread_details["american_away"] = decimal_to_american(spread_details.get("away"))
-                    spread_details["nvp_american_home"] = decimal_to_american(spread_details.get("nvp_home"))
-                    spread_details["nvp_american_away"] = decimal_to_american(spread_details.get("nvp_away"))
 
         # Totals
         if period_data.get("totals") and isinstance(period_data["totals"], dict):
@@ -238,8 +220,4 @@ def process_event_odds_for_display(pinnacle_event_json_data):
                     nvps_dec = calculate_nvp_for_market(odds_dec)
                     if len(nvps_dec) == 2:
                         total_details["nvp_over"], total_details["nvp_under"] = nvps_dec[0], nvps_dec[1]
-                    total_details["american_over"] = decimal_to_american(total_details.get("over"))
-                    total_details["american_under"] = decimal_to_american(total_details.get("under"))
-                    total_details["nvp_american_over"] = decimal_to_american(total_details.get("nvp_over"))
-                    total_details["nvp_american_under"] = decimal_to_american(total_details.get("nvp_under"))
     return pinnacle_event_json_data
\ No newline at end of file
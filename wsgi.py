@@ -0,0 +1,128 @@
+"""
+Production entry point for the PODBot server.
+
+`python server.py` runs Flask's development server (debug mode, one thread per
+request). This module serves the same app through a production WSGI server with
+configurable worker and thread counts, and starts/stops the background refresher
+cleanly with the server's lifecycle.
+
+    python wsgi.py                                  # waitress, 16 threads
+    python wsgi.py --threads 32 --port 5001
+    python wsgi.py --server gunicorn --threads 16   # Linux/macOS only
+
+Settings can also come from the environment: PODBOT_HOST, PODBOT_PORT,
+PODBOT_SERVER, PODBOT_WORKERS, PODBOT_THREADS.
+
+main() checks config.json before serving and exits with the list of problems if it is invalid.
+It logs how long the process took to get ready (imports, config, background tasks) and warns
+when that exceeds PODBOT_COLD_START_BUDGET seconds (default 1.5); see benchmarks/bench_startup.py.
+
+External servers can import `application` (e.g. `gunicorn wsgi:application`);
+the background refresher then starts on the first request.
+"""
+import time
+
+_PROCESS_START = time.perf_counter()
+
+import argparse
+import atexit
+import os
+import signal
+import sys
+
+import podbot_config
+from podbot_logging import get_logger
+from server import app, state_manager, start_background_tasks, stop_background_tasks
+
+logger = get_logger("wsgi")
+
+COLD_START_BUDGET_SECONDS = float(os.environ.get("PODBOT_COLD_START_BUDGET", "1.5"))
+
+_background_started_for_external_server = False
+
+@app.before_request
+def _ensure_background_tasks():
+    # Only relevant when an external server imports `application` without going through main().
+    global _background_started_for_external_server
+    if not _background_started_for_external_server:
+        _background_started_for_external_server = True
+        start_background_tasks()
+
+application = app
+
+def _log_ready():
+    elapsed = time.perf_counter() - _PROCESS_START
+    if elapsed > COLD_START_BUDGET_SECONDS:
+        logger.warning("[WSGI] Ready in %.2fs, over the %.2fs cold-start budget.", elapsed, COLD_START_BUDGET_SECONDS)
+    else:
+        logger.info("[WSGI] Ready in %.2fs.", elapsed)
+
+def _run_waitress(host, port, threads):
+    try:
+        from waitress import serve
+    except ImportError:
+        sys.exit("waitress is not installed. Run: pip install waitress")
+    start_background_tasks()
+    _log_ready()
+    logger.info("[WSGI] Serving with waitress on %s:%s (%s threads)", host, port, threads)
+    try:
+        serve(application, host=host, port=port, threads=threads)
+    finally:
+        stop_background_tasks()
+
+def _run_gunicorn(host, port, workers, threads):
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        sys.exit("gunicorn is not installed (it does not run on Windows). Run: pip install gunicorn")
+    if workers > 1 and not state_manager.SHARED_ACROSS_PROCESSES:
+        logger.warning("[WSGI] The in-memory state backend is per process; with more than one worker each "
+                       "worker sees only the alerts it received. Set PODBOT_STATE_BACKEND=sqlite.")
+
+    class _PodbotGunicorn(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{host}:{port}")
+            self.cfg.set("workers", workers)
+            self.cfg.set("threads", threads)
+            self.cfg.set("worker_class", "gthread")
+            self.cfg.set("post_worker_init", lambda worker: (start_background_tasks(), _log_ready()))
+            self.cfg.set("worker_exit", lambda server, worker: stop_background_tasks())
+
+        def load(self):
+            return application
+
+    logger.info("[WSGI] Serving with gunicorn on %s:%s (%s workers x %s threads)", host, port, workers, threads)
+    _PodbotGunicorn().run()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the PODBot server in production mode.")
+    parser.add_argument("--host", default=os.environ.get("PODBOT_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PODBOT_PORT", "5001")))
+    parser.add_argument("--server", choices=["waitress", "gunicorn"], default=os.environ.get("PODBOT_SERVER", "waitress"))
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("PODBOT_WORKERS", "1")),
+                        help="Worker processes (gunicorn only).")
+    parser.add_argument("--threads", type=int, default=int(os.environ.get("PODBOT_THREADS", "16")),
+                        help="Request threads per worker.")
+    args = parser.parse_args(argv)
+
+    try:
+        config = podbot_config.current()
+    except podbot_config.ConfigError as e:
+        sys.exit(f"Invalid configuration: {e}")
+    logger.info("[WSGI] Config loaded from %s", config.path)
+
+    global _background_started_for_external_server
+    _background_started_for_external_server = True
+    atexit.register(stop_background_tasks)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    if args.server == "gunicorn":
+        _run_gunicorn(args.host, args.port, args.workers, args.threads)
+    else:
+        if args.workers != 1:
+            logger.warning("[WSGI] waitress runs a single process; ignoring --workers.")
+        _run_waitress(args.host, args.port, args.threads)
+
+if __name__ == "__main__":
+    main()